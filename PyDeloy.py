@@ -1,15 +1,27 @@
+import time
+# Mốc thời gian trước khi import Qt, dùng cho --startup-time
+STARTUP_START = time.perf_counter()
+
 import sys
 import subprocess
-import ast
 import os
+import shutil
+# Widget chỉ tab tạo lười mới dùng được import trong hàm tạo tab/action
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QLabel, QPushButton, QFileDialog, 
-                             QCheckBox, QLineEdit, QComboBox, QTextEdit, 
+                             QHBoxLayout, QLabel, QPushButton, 
+                             QCheckBox, QLineEdit, QComboBox,
                              QGroupBox, QMessageBox, QProgressBar, QListWidget,
-                             QListWidgetItem, QTabWidget, QFrame)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSize
-from PyQt5.QtGui import QFont, QPalette, QColor, QIcon
-from PyQt5.QtWidgets import QSizePolicy
+                             QListWidgetItem, QTabWidget, QFrame, QSpinBox,
+                             QTableWidgetItem)
+from PyQt5.QtCore import Qt, QThread, QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtGui import QFont, QColor, QIcon
+
+# runner, worker, spec_file, build_history, multi_target, shared_analysis,
+# benchmark, bundle_report, module_index... chỉ được import khi dùng tới
+from pydeloy import build_cache, buildlog, config, format_size, import_graph, incremental, procstats
+from pydeloy.cancel import USER_CANCEL, CancelToken
+from pydeloy.command_model import DEBOUNCE_MS, CommandModel
+from pydeloy.logbuffer import FLUSH_INTERVAL_MS, LogBuffer
 
 
 class ConvertThread(QThread):
@@ -17,93 +29,500 @@ class ConvertThread(QThread):
     finished = pyqtSignal(bool, str)
     output = pyqtSignal(str)
     progress = pyqtSignal(int)
+    phase = pyqtSignal(str)
     
-    def __init__(self, command):
+    def __init__(self, args, options=None, on_output=None, log_path=None):
         super().__init__()
-        self.command = command
+        self.args = args
+        self.options = options
+        # on_output (vd. LogBuffer.write) nhận output thay cho signal từng dòng
+        self.on_output = on_output
+        self.log_path = log_path
+        self.cancel_token = CancelToken()
+    
+    def run(self):
+        from pydeloy import runner
+        success, message = runner.run_build(self.args, self.options,
+                                            on_output=self.on_output or self.output.emit,
+                                            on_progress=self.progress.emit,
+                                            log_path=self.log_path,
+                                            on_phase=self.phase.emit,
+                                            cancel=self.cancel_token)
+        self.finished.emit(success, message)
+    
+    def cancel(self, reason=USER_CANCEL):
+        """Huỷ build (gọi từ UI thread): kill cây process PyInstaller"""
+        self.cancel_token.cancel(reason)
+
+
+class MultiTargetThread(ConvertThread):
+    """Build nhiều script thành một bundle (một spec, một COLLECT chung)"""
+    
+    def __init__(self, builds, name, on_output=None, log_path=None):
+        super().__init__(None, None, on_output, log_path)
+        self.builds = builds
+        self.name = name
+    
+    def run(self):
+        from pydeloy import multi_target
+        success, message = multi_target.run_multi_target(self.builds, self.name,
+                                                         on_output=self.on_output or self.output.emit,
+                                                         on_progress=self.progress.emit,
+                                                         log_path=self.log_path,
+                                                         on_phase=self.phase.emit,
+                                                         cancel=self.cancel_token)
+        self.finished.emit(success, message)
+
+
+class AnalyzeThread(QThread):
+    """Phân tích import trong nền, parse file bằng process pool"""
+    partial = pyqtSignal(object)
+    done = pyqtSignal(object)
+    
+    # Wave nhỏ hơn ngưỡng này parse luôn trong thread, không đáng gửi sang pool
+    POOL_THRESHOLD = 16
+    _executor = None
+    
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+    
+    @classmethod
+    def executor(cls):
+        if cls._executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            cls._executor = ProcessPoolExecutor()
+        return cls._executor
+    
+    def parse_many(self, paths):
+        if len(paths) < self.POOL_THRESHOLD:
+            return [import_graph.safe_parse(path) for path in paths]
+        chunksize = max(1, len(paths) // (4 * (os.cpu_count() or 1)))
+        return list(self.executor().map(import_graph.safe_parse, paths, chunksize=chunksize))
     
     def run(self):
         try:
-            process = subprocess.Popen(
-                self.command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+            graph = import_graph.analyze(
+                self.file_path,
+                parse_many=self.parse_many,
+                on_wave=lambda g: self.partial.emit(g.top_level_names())
             )
-            
-            progress_keywords = {
-                'building': 15, 'analyzing': 25, 'running': 35,
-                'processing': 45, 'collecting': 55, 'copying': 65,
-                'building exe': 75, 'building pyz': 80,
-                'appending': 85, 'completed successfully': 100
-            }
-            
-            current_progress = 5
-            self.progress.emit(5)
-            all_output = []
-            
-            for line in process.stdout:
-                line_lower = line.lower().strip()
-                self.output.emit(line.strip())
-                all_output.append(line.strip())
-                
-                for keyword, progress_value in progress_keywords.items():
-                    if keyword in line_lower:
-                        if progress_value > current_progress:
-                            current_progress = progress_value
-                            self.progress.emit(current_progress)
-                        break
-                
-                if current_progress < 90 and line.strip():
-                    current_progress = min(current_progress + 1, 90)
-                    self.progress.emit(current_progress)
-            
-            process.wait()
-            
-            if process.returncode == 0:
-                self.progress.emit(100)
-                self.finished.emit(True, "Chuyển đổi thành công!")
-            else:
-                error_lines = [line for line in all_output if 'error' in line.lower() or 'failed' in line.lower()]
-                error_msg = '\n'.join(error_lines[-5:]) if error_lines else '\n'.join(all_output[-10:])
-                self.finished.emit(False, f"PyInstaller lỗi (code {process.returncode}):\n\n{error_msg}")
-                
+            self.done.emit(graph.top_level_names())
+        except Exception as e:
+            print(f"Lỗi phân tích file: {e}")
+            self.done.emit(set())
+
+
+class ExcludeThread(AnalyzeThread):
+    """Đề xuất exclude dựa trên module index của interpreter đích"""
+    proposed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, file_path, roots):
+        super().__init__(file_path)
+        self.roots = roots
+    
+    def run(self):
+        from pydeloy import module_index
+        try:
+            candidates, _ = module_index.propose_excludes(
+                self.file_path, self.roots, parse_many=self.parse_many)
+            self.proposed.emit(candidates)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class SizeReportThread(AnalyzeThread):
+    """Đọc artifact trong workpath và tìm package có thể exclude"""
+    ready = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, file_path, build_dir, roots, used_modules):
+        super().__init__(file_path)
+        self.build_dir = build_dir
+        self.roots = roots
+        self.used_modules = used_modules
+    
+    def run(self):
+        from pydeloy import bundle_report, module_index
+        try:
+            report = bundle_report.analyze_build(self.build_dir)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        
+        try:
+            candidates, _ = module_index.propose_excludes(
+                self.file_path, self.roots, parse_many=self.parse_many)
+            names = [name for name, _, _ in candidates]
+        except Exception as e:
+            print(f"Lỗi index module: {e}")
+            # Không index được interpreter: chỉ loại các module project import trực tiếp
+            names = {entry.package for entry in report.entries if entry.kind in ('module', 'extension')}
+            names -= self.used_modules | set(module_index.BASE_MODULES)
+        
+        self.ready.emit(report, bundle_report.suggest_excludes(report, names))
+
+
+class ImportTraceThread(QThread):
+    """Chạy thử script với import hook, so với phân tích tĩnh"""
+    done = pyqtSignal(object, object, object, str)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, options, args, timeout):
+        super().__init__()
+        self.options = options
+        self.args = args
+        self.timeout = timeout
+    
+    def run(self):
+        from pydeloy import import_trace
+        try:
+            result, missing, suggestions, source = import_trace.trace_options(
+                self.options, self.args, self.timeout)
         except Exception as e:
-            self.finished.emit(False, f"Lỗi: {str(e)}")
+            self.failed.emit(str(e))
+            return
+        self.done.emit(result, missing, suggestions, source)
+
+
+class MinimalPlanThread(QThread):
+    """Chạy lệnh smoke dưới import trace rồi tính exclude cho minimal bundle"""
+    planned = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, options, args, timeout):
+        super().__init__()
+        self.options = options
+        self.args = args
+        self.timeout = timeout
+    
+    def run(self):
+        from pydeloy import minimal_bundle
+        try:
+            result = minimal_bundle.smoke_run(self.options, self.args, self.timeout)
+            plan = minimal_bundle.make_plan(self.options, result)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.planned.emit(plan, result)
+
+
+class VerifyThread(QThread):
+    """Chạy lại lệnh smoke với bản vừa build"""
+    verified = pyqtSignal(bool, str, str)
+    
+    def __init__(self, options, result, args, timeout):
+        super().__init__()
+        self.options = options
+        self.result = result
+        self.args = args
+        self.timeout = timeout
+    
+    def run(self):
+        from pydeloy import minimal_bundle
+        self.verified.emit(*minimal_bundle.verify(self.options, self.result, self.args, self.timeout))
+
+
+class WarnReportThread(QThread):
+    """Đọc warn/xref file của build vừa xong thành báo cáo module thiếu"""
+    ready = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    
+    def __init__(self, options):
+        super().__init__()
+        self.options = options
+    
+    def run(self):
+        from pydeloy import warn_report
+        try:
+            report = warn_report.load_report(self.options)
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+        self.ready.emit(report)
+
+
+class BenchmarkThread(QThread):
+    """Chạy artifact nhiều lần để đo thời gian khởi động"""
+    run_done = pyqtSignal(int, object)
+    finished = pyqtSignal(object)
+    
+    def __init__(self, artifact, options, runs, timeout, args):
+        super().__init__()
+        self.artifact = artifact
+        self.options = options
+        self.runs = runs
+        self.timeout = timeout
+        self.args = args
+    
+    def run(self):
+        from pydeloy import benchmark
+        summary = benchmark.run_benchmark(self.artifact, self.runs, self.timeout, self.args,
+                                          on_run=self.run_done.emit)
+        self.finished.emit(benchmark.record(self.artifact, self.options, summary))
+
+
+class ToolchainThread(QThread):
+    """Probe các toolchain đã đăng ký và tìm thêm interpreter có PyInstaller"""
+    found = pyqtSignal(object)
+    
+    def __init__(self, script_dir):
+        super().__init__()
+        self.script_dir = script_dir
+    
+    def run(self):
+        from pydeloy import toolchains
+        libs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'libs')
+        self.found.emit(toolchains.available(self.script_dir, libs_dir))
+
+
+class MatrixThread(QThread):
+    """Build với nhiều toolchain song song rồi đo khởi động từng artifact"""
+    done = pyqtSignal(object)
+    
+    def __init__(self, options, selected, runs, args, on_output):
+        super().__init__()
+        self.options = options
+        self.selected = selected
+        self.runs = runs
+        self.args = args
+        self.on_output = on_output
+        self.cancel_token = CancelToken()
+    
+    def run(self):
+        from pydeloy import matrix
+        self.done.emit(matrix.run_matrix(self.options, self.selected, runs=self.runs, args=self.args,
+                                         on_output=self.on_output, cancel=self.cancel_token))
+
+
+class NumericItem(QTableWidgetItem):
+    """Ô hiển thị dạng chữ (mặc định là dung lượng) nhưng sort theo giá trị số"""
+    def __init__(self, value, text=None):
+        super().__init__(text or format_size(value))
+        self.setData(Qt.UserRole, value)
+        self.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    
+    def __lt__(self, other):
+        return self.data(Qt.UserRole) < other.data(Qt.UserRole)
+
+
+class HistoryChart(QWidget):
+    """Biểu đồ cột chồng: thời gian từng giai đoạn của các lần build gần nhất"""
+    PHASE_COLORS = {
+        'Setup': QColor(170, 170, 170), 'Analysis': QColor(66, 133, 244),
+        'PYZ': QColor(52, 168, 83), 'PKG': QColor(251, 188, 5),
+        'EXE': QColor(234, 67, 53), 'COLLECT': QColor(155, 81, 224),
+    }
+    MAX_BARS = 40
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.builds = []
+        self.flagged = {}
+        self.setMinimumHeight(180)
+    
+    def set_builds(self, builds, flagged):
+        self.builds = builds[-self.MAX_BARS:]
+        self.flagged = flagged
+        self.update()
+    
+    def paintEvent(self, event):
+        from PyQt5.QtGui import QPainter, QPen
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        rect = self.rect().adjusted(40, 16, -10, -24)
+        painter.fillRect(self.rect(), QColor(255, 255, 255))
+        painter.setPen(QColor(120, 120, 120))
+        painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        painter.drawLine(rect.bottomLeft(), rect.topLeft())
+        
+        if not self.builds:
+            painter.drawText(self.rect(), Qt.AlignCenter, 'No builds recorded yet')
+            return
+        
+        top = max(build['wall'] for build in self.builds) or 1
+        painter.drawText(0, rect.top() + 10, f'{top:.0f}s')
+        painter.drawText(0, rect.bottom(), '0s')
+        
+        slot = rect.width() / self.MAX_BARS
+        bar_width = max(2, int(slot * 0.7))
+        for i, build in enumerate(self.builds):
+            x = int(rect.left() + i * slot + (slot - bar_width) / 2)
+            y = rect.bottom()
+            for phase, seconds in build['phases']:
+                height = int(seconds / top * rect.height())
+                color = self.PHASE_COLORS.get(phase, QColor(120, 120, 120))
+                if not build['success']:
+                    color = color.lighter(160)
+                painter.fillRect(x, y - height, bar_width, height, color)
+                y -= height
+            if build['id'] in self.flagged:
+                painter.setPen(QPen(QColor(200, 0, 0), 2))
+                painter.drawRect(x, y, bar_width, rect.bottom() - y)
+                painter.drawText(x, y - 2, '!')
+        
+        # Chú thích màu các giai đoạn
+        x = rect.left()
+        for phase, color in self.PHASE_COLORS.items():
+            painter.fillRect(x, rect.bottom() + 8, 10, 10, color)
+            painter.setPen(QColor(60, 60, 60))
+            painter.drawText(x + 14, rect.bottom() + 18, phase)
+            x += 20 + painter.fontMetrics().width(phase)
+
+
+class BatchQueue(QObject):
+    """Hàng đợi build nhiều script, chạy tối đa max_workers ConvertThread cùng lúc"""
+    job_started = pyqtSignal(int)
+    job_finished = pyqtSignal(int, bool, str)
+    all_finished = pyqtSignal()
+    
+    def __init__(self, jobs, log, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.jobs = jobs  # list of (PyInstaller args, options)
+        self.log = log
+        # Gán sẵn file log cho mọi job, kể cả job còn phải chờ worker
+        self.log_paths = {i: buildlog.new_log_path(options['name'])
+                          for i, (_, options) in enumerate(jobs)}
+        self.max_workers = max(1, max_workers or os.cpu_count() or 1)
+        self.pending = list(range(len(jobs)))
+        self.running = set()
+        self.threads = []
+        self.results = {}
+        self.cancelled = False
+    
+    def start(self):
+        self._fill_workers()
+    
+    def cancel(self):
+        """Bỏ các job chưa chạy và huỷ các job đang chạy"""
+        self.cancelled = True
+        skipped, self.pending = self.pending, []
+        for index in skipped:
+            self.results[index] = False
+            self.job_finished.emit(index, False, f'Build bị huỷ: {USER_CANCEL}')
+        for thread in self.threads:
+            if thread.isRunning():
+                thread.cancel()
+        if not self.running:
+            self.all_finished.emit()
+    
+    def _fill_workers(self):
+        while self.pending and len(self.running) < self.max_workers:
+            index = self.pending.pop(0)
+            args, options = self.jobs[index]
+            thread = ConvertThread(args, options, self.log.writer(f'[{options["name"]}] '),
+                                   self.log_paths[index])
+            thread.finished.connect(lambda ok, msg, i=index: self._on_job_finished(i, ok, msg))
+            # Giữ tham chiếu tới thread cho đến khi cả batch xong
+            self.threads.append(thread)
+            self.running.add(index)
+            self.job_started.emit(index)
+            thread.start()
+        
+        if not self.pending and not self.running:
+            self.all_finished.emit()
+    
+    def _on_job_finished(self, index, success, message):
+        self.running.discard(index)
+        self.results[index] = success
+        self.job_finished.emit(index, success, message)
+        self._fill_workers()
+
+
+class StartupTimer(QObject):
+    """In thời gian tới lần vẽ đầu tiên của cửa sổ (--startup-time)"""
+    
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        QApplication.instance().installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if (event.type() == QEvent.Paint and isinstance(obj, QWidget)
+                and obj.window() is self.window):
+            QApplication.instance().removeEventFilter(self)
+            # Đợi các widget còn lại vẽ xong frame đầu tiên
+            QTimer.singleShot(0, self.report)
+        return False
+    
+    def report(self):
+        since_import = (time.perf_counter() - STARTUP_START) * 1000
+        age = procstats.process_age()
+        if age is not None:
+            print(f'Startup: first paint {age * 1000:.0f} ms after process start '
+                  f'({since_import:.0f} ms after module import)', flush=True)
+        else:
+            print(f'Startup: first paint {since_import:.0f} ms after module import', flush=True)
 
 
 class PyToExeConverter(QMainWindow):
+    MAX_PROPOSED_EXCLUDES = 20
+    # Số dòng tối đa trong Log tab
+    LOG_VIEW_LINES = 5000
+    PHASE_LABELS = {
+        'Setup': 'Initializing', 'Analysis': 'Analyzing dependencies',
+        'PYZ': 'Building PYZ archive', 'PKG': 'Packing files (PKG)',
+        'EXE': 'Building executable', 'COLLECT': 'Collecting files',
+    }
+    
     def __init__(self):
         super().__init__()
         self.selected_file = None
         self.convert_thread = None
+        self.batch_queue = None
+        self.log_buffer = LogBuffer()
+        self.build_logs = []
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(FLUSH_INTERVAL_MS)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.command_model = CommandModel()
+        self.command_timer = QTimer(self)
+        self.command_timer.setSingleShot(True)
+        self.command_timer.setInterval(DEBOUNCE_MS)
+        self.command_timer.timeout.connect(self.refresh_command)
+        self.analyze_thread = None
+        self.analyze_threads = []
+        self.exclude_thread = None
+        self.size_thread = None
+        self.size_report = None
+        self.last_build_options = None
+        self.benchmark_thread = None
+        self.trace_thread = None
+        self.minimal_thread = None
+        self.verify_thread = None
+        self.warn_thread = None
+        self.warn_report = None
+        self.toolchain_thread = None
+        self.matrix_thread = None
+        self.toolchains = []
+        # (args, timeout, TraceResult) của lệnh smoke khi đang dùng minimal bundle
+        self.minimal_smoke = None
         self.used_modules = set()
         self.output_dir = "dist"
+        
+        # Widget của các tab tạo lười, None cho đến khi tab được mở
+        self.lazy_tabs = {}
+        self.command_display = None
+        self.spec_editor = None
+        self.spec_path = None
+        # Số target (Analysis) trong spec đang mở
+        self.spec_targets = 1
+        self.log_display = None
+        self.run_batch_btn = None
+        self.run_bundle_btn = None
+        self.size_table = None
+        self.trace_table = None
+        self.warn_tree = None
+        self.history_table = None
+        self.size_status = 'Build a script to see its size breakdown'
+        self.warn_status = 'Build a script to see the modules PyInstaller could not find'
+        self.size_suggestions = []
+        
         self.init_ui()
         self.setAcceptDrops(True)
-    
-    def analyze_imports(self, file_path):
-        """Phân tích file Python để tìm modules được import"""
-        imports = set()
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                tree = ast.parse(f.read(), filename=file_path)
-            
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.add(alias.name.split('.')[0])
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.add(node.module.split('.')[0])
-            
-            return imports
-        except Exception as e:
-            print(f"Lỗi phân tích file: {e}")
-            return set()
+        # Phiên bản PyInstaller dùng cho cache/incremental, hỏi trước để preview lệnh không phải chờ
+        build_cache.prefetch_toolchain(config.DEFAULT_OPTIONS['backend'])
     
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
@@ -189,6 +608,37 @@ class PyToExeConverter(QMainWindow):
         self.clean_build_cb.setChecked(True)
         basic_layout.addWidget(self.clean_build_cb)
         
+        self.incremental_cb = QCheckBox('Incremental build (reuse per-script workpath)')
+        self.incremental_cb.toggled.connect(lambda checked: self.clean_build_cb.setEnabled(not checked))
+        basic_layout.addWidget(self.incremental_cb)
+        
+        self.cache_cb = QCheckBox('Skip unchanged builds (cache)')
+        self.cache_cb.setChecked(True)
+        basic_layout.addWidget(self.cache_cb)
+        
+        self.api_backend_cb = QCheckBox('Reuse a PyInstaller worker process (no shell)')
+        basic_layout.addWidget(self.api_backend_cb)
+        
+        self.shared_analysis_cb = QCheckBox('Share dependency analysis across project scripts')
+        self.shared_analysis_cb.setChecked(True)
+        self.shared_analysis_cb.setEnabled(False)
+        self.api_backend_cb.toggled.connect(self.shared_analysis_cb.setEnabled)
+        self.api_backend_cb.toggled.connect(
+            lambda api: build_cache.prefetch_toolchain('api' if api else 'subprocess'))
+        basic_layout.addWidget(self.shared_analysis_cb)
+        
+        timeout_row = QHBoxLayout()
+        timeout_label = QLabel('Build timeout:')
+        timeout_label.setMinimumWidth(110)
+        timeout_row.addWidget(timeout_label)
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(0, 240)
+        self.timeout_spin.setSuffix(' min')
+        self.timeout_spin.setSpecialValueText('No limit')
+        timeout_row.addWidget(self.timeout_spin)
+        timeout_row.addStretch()
+        basic_layout.addLayout(timeout_row)
+        
         # Separator
         line = QFrame()
         line.setFrameShape(QFrame.HLine)
@@ -201,9 +651,7 @@ class PyToExeConverter(QMainWindow):
         gui_label.setMinimumWidth(110)
         gui_row.addWidget(gui_label)
         self.gui_combo = QComboBox()
-        self.gui_combo.addItems(['None', 'Tkinter', 'CustomTkinter',
-                                 'PyQt5', 'PyQt6', 'PySide2', 'PySide6',
-                                 'Kivy', 'Pygame'])
+        self.gui_combo.addItems(config.GUI_FRAMEWORKS)
         gui_row.addWidget(self.gui_combo)
         basic_layout.addLayout(gui_row)
         
@@ -260,14 +708,7 @@ class PyToExeConverter(QMainWindow):
         self.exclude_list.setMaximumHeight(140)
         self.exclude_list.setSelectionMode(QListWidget.MultiSelection)
         
-        self.common_excludes = [
-            'unittest', 'test', 'doctest', 'pydoc',
-            'tkinter', 'PyQt5', 'PyQt6', 'PySide2', 
-            'PySide6', 'matplotlib', 'scipy', 'pandas',
-            'numpy', 'PIL', 'wx', 'sqlite3', 'email'
-        ]
-        
-        for module in self.common_excludes:
+        for module in config.COMMON_EXCLUDES:
             item = QListWidgetItem(module)
             item.setData(Qt.UserRole, module)
             self.exclude_list.addItem(item)
@@ -278,58 +719,47 @@ class PyToExeConverter(QMainWindow):
         self.custom_exclude_input.setPlaceholderText('Custom modules...')
         advanced_layout.addWidget(self.custom_exclude_input)
         
+        advanced_layout.addWidget(QLabel('Data files / extra binaries (src:dest, comma separated):'))
+        self.datas_input = QLineEdit()
+        self.datas_input.setPlaceholderText('assets:assets, config.json:.')
+        advanced_layout.addWidget(self.datas_input)
+        self.binaries_input = QLineEdit()
+        self.binaries_input.setPlaceholderText('libs/native.so:.')
+        advanced_layout.addWidget(self.binaries_input)
+        
+        advanced_layout.addWidget(QLabel('Drop from bundle (glob, builds through a .spec):'))
+        self.binary_filter_input = QLineEdit()
+        self.binary_filter_input.setPlaceholderText('Binaries by bundle path: *libQt5Network*, *libcrypto*')
+        advanced_layout.addWidget(self.binary_filter_input)
+        self.pure_filter_input = QLineEdit()
+        self.pure_filter_input.setPlaceholderText('Python modules in the PYZ: numpy.*.tests*, *.tests')
+        advanced_layout.addWidget(self.pure_filter_input)
+        
         advanced_layout.addStretch()
         advanced_tab.setLayout(advanced_layout)
         self.tabs.addTab(advanced_tab, "Advanced")
         
-        # Tab 3: Command
-        command_tab = QWidget()
-        command_layout = QVBoxLayout()
-        command_layout.setSpacing(10)
-        command_layout.setContentsMargins(10, 10, 10, 10)
-        
-        command_layout.addWidget(QLabel('PyInstaller Command:'))
-        
-        self.command_display = QTextEdit()
-        self.command_display.setReadOnly(True)
-        cmd_font = QFont("Courier New", 9)
-        self.command_display.setFont(cmd_font)
-        command_layout.addWidget(self.command_display)
-        
-        copy_cmd_btn = QPushButton('Copy Command')
-        copy_cmd_btn.clicked.connect(self.copy_command_text)
-        command_layout.addWidget(copy_cmd_btn)
-        
-        command_tab.setLayout(command_layout)
-        self.tabs.addTab(command_tab, "Command")
-        
-        # Tab 4: Log
-        log_tab = QWidget()
-        log_layout = QVBoxLayout()
-        log_layout.setSpacing(10)
-        log_layout.setContentsMargins(10, 10, 10, 10)
-        
-        log_layout.addWidget(QLabel('Output Log:'))
-        
-        self.log_display = QTextEdit()
-        self.log_display.setReadOnly(True)
-        log_font = QFont("Courier New", 9)
-        self.log_display.setFont(log_font)
-        log_layout.addWidget(self.log_display)
-        
-        clear_log_btn = QPushButton('Clear Log')
-        clear_log_btn.clicked.connect(self.log_display.clear)
-        log_layout.addWidget(clear_log_btn)
-        
-        log_tab.setLayout(log_layout)
-        self.tabs.addTab(log_tab, "Log")
+        # Tab 3+: build lazily on first activation
+        self.add_lazy_tab('Command', self.init_command_tab)
+        self.add_lazy_tab('Spec', self.init_spec_tab)
+        self.add_lazy_tab('Log', self.init_log_tab)
+        self.add_lazy_tab('Batch', self.init_batch_tab)
+        self.add_lazy_tab('Size', self.init_size_tab)
+        self.add_lazy_tab('Imports', self.init_trace_tab)
+        self.add_lazy_tab('Warnings', self.init_warn_tab)
+        self.add_lazy_tab('Benchmark', self.init_bench_tab)
+        self.add_lazy_tab('Matrix', self.init_matrix_tab)
+        self.add_lazy_tab('History', self.init_history_tab)
+        self.tabs.currentChanged.connect(self.build_lazy_tab)
         
         main_layout.addWidget(self.tabs)
         
         # Connect signals
-        for widget in [self.onefile_cb, self.noconsole_cb, self.clean_build_cb]:
+        for widget in [self.onefile_cb, self.noconsole_cb, self.clean_build_cb, self.incremental_cb]:
             widget.stateChanged.connect(self.update_command)
-        for widget in [self.name_input, self.icon_input, self.hidden_input, self.custom_exclude_input]:
+        for widget in [self.name_input, self.icon_input, self.hidden_input, self.custom_exclude_input,
+                       self.datas_input, self.binaries_input, self.binary_filter_input,
+                       self.pure_filter_input]:
             widget.textChanged.connect(self.update_command)
         self.gui_combo.currentTextChanged.connect(self.update_command)
         self.exclude_list.itemSelectionChanged.connect(self.update_command)
@@ -365,6 +795,12 @@ class PyToExeConverter(QMainWindow):
         self.convert_btn.setMinimumHeight(32)
         btn_layout.addWidget(self.convert_btn, 2)
         
+        self.cancel_btn = QPushButton('Cancel')
+        self.cancel_btn.clicked.connect(self.cancel_build)
+        self.cancel_btn.setEnabled(False)
+        self.cancel_btn.setMinimumHeight(32)
+        btn_layout.addWidget(self.cancel_btn, 1)
+        
         self.open_folder_btn = QPushButton('Open Folder')
         self.open_folder_btn.clicked.connect(self.open_output_folder)
         self.open_folder_btn.setEnabled(False)
@@ -373,8 +809,830 @@ class PyToExeConverter(QMainWindow):
         
         main_layout.addLayout(btn_layout)
     
+    def add_lazy_tab(self, title, builder):
+        """Thêm tab rỗng, nội dung chỉ được tạo khi tab được mở lần đầu"""
+        tab = QWidget()
+        self.lazy_tabs[tab] = builder
+        self.tabs.addTab(tab, title)
+    
+    def build_lazy_tab(self, index):
+        tab = self.tabs.widget(index)
+        builder = self.lazy_tabs.pop(tab, None)
+        if builder:
+            builder(tab)
+    
+    def show_tab(self, title):
+        for index in range(self.tabs.count()):
+            if self.tabs.tabText(index) == title:
+                self.tabs.setCurrentIndex(index)
+                # currentChanged không phát nếu tab đã đang mở
+                self.build_lazy_tab(index)
+                return
+    
+    def init_command_tab(self, tab):
+        from PyQt5.QtWidgets import QPlainTextEdit
+        command_layout = QVBoxLayout()
+        command_layout.setSpacing(10)
+        command_layout.setContentsMargins(10, 10, 10, 10)
+        
+        command_layout.addWidget(QLabel('PyInstaller Command:'))
+        
+        self.command_display = QPlainTextEdit()
+        self.command_display.setReadOnly(True)
+        cmd_font = QFont("Courier New", 9)
+        self.command_display.setFont(cmd_font)
+        command_layout.addWidget(self.command_display)
+        
+        copy_cmd_btn = QPushButton('Copy Command')
+        copy_cmd_btn.clicked.connect(self.copy_command_text)
+        command_layout.addWidget(copy_cmd_btn)
+        
+        tab.setLayout(command_layout)
+        self.refresh_command()
+    
+    def init_spec_tab(self, tab):
+        from PyQt5.QtWidgets import QPlainTextEdit
+        spec_layout = QVBoxLayout()
+        spec_layout.setSpacing(10)
+        spec_layout.setContentsMargins(10, 10, 10, 10)
+        
+        spec_header = QHBoxLayout()
+        self.spec_label = QLabel('No spec file')
+        self.spec_label.setWordWrap(True)
+        spec_header.addWidget(self.spec_label, 1)
+        generate_spec_btn = QPushButton('Generate from options')
+        generate_spec_btn.clicked.connect(self.generate_spec)
+        spec_header.addWidget(generate_spec_btn)
+        open_spec_btn = QPushButton('Open .spec...')
+        open_spec_btn.clicked.connect(self.open_spec)
+        spec_header.addWidget(open_spec_btn)
+        save_spec_btn = QPushButton('Save')
+        save_spec_btn.clicked.connect(self.save_spec)
+        spec_header.addWidget(save_spec_btn)
+        spec_layout.addLayout(spec_header)
+        
+        self.spec_editor = QPlainTextEdit()
+        self.spec_editor.setFont(QFont("Courier New", 9))
+        self.spec_editor.setLineWrapMode(QPlainTextEdit.NoWrap)
+        spec_layout.addWidget(self.spec_editor)
+        
+        self.spec_warnings = QLabel()
+        self.spec_warnings.setWordWrap(True)
+        self.spec_warnings.setStyleSheet('color: #a05000;')
+        spec_layout.addWidget(self.spec_warnings)
+        
+        self.use_spec_cb = QCheckBox('Convert builds from this spec file (including manual edits)')
+        self.use_spec_cb.stateChanged.connect(self.update_command)
+        spec_layout.addWidget(self.use_spec_cb)
+        
+        tab.setLayout(spec_layout)
+    
+    def generate_spec(self):
+        from pydeloy import spec_file
+        if not self.selected_file:
+            QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
+            return
+        options = self.collect_options()
+        self.spec_path = spec_file.spec_path(options)
+        self.spec_targets = 1
+        self.spec_label.setText(f'{self.spec_path} (not saved)')
+        self.spec_editor.setPlainText(spec_file.generate_spec(options))
+        self.spec_warnings.clear()
+    
+    def open_spec(self):
+        from PyQt5.QtWidgets import QFileDialog
+        path, _ = QFileDialog.getOpenFileName(self, 'Open spec file', '', 'Spec Files (*.spec)')
+        if path:
+            self.load_spec(path)
+    
+    def load_spec(self, path):
+        """Đọc spec vào editor và điền option của target đầu tiên lên GUI"""
+        from pydeloy import spec_file
+        try:
+            targets, warnings = spec_file.parse_spec(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, spec_file.SpecError) as e:
+            QMessageBox.warning(self, 'Spec', str(e))
+            return
+        if len(targets) > 1:
+            warnings.insert(0, f'{len(targets)} targets, the options show the first one '
+                               f'({targets[0]["name"]}); Convert builds all of them')
+        self.spec_path = path
+        self.spec_targets = len(targets)
+        self.spec_label.setText(path)
+        self.spec_editor.setPlainText(text)
+        self.spec_warnings.setText('\n'.join(warnings))
+        self.apply_options(targets[0])
+        self.use_spec_cb.setChecked(True)
+    
+    def save_spec(self):
+        from pydeloy import spec_file
+        if self.spec_editor is None:
+            return
+        if not self.spec_path:
+            self.generate_spec()
+            if not self.spec_path:
+                return
+        try:
+            with open(self.spec_path, 'w', encoding='utf-8') as f:
+                f.write(self.spec_editor.toPlainText())
+        except OSError as e:
+            QMessageBox.warning(self, 'Spec', str(e))
+            return
+        self.spec_label.setText(self.spec_path)
+        # Bản sửa tay có thể thêm/bỏ target
+        try:
+            self.spec_targets = len(spec_file.parse_spec(self.spec_path)[0])
+        except (OSError, spec_file.SpecError):
+            pass
+    
+    def apply_options(self, options):
+        """Điền dict option (vd. đọc từ spec) lên các widget"""
+        self.name_input.setText(options['name'])
+        self.load_python_file(options['script'])
+        self.icon_input.setText(options['icon'])
+        self.onefile_cb.setChecked(options['onefile'])
+        self.noconsole_cb.setChecked(options['noconsole'])
+        self.gui_combo.setCurrentText(options['gui'])
+        self.hidden_input.setText(', '.join(options['hidden_imports']))
+        self.set_excludes(options['excludes'])
+        self.datas_input.setText(config.format_pairs(options['datas']))
+        self.binaries_input.setText(config.format_pairs(options['binaries']))
+        self.binary_filter_input.setText(', '.join(options['binary_excludes']))
+        self.pure_filter_input.setText(', '.join(options['pure_excludes']))
+    
+    def set_excludes(self, names):
+        """Chọn module trong exclude list, phần không có trong list vào ô custom"""
+        listed = set()
+        for i in range(self.exclude_list.count()):
+            item = self.exclude_list.item(i)
+            item.setSelected(item.data(Qt.UserRole) in names)
+            listed.add(item.data(Qt.UserRole))
+        self.custom_exclude_input.setText(', '.join(name for name in names if name not in listed))
+    
+    def init_log_tab(self, tab):
+        from PyQt5.QtWidgets import QPlainTextEdit
+        log_layout = QVBoxLayout()
+        log_layout.setSpacing(10)
+        log_layout.setContentsMargins(10, 10, 10, 10)
+        
+        log_layout.addWidget(QLabel('Output Log:'))
+        
+        # Chỉ giữ LOG_VIEW_LINES dòng cuối, log đầy đủ nằm trên đĩa
+        self.log_display = QPlainTextEdit()
+        self.log_display.setReadOnly(True)
+        self.log_display.setMaximumBlockCount(self.LOG_VIEW_LINES)
+        log_font = QFont("Courier New", 9)
+        self.log_display.setFont(log_font)
+        log_layout.addWidget(self.log_display)
+        
+        log_btn_layout = QHBoxLayout()
+        clear_log_btn = QPushButton('Clear Log')
+        clear_log_btn.clicked.connect(self.log_display.clear)
+        log_btn_layout.addWidget(clear_log_btn)
+        save_log_btn = QPushButton('Save Full Log...')
+        save_log_btn.clicked.connect(self.save_full_log)
+        log_btn_layout.addWidget(save_log_btn)
+        log_layout.addLayout(log_btn_layout)
+        
+        tab.setLayout(log_layout)
+    
+    def init_batch_tab(self, tab):
+        batch_layout = QVBoxLayout()
+        batch_layout.setSpacing(10)
+        batch_layout.setContentsMargins(10, 10, 10, 10)
+        
+        batch_layout.addWidget(QLabel('Build queue (each script keeps its own options):'))
+        
+        self.batch_list = QListWidget()
+        self.batch_list.setSelectionMode(QListWidget.ExtendedSelection)
+        batch_layout.addWidget(self.batch_list)
+        
+        batch_btn_row = QHBoxLayout()
+        add_current_btn = QPushButton('Add current')
+        add_current_btn.clicked.connect(self.add_current_to_batch)
+        batch_btn_row.addWidget(add_current_btn)
+        add_files_btn = QPushButton('Add files...')
+        add_files_btn.clicked.connect(self.add_files_to_batch)
+        batch_btn_row.addWidget(add_files_btn)
+        remove_batch_btn = QPushButton('Remove')
+        remove_batch_btn.clicked.connect(self.remove_from_batch)
+        batch_btn_row.addWidget(remove_batch_btn)
+        batch_layout.addLayout(batch_btn_row)
+        
+        workers_row = QHBoxLayout()
+        workers_label = QLabel('Parallel jobs:')
+        workers_label.setMinimumWidth(110)
+        workers_row.addWidget(workers_label)
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 64)
+        self.workers_spin.setValue(os.cpu_count() or 1)
+        workers_row.addWidget(self.workers_spin)
+        workers_row.addStretch()
+        self.run_batch_btn = QPushButton('Run batch')
+        self.run_batch_btn.clicked.connect(self.run_batch)
+        workers_row.addWidget(self.run_batch_btn)
+        batch_layout.addLayout(workers_row)
+        
+        bundle_row = QHBoxLayout()
+        bundle_label = QLabel('Bundle name:')
+        bundle_label.setMinimumWidth(110)
+        bundle_row.addWidget(bundle_label)
+        self.bundle_name_input = QLineEdit()
+        self.bundle_name_input.setPlaceholderText('suite')
+        self.bundle_name_input.setToolTip('Build every queued script into one folder: one executable '
+                                          'per script, binaries and libraries shared')
+        bundle_row.addWidget(self.bundle_name_input)
+        self.run_bundle_btn = QPushButton('Build as one bundle')
+        self.run_bundle_btn.clicked.connect(self.run_bundle)
+        bundle_row.addWidget(self.run_bundle_btn)
+        batch_layout.addLayout(bundle_row)
+        
+        tab.setLayout(batch_layout)
+    
+    def init_size_tab(self, tab):
+        from PyQt5.QtWidgets import QTableWidget, QHeaderView
+        size_layout = QVBoxLayout()
+        size_layout.setSpacing(10)
+        size_layout.setContentsMargins(10, 10, 10, 10)
+        
+        size_header = QHBoxLayout()
+        self.size_summary = QLabel(self.size_status)
+        size_header.addWidget(self.size_summary)
+        size_header.addStretch()
+        self.size_view_combo = QComboBox()
+        self.size_view_combo.addItems(['Packages', 'Files'])
+        self.size_view_combo.currentTextChanged.connect(self.fill_size_table)
+        size_header.addWidget(self.size_view_combo)
+        size_layout.addLayout(size_header)
+        
+        self.size_table = QTableWidget(0, 4)
+        self.size_table.setHorizontalHeaderLabels(['Name', 'Size', 'Items', 'Share'])
+        self.size_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.size_table.verticalHeader().setVisible(False)
+        self.size_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.size_table.setSortingEnabled(True)
+        size_layout.addWidget(self.size_table)
+        
+        size_layout.addWidget(QLabel('Suggested --exclude-module candidates:'))
+        self.size_suggest_list = QListWidget()
+        self.size_suggest_list.setMaximumHeight(90)
+        self.size_suggest_list.setSelectionMode(QListWidget.MultiSelection)
+        size_layout.addWidget(self.size_suggest_list)
+        
+        add_suggest_btn = QPushButton('Add selected to excludes')
+        add_suggest_btn.clicked.connect(self.add_suggested_excludes)
+        size_layout.addWidget(add_suggest_btn)
+        
+        tab.setLayout(size_layout)
+        if self.size_report:
+            self.show_size_report()
+    
+    def init_trace_tab(self, tab):
+        from PyQt5.QtWidgets import QTableWidget, QHeaderView
+        from pydeloy import import_trace
+        trace_layout = QVBoxLayout()
+        trace_layout.setSpacing(10)
+        trace_layout.setContentsMargins(10, 10, 10, 10)
+        
+        trace_row = QHBoxLayout()
+        trace_row.addWidget(QLabel('Time limit (s):'))
+        self.trace_timeout_spin = QSpinBox()
+        self.trace_timeout_spin.setRange(1, 600)
+        self.trace_timeout_spin.setValue(import_trace.DEFAULT_TIMEOUT)
+        trace_row.addWidget(self.trace_timeout_spin)
+        trace_row.addStretch()
+        trace_layout.addLayout(trace_row)
+        
+        self.trace_args_input = QLineEdit()
+        self.trace_args_input.setPlaceholderText('Arguments for the traced run, e.g. --selftest')
+        trace_layout.addWidget(self.trace_args_input)
+        
+        self.trace_btn = QPushButton('Trace imports')
+        self.trace_btn.setToolTip('Run the script once (headless, in a temporary home folder) '
+                                  'and record every module it loads')
+        self.trace_btn.clicked.connect(self.run_import_trace)
+        trace_layout.addWidget(self.trace_btn)
+        
+        self.trace_status = QLabel('Modules loaded at run time that static analysis misses')
+        self.trace_status.setWordWrap(True)
+        trace_layout.addWidget(self.trace_status)
+        
+        self.trace_table = QTableWidget(0, 3)
+        self.trace_table.setHorizontalHeaderLabels(['Module', 'How', 'Imported by'])
+        self.trace_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.trace_table.verticalHeader().setVisible(False)
+        self.trace_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.trace_table.itemChanged.connect(self.on_trace_item_changed)
+        trace_layout.addWidget(self.trace_table)
+        
+        self.minimal_btn = QPushButton('Plan minimal bundle')
+        self.minimal_btn.setToolTip('Run the script with the arguments above as a smoke test and '
+                                    'exclude every module it did not load (needs a previous build). '
+                                    'Convert then runs the smoke test again on the frozen app.')
+        self.minimal_btn.clicked.connect(self.plan_minimal_bundle)
+        trace_layout.addWidget(self.minimal_btn)
+        
+        tab.setLayout(trace_layout)
+    
+    def run_import_trace(self):
+        if not self.selected_file:
+            QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
+            return
+        
+        self.trace_btn.setEnabled(False)
+        self.trace_btn.setText('Tracing...')
+        self.trace_status.setText(f'Running the script for up to {self.trace_timeout_spin.value()} s...')
+        self.trace_thread = ImportTraceThread(self.collect_options(), self.trace_args_input.text().split(),
+                                              self.trace_timeout_spin.value())
+        self.trace_thread.done.connect(self.on_import_trace)
+        self.trace_thread.failed.connect(self.on_import_trace_failed)
+        self.trace_thread.start()
+    
+    def on_import_trace_failed(self, message):
+        self.trace_btn.setEnabled(True)
+        self.trace_btn.setText('Trace imports')
+        self.trace_status.setText(f'Trace failed: {message}')
+    
+    def on_import_trace(self, result, missing, suggestions, source):
+        from PyQt5.QtWidgets import QHeaderView
+        self.trace_btn.setEnabled(True)
+        self.trace_btn.setText('Trace imports')
+        
+        # Điền sẵn hidden import đề xuất, bỏ tick trong bảng để gỡ lại
+        hidden = self.hidden_imports()
+        added = [name for name in suggestions if name not in hidden]
+        self.set_hidden_imports(hidden + added)
+        
+        if result.timed_out:
+            status = f'stopped after {self.trace_timeout_spin.value()} s'
+        else:
+            status = f'exit code {result.returncode}'
+        self.trace_status.setText(
+            f'{len(result.modules)} modules loaded ({status}), {len(missing)} missing from '
+            f'{source}. Added {len(added)} hidden import(s).')
+        self.trace_status.setToolTip(result.output[-3000:])
+        
+        hidden = set(self.hidden_imports())
+        self.trace_table.blockSignals(True)
+        self.trace_table.setRowCount(len(missing))
+        for row, module in enumerate(missing):
+            item = QTableWidgetItem(module.name)
+            item.setData(Qt.UserRole, module.name)
+            item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if module.name in hidden else Qt.Unchecked)
+            item.setToolTip(module.origin or '')
+            self.trace_table.setItem(row, 0, item)
+            self.trace_table.setItem(row, 1, QTableWidgetItem(module.how))
+            self.trace_table.setItem(row, 2, QTableWidgetItem(module.importer or ''))
+        self.trace_table.blockSignals(False)
+        self.trace_table.resizeColumnsToContents()
+        self.trace_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+    
+    def plan_minimal_bundle(self):
+        if not self.selected_file:
+            QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
+            return
+        
+        self.minimal_btn.setEnabled(False)
+        self.minimal_btn.setText('Running smoke test...')
+        self.minimal_thread = MinimalPlanThread(self.collect_options(), self.trace_args_input.text().split(),
+                                                self.trace_timeout_spin.value())
+        self.minimal_thread.planned.connect(self.on_minimal_plan)
+        self.minimal_thread.failed.connect(self.on_minimal_plan_failed)
+        self.minimal_thread.start()
+    
+    def on_minimal_plan_failed(self, message):
+        self.minimal_btn.setEnabled(True)
+        self.minimal_btn.setText('Plan minimal bundle')
+        QMessageBox.warning(self, 'Minimal bundle', message)
+    
+    def on_minimal_plan(self, plan, result):
+        self.minimal_btn.setEnabled(True)
+        self.minimal_btn.setText('Plan minimal bundle')
+        self.apply_options(plan.apply(self.collect_options()))
+        self.minimal_smoke = (self.minimal_thread.args, self.minimal_thread.timeout, result)
+        self.trace_status.setText(f'{plan.summary()}. Convert to build and verify it.')
+    
+    def start_minimal_verify(self, options):
+        args, timeout, result = self.minimal_smoke
+        self.log_display.appendPlainText('Running the smoke test on the frozen app...')
+        self.verify_thread = VerifyThread(options, result, args, timeout)
+        self.verify_thread.verified.connect(self.on_minimal_verified)
+        self.verify_thread.start()
+    
+    def on_minimal_verified(self, ok, message, output):
+        self.log_display.appendPlainText(message)
+        if self.trace_table is not None:
+            self.trace_status.setText(message)
+        if not ok:
+            box = QMessageBox(self)
+            box.setIcon(QMessageBox.Warning)
+            box.setWindowTitle('Minimal bundle')
+            box.setText(f'{message}.\nA module the app needs may have been stripped; '
+                        f'remove it from the excludes or filters and convert again.')
+            box.setDetailedText(output[-5000:])
+            box.exec_()
+    
+    def on_trace_item_changed(self, item):
+        if item.column() != 0:
+            return
+        name = item.data(Qt.UserRole)
+        hidden = [h for h in self.hidden_imports() if h != name]
+        if item.checkState() == Qt.Checked:
+            hidden.append(name)
+        self.set_hidden_imports(hidden)
+    
+    def hidden_imports(self):
+        return [h.strip() for h in self.hidden_input.text().split(',') if h.strip()]
+    
+    def set_hidden_imports(self, names):
+        self.hidden_input.setText(', '.join(names))
+    
+    def init_warn_tab(self, tab):
+        from PyQt5.QtWidgets import QHeaderView, QTreeWidget
+        warn_layout = QVBoxLayout()
+        warn_layout.setSpacing(10)
+        warn_layout.setContentsMargins(10, 10, 10, 10)
+        
+        warn_header = QHBoxLayout()
+        self.warn_summary = QLabel(self.warn_status)
+        self.warn_summary.setWordWrap(True)
+        warn_header.addWidget(self.warn_summary, 1)
+        self.warn_filter_combo = QComboBox()
+        self.warn_filter_combo.addItems(['Critical', 'Optional', 'Other platform', 'All'])
+        self.warn_filter_combo.currentTextChanged.connect(self.fill_warn_tree)
+        warn_header.addWidget(self.warn_filter_combo)
+        warn_layout.addLayout(warn_header)
+        
+        self.warn_tree = QTreeWidget()
+        self.warn_tree.setHeaderLabels(['Module', 'Import kind', 'Category', 'Fix'])
+        self.warn_tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.warn_tree.setSelectionMode(QTreeWidget.ExtendedSelection)
+        self.warn_tree.itemDoubleClicked.connect(lambda item, column: self.apply_warn_fixes([item]))
+        warn_layout.addWidget(self.warn_tree)
+        
+        apply_btn = QPushButton('Apply fix to selected')
+        apply_btn.setToolTip('Add the hidden import, exclude the importing module or stop '
+                             'excluding the module, then convert again')
+        apply_btn.clicked.connect(lambda: self.apply_warn_fixes(self.warn_tree.selectedItems()))
+        warn_layout.addWidget(apply_btn)
+        
+        tab.setLayout(warn_layout)
+        if self.warn_report:
+            self.fill_warn_tree()
+    
+    def start_warn_report(self, options):
+        """Đọc báo cáo module thiếu của build vừa chạy trong nền"""
+        self.set_warn_status('Reading PyInstaller warnings...')
+        self.warn_thread = WarnReportThread(options)
+        self.warn_thread.ready.connect(self.on_warn_report)
+        self.warn_thread.failed.connect(lambda msg: self.set_warn_status(f'Warning report failed: {msg}'))
+        self.warn_thread.start()
+    
+    def set_warn_status(self, text):
+        self.warn_status = text
+        if self.warn_tree is not None:
+            self.warn_summary.setText(text)
+    
+    def on_warn_report(self, report):
+        self.warn_report = report
+        if report is None:
+            self.set_warn_status('PyInstaller did not write a warn file for this build')
+            return
+        self.set_warn_status(report.summary())
+        if self.warn_tree is not None:
+            self.fill_warn_tree()
+    
+    def fill_warn_tree(self):
+        from PyQt5.QtWidgets import QTreeWidgetItem
+        if not self.warn_report or self.warn_tree is None:
+            return
+        from pydeloy import warn_report
+        categories = {
+            'Critical': (warn_report.CRITICAL, warn_report.EXCLUDED),
+            'Optional': (warn_report.OPTIONAL,),
+            'Other platform': (warn_report.PLATFORM,),
+        }.get(self.warn_filter_combo.currentText())
+        
+        self.warn_tree.clear()
+        for importer, modules in self.warn_report.by_importer(categories).items():
+            group = QTreeWidgetItem([importer, '', '', ''])
+            serious = False
+            for module in modules:
+                kinds = next(kinds for name, kinds in module.importers if name == importer)
+                fix = warn_report.describe_fix(module.fix) if module.fix else ''
+                item = QTreeWidgetItem([module.name, ', '.join(sorted(kinds)), module.category, fix])
+                item.setData(0, Qt.UserRole, module.fix)
+                if module.chain:
+                    item.setToolTip(0, ' -> '.join(module.chain))
+                if module.category in (warn_report.CRITICAL, warn_report.EXCLUDED):
+                    item.setForeground(0, QColor(180, 0, 0))
+                    serious = True
+                group.addChild(item)
+            self.warn_tree.addTopLevelItem(group)
+            group.setExpanded(serious)
+        self.warn_tree.resizeColumnToContents(1)
+    
+    def apply_warn_fixes(self, items):
+        from pydeloy import warn_report
+        options = self.collect_options()
+        fixes = {item.data(0, Qt.UserRole) for item in items if item.data(0, Qt.UserRole)}
+        applied = [fix for fix in sorted(fixes) if warn_report.apply_fix(options, fix)]
+        if not applied:
+            return
+        self.set_hidden_imports(options['hidden_imports'])
+        self.set_excludes(options['excludes'])
+        self.update_exclude_list_colors()
+        self.update_command()
+        self.warn_summary.setText(f'Applied: {"; ".join(warn_report.describe_fix(fix) for fix in applied)}. '
+                                  f'Convert again to check.')
+    
+    def init_bench_tab(self, tab):
+        from PyQt5.QtWidgets import QTableWidget
+        bench_layout = QVBoxLayout()
+        bench_layout.setSpacing(10)
+        bench_layout.setContentsMargins(10, 10, 10, 10)
+        
+        bench_row = QHBoxLayout()
+        bench_row.addWidget(QLabel('Runs:'))
+        self.bench_runs_spin = QSpinBox()
+        self.bench_runs_spin.setRange(2, 100)
+        self.bench_runs_spin.setValue(5)
+        bench_row.addWidget(self.bench_runs_spin)
+        bench_row.addWidget(QLabel('Timeout (s):'))
+        self.bench_timeout_spin = QSpinBox()
+        self.bench_timeout_spin.setRange(1, 600)
+        self.bench_timeout_spin.setValue(30)
+        bench_row.addWidget(self.bench_timeout_spin)
+        bench_row.addStretch()
+        bench_layout.addLayout(bench_row)
+        
+        self.bench_args_input = QLineEdit()
+        self.bench_args_input.setPlaceholderText('Arguments for the built app, e.g. --version')
+        bench_layout.addWidget(self.bench_args_input)
+        
+        self.bench_btn = QPushButton('Run benchmark')
+        self.bench_btn.clicked.connect(self.run_benchmark)
+        bench_layout.addWidget(self.bench_btn)
+        
+        self.bench_table = QTableWidget(0, 7)
+        self.bench_table.setHorizontalHeaderLabels(
+            ['Date', 'Mode', 'Excludes', 'Size', 'Cold', 'Warm', 'Peak RSS'])
+        self.bench_table.verticalHeader().setVisible(False)
+        self.bench_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.bench_table.setSortingEnabled(True)
+        bench_layout.addWidget(self.bench_table)
+        
+        tab.setLayout(bench_layout)
+    
+    def init_matrix_tab(self, tab):
+        from PyQt5.QtWidgets import QTableWidget, QHeaderView
+        matrix_layout = QVBoxLayout()
+        matrix_layout.setSpacing(10)
+        matrix_layout.setContentsMargins(10, 10, 10, 10)
+        
+        self.toolchain_table = QTableWidget(0, 4)
+        self.toolchain_table.setHorizontalHeaderLabels(['Toolchain', 'Python', 'PyInstaller', 'Interpreter'])
+        self.toolchain_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.toolchain_table.verticalHeader().setVisible(False)
+        self.toolchain_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.toolchain_table.setMaximumHeight(140)
+        matrix_layout.addWidget(self.toolchain_table)
+        
+        toolchain_row = QHBoxLayout()
+        add_toolchain_btn = QPushButton('Add interpreter...')
+        add_toolchain_btn.setToolTip('Register a Python interpreter (e.g. a venv) that has PyInstaller')
+        add_toolchain_btn.clicked.connect(self.add_toolchain)
+        toolchain_row.addWidget(add_toolchain_btn)
+        refresh_toolchains_btn = QPushButton('Refresh')
+        refresh_toolchains_btn.clicked.connect(self.refresh_toolchains)
+        toolchain_row.addWidget(refresh_toolchains_btn)
+        toolchain_row.addStretch()
+        toolchain_row.addWidget(QLabel('Startup runs:'))
+        self.matrix_runs_spin = QSpinBox()
+        self.matrix_runs_spin.setRange(0, 20)
+        self.matrix_runs_spin.setValue(3)
+        toolchain_row.addWidget(self.matrix_runs_spin)
+        matrix_layout.addLayout(toolchain_row)
+        
+        self.matrix_args_input = QLineEdit()
+        self.matrix_args_input.setPlaceholderText('Arguments for the startup runs, e.g. --version')
+        matrix_layout.addWidget(self.matrix_args_input)
+        
+        self.matrix_btn = QPushButton('Run matrix')
+        self.matrix_btn.setToolTip('Build the script with every ticked toolchain in parallel, each in '
+                                   'build/matrix/<toolchain>, then time the startup of each build')
+        self.matrix_btn.clicked.connect(self.run_matrix)
+        matrix_layout.addWidget(self.matrix_btn)
+        
+        self.matrix_status = QLabel('Tick the toolchains to compare')
+        self.matrix_status.setWordWrap(True)
+        matrix_layout.addWidget(self.matrix_status)
+        
+        self.matrix_table = QTableWidget(0, 8)
+        self.matrix_table.setHorizontalHeaderLabels(
+            ['Toolchain', 'Python', 'PyInstaller', 'Build', 'Size', 'Cold start', 'Warm start', 'Status'])
+        self.matrix_table.horizontalHeader().setSectionResizeMode(7, QHeaderView.Stretch)
+        self.matrix_table.verticalHeader().setVisible(False)
+        self.matrix_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.matrix_table.setSortingEnabled(True)
+        matrix_layout.addWidget(self.matrix_table)
+        
+        tab.setLayout(matrix_layout)
+        self.refresh_toolchains()
+    
+    def refresh_toolchains(self):
+        script_dir = os.path.dirname(self.selected_file) if self.selected_file else None
+        self.matrix_status.setText('Looking for interpreters with PyInstaller...')
+        self.toolchain_thread = ToolchainThread(script_dir)
+        self.toolchain_thread.found.connect(self.on_toolchains_found)
+        self.toolchain_thread.start()
+    
+    def on_toolchains_found(self, toolchains):
+        from PyQt5.QtWidgets import QHeaderView
+        self.toolchains = toolchains
+        self.toolchain_table.setRowCount(len(toolchains))
+        for row, toolchain in enumerate(toolchains):
+            item = QTableWidgetItem(toolchain.name)
+            if toolchain.available:
+                item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                item.setCheckState(Qt.Checked)
+            else:
+                item.setFlags(item.flags() & ~Qt.ItemIsEnabled)
+            self.toolchain_table.setItem(row, 0, item)
+            self.toolchain_table.setItem(row, 1, QTableWidgetItem(toolchain.python or '?'))
+            self.toolchain_table.setItem(row, 2, QTableWidgetItem(toolchain.pyinstaller or 'not installed'))
+            interpreter = toolchain.interpreter
+            if toolchain.path:
+                interpreter += f' (+{os.pathsep.join(toolchain.path)})'
+            self.toolchain_table.setItem(row, 3, QTableWidgetItem(interpreter))
+        self.toolchain_table.resizeColumnsToContents()
+        self.toolchain_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.matrix_status.setText(f'{sum(t.available for t in toolchains)} toolchain(s) with PyInstaller')
+    
+    def add_toolchain(self):
+        from PyQt5.QtWidgets import QFileDialog
+        from pydeloy import toolchains
+        interpreter, _ = QFileDialog.getOpenFileName(self, 'Select Python interpreter')
+        if not interpreter:
+            return
+        try:
+            toolchain = toolchains.register(interpreter)
+        except (RuntimeError, ValueError) as e:
+            QMessageBox.warning(self, 'Toolchain', str(e))
+            return
+        self.matrix_status.setText(f'Registered {toolchain.label()}')
+        self.refresh_toolchains()
+    
+    def selected_toolchains(self):
+        selected = []
+        for row, toolchain in enumerate(self.toolchains):
+            item = self.toolchain_table.item(row, 0)
+            if toolchain.available and item.checkState() == Qt.Checked:
+                selected.append(toolchain)
+        return selected
+    
+    def run_matrix(self):
+        if self.matrix_thread is not None and self.matrix_thread.isRunning():
+            self.matrix_thread.cancel_token.cancel()
+            self.matrix_btn.setEnabled(False)
+            return
+        if not self.selected_file:
+            QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
+            return
+        selected = self.selected_toolchains()
+        if not selected:
+            QMessageBox.warning(self, 'Warning', 'Tick at least one toolchain!')
+            return
+        
+        self.matrix_btn.setText('Cancel matrix')
+        self.matrix_status.setText(f'Building with {len(selected)} toolchain(s) in parallel '
+                                   f'(output in the Log tab)...')
+        self.show_tab('Log')
+        self.log_display.clear()
+        self.matrix_thread = MatrixThread(self.collect_options(), selected, self.matrix_runs_spin.value(),
+                                          self.matrix_args_input.text().split(), self.log_buffer.write)
+        self.matrix_thread.done.connect(self.on_matrix_finished)
+        self.log_timer.start()
+        self.matrix_thread.start()
+    
+    def on_matrix_finished(self, results):
+        from pydeloy import matrix
+        self.log_timer.stop()
+        self.flush_log()
+        self.matrix_btn.setEnabled(True)
+        self.matrix_btn.setText('Run matrix')
+        if self.matrix_thread.cancel_token.cancelled:
+            self.matrix_status.setText('Matrix cancelled')
+            return
+        
+        summary = matrix.format_table(results)[-1]
+        self.matrix_status.setText(summary if summary.startswith('Fastest') else 'Every build failed')
+        self.matrix_table.setSortingEnabled(False)
+        self.matrix_table.setRowCount(len(results))
+        for row, (result, cells) in enumerate(zip(results, matrix.table_rows(results))):
+            # Cột số sort theo giá trị: build, size, cold, warm
+            numbers = {3: result.wall, 4: result.size, 5: result.cold, 6: result.warm}
+            for column, text in enumerate(cells):
+                item = NumericItem(numbers[column] or 0, text) if column in numbers else QTableWidgetItem(text)
+                if not result.success:
+                    item.setForeground(QColor(180, 0, 0))
+                    item.setToolTip(result.message)
+                self.matrix_table.setItem(row, column, item)
+        self.matrix_table.setSortingEnabled(True)
+        self.matrix_table.resizeColumnsToContents()
+    
+    def init_history_tab(self, tab):
+        from PyQt5.QtWidgets import QTableWidget, QSizePolicy
+        history_layout = QVBoxLayout()
+        history_layout.setSpacing(10)
+        history_layout.setContentsMargins(10, 10, 10, 10)
+        
+        history_row = QHBoxLayout()
+        history_row.addWidget(QLabel('Options:'))
+        self.history_combo = QComboBox()
+        self.history_combo.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.history_combo.currentIndexChanged.connect(self.fill_history)
+        history_row.addWidget(self.history_combo)
+        refresh_btn = QPushButton('Refresh')
+        refresh_btn.clicked.connect(self.refresh_history)
+        history_row.addWidget(refresh_btn)
+        history_layout.addLayout(history_row)
+        
+        self.history_chart = HistoryChart()
+        history_layout.addWidget(self.history_chart)
+        
+        phases = list(HistoryChart.PHASE_COLORS)
+        self.history_table = QTableWidget(0, len(phases) + 6)
+        self.history_table.setHorizontalHeaderLabels(
+            ['Date', 'Result', 'Total'] + phases + ['CPU', 'Peak RSS', 'Regression'])
+        self.history_table.verticalHeader().setVisible(False)
+        self.history_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.history_table.horizontalHeader().setStretchLastSection(True)
+        self.history_table.setSortingEnabled(True)
+        history_layout.addWidget(self.history_table)
+        
+        tab.setLayout(history_layout)
+        self.refresh_history()
+    
+    def refresh_history(self):
+        """Nạp lại danh sách bộ options đã build của script hiện tại"""
+        from pydeloy import build_history
+        if self.history_table is None:
+            return
+        current = self.history_combo.currentData()
+        self.history_combo.blockSignals(True)
+        self.history_combo.clear()
+        if self.selected_file:
+            for key, options, count in build_history.option_sets(self.selected_file):
+                mode = 'onefile' if options.get('onefile') else 'onedir'
+                label = (f'{options.get("name") or "?"} · {mode} · '
+                         f'{len(options.get("excludes", []))} excludes · {count} builds')
+                self.history_combo.addItem(label, key)
+        index = self.history_combo.findData(current)
+        self.history_combo.setCurrentIndex(max(index, 0))
+        self.history_combo.blockSignals(False)
+        self.fill_history()
+    
+    def fill_history(self):
+        from pydeloy import build_history
+        key = self.history_combo.currentData()
+        builds = build_history.history(self.selected_file, key) if self.selected_file and key else []
+        flagged = build_history.regressions(builds)
+        self.history_chart.set_builds(builds, flagged)
+        
+        seconds = lambda value: f'{value:.1f} s' if value is not None else '-'
+        phases = list(HistoryChart.PHASE_COLORS)
+        self.history_table.setSortingEnabled(False)
+        self.history_table.setRowCount(len(builds))
+        for row, build in enumerate(reversed(builds)):
+            date = time.strftime('%Y-%m-%d %H:%M', time.localtime(build['started']))
+            self.history_table.setItem(row, 0, QTableWidgetItem(date))
+            result = QTableWidgetItem('ok' if build['success'] else 'failed')
+            if not build['success']:
+                result.setForeground(QColor(180, 0, 0))
+            self.history_table.setItem(row, 1, result)
+            self.history_table.setItem(row, 2, NumericItem(build['wall'], seconds(build['wall'])))
+            durations = dict(build['phases'])
+            for column, phase in enumerate(phases, 3):
+                value = durations.get(phase)
+                self.history_table.setItem(row, column, NumericItem(value or 0, seconds(value)))
+            column = len(phases) + 3
+            self.history_table.setItem(row, column, NumericItem(build['cpu'] or 0, seconds(build['cpu'])))
+            self.history_table.setItem(row, column + 1, NumericItem(build['peak_rss'] or 0))
+            flags = flagged.get(build['id'], [])
+            regression = QTableWidgetItem(', '.join(
+                f'{name} {value:.1f}s (was {baseline:.1f}s)' for name, value, baseline in flags))
+            regression.setForeground(QColor(200, 0, 0))
+            self.history_table.setItem(row, column + 2, regression)
+        self.history_table.setSortingEnabled(True)
+    
     def copy_command_text(self):
         """Copy command to clipboard"""
+        if self.command_timer.isActive():
+            self.refresh_command()
         cmd_text = self.command_display.toPlainText()
         if cmd_text:
             clipboard = QApplication.clipboard()
@@ -384,11 +1642,14 @@ class PyToExeConverter(QMainWindow):
             QMessageBox.warning(self, 'Warning', 'No command to copy. Please select a Python file first!')
     
     def browse_file(self):
+        from PyQt5.QtWidgets import QFileDialog
         file_path, _ = QFileDialog.getOpenFileName(self, 'Select Python file', '', 'Python Files (*.py)')
         if file_path:
             self.load_python_file(file_path)
     
     def load_python_file(self, file_path):
+        if file_path != self.selected_file:
+            self.minimal_smoke = None
         self.selected_file = file_path
         filename = os.path.basename(file_path)
         
@@ -410,12 +1671,37 @@ class PyToExeConverter(QMainWindow):
             name = os.path.splitext(os.path.basename(file_path))[0]
             self.name_input.setText(name)
         
-        self.analyze_btn.setEnabled(True)
-        self.used_modules = self.analyze_imports(file_path)
-        self.update_exclude_list_colors()
         self.update_command()
+        self.refresh_history()
+        self.start_analysis(file_path)
+        self.warm_workers()
+    
+    def start_analysis(self, file_path):
+        """Chạy phân tích import trong nền, tô màu exclude list dần theo kết quả"""
+        self.analyze_btn.setEnabled(False)
+        self.used_modules = set()
+        self.update_exclude_list_colors()
+        
+        thread = AnalyzeThread(file_path)
+        thread.partial.connect(lambda names: self.on_analysis_result(thread, names, False))
+        thread.done.connect(lambda names: self.on_analysis_result(thread, names, True))
+        # Giữ tham chiếu tới thread cũ cho đến khi chạy xong
+        self.analyze_threads.append(thread)
+        thread.finished.connect(lambda: self.analyze_threads.remove(thread))
+        self.analyze_thread = thread
+        thread.start()
+    
+    def on_analysis_result(self, thread, names, done):
+        # Bỏ qua kết quả của lần phân tích file trước
+        if thread is not self.analyze_thread:
+            return
+        self.used_modules = names
+        self.update_exclude_list_colors()
+        if done:
+            self.analyze_btn.setEnabled(True)
     
     def browse_icon(self):
+        from PyQt5.QtWidgets import QFileDialog
         icon_path, _ = QFileDialog.getOpenFileName(self, 'Select icon', '', 'Icon Files (*.ico)')
         if icon_path:
             self.icon_input.setText(icon_path)
@@ -450,112 +1736,377 @@ class PyToExeConverter(QMainWindow):
         if not self.selected_file:
             return
         
-        for i in range(self.exclude_list.count()):
-            self.exclude_list.item(i).setSelected(False)
+        options = self.collect_options()
+        roots = config.get_gui_imports(options['gui']) + options['hidden_imports']
+        
+        self.analyze_btn.setEnabled(False)
+        self.analyze_btn.setText('Analyzing...')
+        self.exclude_thread = ExcludeThread(self.selected_file, roots)
+        self.exclude_thread.proposed.connect(self.on_excludes_proposed)
+        self.exclude_thread.failed.connect(self.on_excludes_failed)
+        self.exclude_thread.start()
+    
+    def on_excludes_failed(self, message):
+        self.analyze_btn.setEnabled(True)
+        self.analyze_btn.setText('Auto detect')
+        QMessageBox.warning(self, 'Error', f'Auto detect failed:\n{message}')
+    
+    def on_excludes_proposed(self, candidates):
+        self.analyze_btn.setEnabled(True)
+        self.analyze_btn.setText('Auto detect')
         
-        safe_to_exclude = []
+        items = {}
         for i in range(self.exclude_list.count()):
             item = self.exclude_list.item(i)
-            module_name = item.data(Qt.UserRole)
-            
-            if module_name not in self.used_modules:
-                item.setSelected(True)
-                safe_to_exclude.append(module_name)
+            item.setSelected(False)
+            items[item.data(Qt.UserRole)] = item
+        
+        sizes = {name: (size, kind) for name, size, kind in candidates}
+        safe_to_exclude = config.detect_excludes(self.collect_options(), self.used_modules,
+                                                 candidates, self.MAX_PROPOSED_EXCLUDES)
+        
+        total_size = 0
+        for module_name in safe_to_exclude:
+            size, kind = sizes.get(module_name, (0, None))
+            total_size += size
+            item = items.get(module_name)
+            if item is None:
+                # Module chỉ tới được qua import tuỳ chọn, lớn nhất lên đầu
+                item = QListWidgetItem(f'{module_name}  ({format_size(size)})')
+                item.setData(Qt.UserRole, module_name)
+                item.setToolTip(f'{kind}, {format_size(size)} on disk')
+                self.exclude_list.addItem(item)
+                items[module_name] = item
+            item.setSelected(True)
+        
+        self.update_exclude_list_colors()
+        self.warm_workers()
         
         if safe_to_exclude:
             modules_text = ', '.join(safe_to_exclude[:5])
             if len(safe_to_exclude) > 5:
                 modules_text += f'... (+{len(safe_to_exclude) - 5} more)'
             QMessageBox.information(self, 'Complete', 
-                f'Selected {len(safe_to_exclude)} modules:\n{modules_text}')
+                f'Selected {len(safe_to_exclude)} modules (~{format_size(total_size)} of unused '
+                f'optional dependencies):\n{modules_text}')
         else:
             QMessageBox.information(self, 'Info', 
                 'No safe modules to exclude')
         
         self.update_command()
     
-    def get_gui_imports(self, framework):
-        imports_map = {
-            'Tkinter': ['tkinter', 'tkinter.ttk', '_tkinter'],
-            'CustomTkinter': ['customtkinter', 'tkinter', '_tkinter'],
-            'PyQt5': ['PyQt5', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets'],
-            'PyQt6': ['PyQt6', 'PyQt6.QtCore', 'PyQt6.QtGui', 'PyQt6.QtWidgets'],
-            'PySide2': ['PySide2', 'PySide2.QtCore', 'PySide2.QtGui', 'PySide2.QtWidgets'],
-            'PySide6': ['PySide6', 'PySide6.QtCore', 'PySide6.QtGui', 'PySide6.QtWidgets'],
-            'Kivy': ['kivy', 'kivy.core.window'],
-            'Pygame': ['pygame', 'pygame.mixer', 'pygame.font']
-        }
-        return imports_map.get(framework, [])
-    
-    def generate_command(self):
-        if not self.selected_file:
-            return ''
-        
-        cmd = 'pyinstaller '
-        
-        if self.clean_build_cb.isChecked():
-            cmd += '--clean -y '
-        if self.onefile_cb.isChecked():
-            cmd += '--onefile '
-        if self.noconsole_cb.isChecked():
-            cmd += '--noconsole '
-        if self.name_input.text():
-            cmd += f'--name="{self.name_input.text()}" '
-        if self.icon_input.text():
-            cmd += f'--icon="{self.icon_input.text()}" '
-        
-        file_dir = os.path.dirname(self.selected_file)
-        cmd += f'--distpath="{os.path.join(file_dir, "dist")}" '
-        cmd += f'--workpath="{os.path.join(file_dir, "build")}" '
-        cmd += f'--specpath="{file_dir}" '
-        
-        gui_imports = self.get_gui_imports(self.gui_combo.currentText())
-        hidden_imports = [h.strip() for h in self.hidden_input.text().split(',') if h.strip()]
-        
-        for imp in gui_imports + hidden_imports:
-            cmd += f'--hidden-import="{imp}" '
-        
+    def collect_options(self):
+        """Snapshot toàn bộ option hiện tại trên GUI thành dict"""
         excluded = []
         for item in self.exclude_list.selectedItems():
             excluded.append(item.data(Qt.UserRole))
         
         custom_excludes = [e.strip() for e in self.custom_exclude_input.text().split(',') if e.strip()]
         
-        for module in excluded + custom_excludes:
-            cmd += f'--exclude-module={module} '
-        
-        cmd += f'"{self.selected_file}"'
-        return cmd
+        options = {
+            'script': self.selected_file,
+            'clean': self.clean_build_cb.isChecked(),
+            'incremental': self.incremental_cb.isChecked(),
+            'cache': self.cache_cb.isChecked(),
+            'onefile': self.onefile_cb.isChecked(),
+            'noconsole': self.noconsole_cb.isChecked(),
+            'name': self.name_input.text(),
+            'icon': self.icon_input.text(),
+            'gui': self.gui_combo.currentText(),
+            'hidden_imports': self.hidden_imports(),
+            'excludes': excluded + custom_excludes,
+            'backend': 'api' if self.api_backend_cb.isChecked() else 'subprocess',
+            'shared_analysis': self.shared_analysis_cb.isChecked(),
+            'datas': config.parse_pairs(self.datas_input.text()),
+            'binaries': config.parse_pairs(self.binaries_input.text()),
+            'binary_excludes': [p.strip() for p in self.binary_filter_input.text().split(',') if p.strip()],
+            'pure_excludes': [p.strip() for p in self.pure_filter_input.text().split(',') if p.strip()],
+            'spec': '',
+            'timeout': self.timeout_spin.value() * 60,
+        }
+        if self.spec_editor is not None and self.use_spec_cb.isChecked() and self.spec_path:
+            from pydeloy import spec_file
+            options = spec_file.spec_build_options(options, self.spec_path, self.spec_targets)
+        return options
+    
+    def warm_workers(self):
+        """Khởi động sẵn worker PyInstaller với excludes hiện tại (chạy nền)"""
+        from pydeloy import shared_analysis, worker
+        options = self.collect_options()
+        if options['backend'] != 'api':
+            return
+        shared = []
+        if options['shared_analysis'] and options['script']:
+            shared = shared_analysis.known_packages(options)
+        worker.prestart(options['excludes'], shared=shared)
     
     def update_command(self):
-        """Update command display in the Command tab"""
-        cmd_text = self.generate_command()
-        self.command_display.setPlainText(cmd_text)
+        """Hẹn cập nhật Command tab, các lần sửa liên tiếp chỉ cập nhật một lần"""
+        if self.command_display is None:
+            return
+        self.command_timer.start()
+    
+    def refresh_command(self):
+        """Cập nhật Command tab: chỉ sửa phần chữ đổi thay vì setPlainText cả lệnh"""
+        from PyQt5.QtGui import QTextCursor
+        self.command_timer.stop()
+        if self.command_display is None:
+            return
+        options = self.collect_options() if self.selected_file else {}
+        _, diff = self.command_model.update(options)
+        if diff is None:
+            return
+        start, removed, inserted = diff
+        cursor = QTextCursor(self.command_display.document())
+        cursor.setPosition(start)
+        cursor.setPosition(start + removed, QTextCursor.KeepAnchor)
+        cursor.insertText(inserted)
     
     def convert(self):
+        from pydeloy import spec_file
         if not self.selected_file:
             QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
             return
         
         # Switch to Log tab when conversion starts
-        self.tabs.setCurrentIndex(3)
+        self.show_tab('Log')
         
         self.progress_bar.setValue(0)
         self.progress_label.setText('Starting conversion...')
         self.convert_btn.setEnabled(False)
         self.convert_btn.setText('Converting...')
+        self.set_batch_buttons_enabled(False)
         self.open_folder_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
         self.log_display.clear()
-        self.log_display.append('Starting PyInstaller...\n')
-        
-        self.convert_thread = ConvertThread(self.generate_command())
-        self.convert_thread.output.connect(self.on_output)
+        self.log_display.appendPlainText('Starting PyInstaller...\n')
+        
+        self.last_build_options = self.collect_options()
+        self.build_logs = [buildlog.new_log_path(self.last_build_options['name'] or 'build')]
+        if self.last_build_options['spec']:
+            self.save_spec()
+        self.convert_thread = ConvertThread(spec_file.pyinstaller_args(self.last_build_options),
+                                            self.last_build_options, self.log_buffer.write,
+                                            self.build_logs[0])
         self.convert_thread.progress.connect(self.on_progress)
+        self.convert_thread.phase.connect(self.on_phase)
         self.convert_thread.finished.connect(self.on_finished)
+        self.log_timer.start()
         self.convert_thread.start()
     
-    def on_output(self, line):
-        self.log_display.append(line)
+    def cancel_build(self):
+        """Huỷ build đơn hoặc batch đang chạy"""
+        self.cancel_btn.setEnabled(False)
+        self.progress_label.setText('Cancelling...')
+        if self.batch_queue and (self.batch_queue.pending or self.batch_queue.running):
+            self.batch_queue.cancel()
+        elif self.convert_thread and self.convert_thread.isRunning():
+            self.convert_thread.cancel()
+    
+    def add_current_to_batch(self):
+        if not self.selected_file:
+            QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
+            return
+        self.add_batch_job(self.collect_options())
+    
+    def add_files_to_batch(self):
+        from PyQt5.QtWidgets import QFileDialog
+        file_paths, _ = QFileDialog.getOpenFileNames(self, 'Select Python files', '', 'Python Files (*.py)')
+        for file_path in file_paths:
+            options = self.collect_options()
+            options['script'] = file_path
+            options['name'] = os.path.splitext(os.path.basename(file_path))[0]
+            self.add_batch_job(options)
+    
+    def add_batch_job(self, options):
+        from pydeloy import spec_file
+        name = options['name'] or os.path.splitext(os.path.basename(options['script']))[0]
+        options['name'] = name
+        item = QListWidgetItem(f'{name} — queued')
+        item.setData(Qt.UserRole, options)
+        item.setToolTip(spec_file.build_command(options, incremental.script_workpath(options)))
+        self.batch_list.addItem(item)
+    
+    def remove_from_batch(self):
+        if self.batch_queue and (self.batch_queue.pending or self.batch_queue.running):
+            return
+        for item in self.batch_list.selectedItems():
+            self.batch_list.takeItem(self.batch_list.row(item))
+    
+    def run_batch(self):
+        from pydeloy import spec_file
+        if self.batch_list.count() == 0:
+            QMessageBox.warning(self, 'Warning', 'Batch queue is empty!')
+            return
+        
+        items = [self.batch_list.item(i) for i in range(self.batch_list.count())]
+        jobs = []
+        # Mỗi job có workpath riêng để các build song song không đụng nhau
+        for item, (options, workpath) in zip(items, config.job_workpaths(
+                [item.data(Qt.UserRole) for item in items])):
+            jobs.append((spec_file.pyinstaller_args(options, workpath), options))
+            item.setText(f'{options["name"]} — queued')
+            item.setForeground(QColor(0, 0, 0))
+        
+        self.show_tab('Log')
+        self.log_display.clear()
+        self.log_display.appendPlainText(f'Starting batch: {len(jobs)} scripts, '
+                                         f'{self.workers_spin.value()} parallel jobs\n')
+        self.progress_bar.setValue(0)
+        self.progress_percent.setText('0%')
+        self.progress_label.setText(f'Batch 0/{len(jobs)}')
+        self.set_batch_buttons_enabled(False)
+        self.convert_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        
+        self.batch_queue = BatchQueue(jobs, self.log_buffer, self.workers_spin.value(), self)
+        self.batch_queue.job_started.connect(self.on_batch_job_started)
+        self.batch_queue.job_finished.connect(self.on_batch_job_finished)
+        self.batch_queue.all_finished.connect(self.on_batch_finished)
+        self.build_logs = [self.batch_queue.log_paths[i] for i in range(len(jobs))]
+        self.log_timer.start()
+        self.batch_queue.start()
+    
+    def set_batch_buttons_enabled(self, enabled):
+        if self.run_batch_btn:
+            self.run_batch_btn.setEnabled(enabled)
+            self.run_bundle_btn.setEnabled(enabled)
+    
+    def run_bundle(self):
+        """Build mọi script trong hàng đợi thành một bundle multi-target"""
+        if self.batch_list.count() == 0:
+            QMessageBox.warning(self, 'Warning', 'Batch queue is empty!')
+            return
+        name = self.bundle_name_input.text().strip() or 'suite'
+        builds = [self.batch_list.item(i).data(Qt.UserRole) for i in range(self.batch_list.count())]
+        
+        self.show_tab('Log')
+        self.log_display.clear()
+        self.progress_bar.setValue(0)
+        self.progress_label.setText(f'Building bundle {name}...')
+        self.set_batch_buttons_enabled(False)
+        self.convert_btn.setEnabled(False)
+        self.open_folder_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        
+        self.build_logs = [buildlog.new_log_path(name)]
+        self.convert_thread = MultiTargetThread(builds, name, self.log_buffer.write, self.build_logs[0])
+        self.convert_thread.progress.connect(self.on_progress)
+        self.convert_thread.phase.connect(self.on_phase)
+        self.convert_thread.finished.connect(self.on_bundle_finished)
+        self.log_timer.start()
+        self.convert_thread.start()
+    
+    def on_bundle_finished(self, success, message):
+        self.log_timer.stop()
+        self.flush_log()
+        self.set_batch_buttons_enabled(True)
+        self.convert_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.log_display.appendPlainText(f'\n{message}')
+        if self.convert_thread.cancel_token.cancelled:
+            self.warm_workers()
+        if success:
+            self.progress_bar.setValue(100)
+            self.progress_label.setText('Bundle complete!')
+            self.open_folder_btn.setEnabled(True)
+            QMessageBox.information(self, 'Bundle', message)
+        elif self.convert_thread.cancel_token.reason == USER_CANCEL:
+            self.progress_bar.setValue(0)
+            self.progress_label.setText('Cancelled')
+        else:
+            self.progress_bar.setValue(0)
+            self.progress_label.setText('Failed')
+            self.log_display.appendPlainText(f'Full log: {self.build_logs[0]}')
+            QMessageBox.warning(self, 'Bundle', message)
+    
+    def batch_job_name(self, index):
+        return self.batch_list.item(index).data(Qt.UserRole)['name']
+    
+    def on_batch_job_started(self, index):
+        self.batch_list.item(index).setText(f'{self.batch_job_name(index)} — building')
+    
+    def on_batch_job_finished(self, index, success, message):
+        item = self.batch_list.item(index)
+        name = self.batch_job_name(index)
+        if success:
+            item.setText(f'{name} — done')
+            item.setForeground(QColor(0, 120, 0))
+        elif self.batch_queue.cancelled:
+            item.setText(f'{name} — cancelled')
+            item.setForeground(QColor(120, 120, 120))
+        else:
+            item.setText(f'{name} — failed')
+            item.setForeground(QColor(180, 0, 0))
+            self.flush_log()
+            self.log_display.appendPlainText(f'\n[{name}] {message}')
+            self.log_display.appendPlainText(f'[{name}] Full log: {self.batch_queue.log_paths[index]}')
+        
+        done = len(self.batch_queue.results)
+        total = len(self.batch_queue.jobs)
+        value = int(done * 100 / total)
+        self.progress_bar.setValue(value)
+        self.progress_percent.setText(f'{value}%')
+        self.progress_label.setText(f'Batch {done}/{total}')
+    
+    def on_batch_finished(self):
+        self.log_timer.stop()
+        self.flush_log()
+        self.refresh_history()
+        self.set_batch_buttons_enabled(True)
+        self.convert_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        
+        results = self.batch_queue.results
+        failed = [self.batch_job_name(i) for i, ok in sorted(results.items()) if not ok]
+        if self.batch_queue.cancelled:
+            self.warm_workers()
+            self.progress_label.setText('Batch cancelled')
+            self.log_display.appendPlainText(f'\nBatch cancelled: {len(results) - len(failed)}/{len(results)} succeeded')
+            return
+        self.progress_label.setText('Batch complete!' if not failed else 'Batch finished with errors')
+        self.log_display.appendPlainText(f'\nBatch finished: {len(results) - len(failed)}/{len(results)} succeeded')
+        if failed:
+            QMessageBox.warning(self, 'Batch', 
+                f'{len(failed)} build(s) failed:\n' + ', '.join(failed))
+        else:
+            QMessageBox.information(self, 'Batch', 
+                f'All {len(results)} builds completed!')
+    
+    def save_full_log(self):
+        """Lưu log đầy đủ (trên đĩa) của lần build gần nhất"""
+        from PyQt5.QtWidgets import QFileDialog
+        logs = [path for path in self.build_logs if os.path.isfile(path)]
+        if not logs:
+            QMessageBox.warning(self, 'Warning', 'No build log to save yet!')
+            return
+        try:
+            if len(logs) == 1:
+                target, _ = QFileDialog.getSaveFileName(self, 'Save Full Log',
+                                                        os.path.basename(logs[0]), 'Log Files (*.log)')
+                if target:
+                    shutil.copyfile(logs[0], target)
+            else:
+                target = QFileDialog.getExistingDirectory(self, 'Save Batch Logs')
+                if target:
+                    for path in logs:
+                        shutil.copy(path, target)
+        except OSError as e:
+            QMessageBox.warning(self, 'Error', f'Could not save log:\n{e}')
+    
+    def flush_log(self):
+        """Hiển thị mọi dòng đang chờ trong log buffer thành một khối"""
+        from PyQt5.QtGui import QTextCursor
+        # Chưa có Log tab thì giữ các dòng trong buffer
+        if self.log_display is None:
+            return
+        lines = self.log_buffer.drain()
+        if not lines:
+            return
+        text = '\n'.join(lines)
+        cursor = QTextCursor(self.log_display.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText('\n' + text if not self.log_display.document().isEmpty() else text)
         self.log_display.verticalScrollBar().setValue(
             self.log_display.verticalScrollBar().maximum()
         )
@@ -563,38 +2114,172 @@ class PyToExeConverter(QMainWindow):
     def on_progress(self, value):
         self.progress_bar.setValue(value)
         self.progress_percent.setText(f'{value}%')
+    
+    def on_phase(self, phase):
+        self.progress_label.setText(self.PHASE_LABELS.get(phase, phase))
+    
+    def start_size_report(self, options):
+        """Phân tích dung lượng bundle vừa build trong nền"""
+        build_dir = config.build_dir(options)
+        roots = config.get_gui_imports(options['gui']) + options['hidden_imports']
+        
+        self.set_size_status('Analyzing bundle...')
+        self.size_thread = SizeReportThread(options['script'], build_dir, roots, set(self.used_modules))
+        self.size_thread.ready.connect(self.on_size_report)
+        self.size_thread.failed.connect(lambda msg: self.set_size_status(f'Size report failed: {msg}'))
+        self.size_thread.start()
+    
+    def set_size_status(self, text):
+        self.size_status = text
+        if self.size_table is not None:
+            self.size_summary.setText(text)
+    
+    def on_size_report(self, report, suggestions):
+        self.size_report = report
+        self.size_suggestions = suggestions
+        self.size_status = f'Total: {format_size(report.total_size)} in {len(report.entries)} items'
+        if self.size_table is not None:
+            self.show_size_report()
+    
+    def show_size_report(self):
+        self.size_summary.setText(self.size_status)
+        self.fill_size_table()
+        
+        self.size_suggest_list.clear()
+        for name, size, count in self.size_suggestions:
+            item = QListWidgetItem(f'{name}  ({format_size(size)})')
+            item.setData(Qt.UserRole, name)
+            self.size_suggest_list.addItem(item)
+    
+    def fill_size_table(self):
+        if not self.size_report or self.size_table is None:
+            return
+        
+        total = self.size_report.total_size or 1
+        if self.size_view_combo.currentText() == 'Packages':
+            rows = self.size_report.by_package()
+        else:
+            rows = [(e.name, e.size, e.kind) for e in self.size_report.entries]
+        
+        self.size_table.setSortingEnabled(False)
+        self.size_table.setRowCount(len(rows))
+        for row, (name, size, extra) in enumerate(rows):
+            self.size_table.setItem(row, 0, QTableWidgetItem(name))
+            self.size_table.setItem(row, 1, NumericItem(size))
+            self.size_table.setItem(row, 2, QTableWidgetItem(str(extra)))
+            self.size_table.setItem(row, 3, NumericItem(size, f'{size * 100 / total:.1f}%'))
+        self.size_table.setSortingEnabled(True)
+        self.size_table.sortItems(1, Qt.DescendingOrder)
+    
+    def add_suggested_excludes(self):
+        items = {}
+        for i in range(self.exclude_list.count()):
+            item = self.exclude_list.item(i)
+            items[item.data(Qt.UserRole)] = item
+        
+        for suggestion in self.size_suggest_list.selectedItems():
+            module_name = suggestion.data(Qt.UserRole)
+            item = items.get(module_name)
+            if item is None:
+                item = QListWidgetItem(suggestion.text())
+                item.setData(Qt.UserRole, module_name)
+                self.exclude_list.addItem(item)
+            item.setSelected(True)
+        
+        self.update_exclude_list_colors()
+        self.update_command()
+    
+    def run_benchmark(self):
+        if not self.selected_file:
+            QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
+            return
         
-        stages = [
-            (10, 'Initializing'),
-            (30, 'Analyzing dependencies'),
-            (50, 'Collecting modules'),
-            (70, 'Building executable'),
-            (90, 'Finalizing'),
-            (100, 'Complete')
-        ]
+        options = self.collect_options()
+        artifact = build_cache.artifact_path(options)
+        if not os.path.isfile(artifact):
+            QMessageBox.warning(self, 'Warning', f'Build the script first!\n\n{artifact} not found')
+            return
         
-        for threshold, label in stages:
-            if value <= threshold:
-                self.progress_label.setText(label)
-                break
+        args = self.bench_args_input.text().split()
+        self.bench_btn.setEnabled(False)
+        self.bench_btn.setText('Running...')
+        self.benchmark_thread = BenchmarkThread(artifact, options, self.bench_runs_spin.value(),
+                                                self.bench_timeout_spin.value(), args)
+        self.benchmark_thread.run_done.connect(
+            lambda i, r: self.bench_btn.setText(f'Running... {i + 1}/{self.bench_runs_spin.value()}'))
+        self.benchmark_thread.finished.connect(self.on_benchmark_finished)
+        self.benchmark_thread.start()
+    
+    def on_benchmark_finished(self, entry):
+        self.bench_btn.setEnabled(True)
+        self.bench_btn.setText('Run benchmark')
+        if entry['timeouts']:
+            QMessageBox.warning(self, 'Benchmark', 
+                f'{entry["timeouts"]} of {entry["runs"]} runs hit the timeout')
+        self.fill_benchmark_table(entry['name'])
+    
+    def fill_benchmark_table(self, name):
+        from pydeloy import benchmark
+        seconds = lambda value: f'{value:.3f} s' if value is not None else '-'
+        history = benchmark.history_for(name)
+        
+        self.bench_table.setSortingEnabled(False)
+        self.bench_table.setRowCount(len(history))
+        for row, entry in enumerate(reversed(history)):
+            date = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['time']))
+            self.bench_table.setItem(row, 0, QTableWidgetItem(date))
+            self.bench_table.setItem(row, 1, QTableWidgetItem('onefile' if entry['onefile'] else 'onedir'))
+            excludes = QTableWidgetItem(str(len(entry['excludes'])))
+            excludes.setToolTip(', '.join(entry['excludes']))
+            self.bench_table.setItem(row, 2, excludes)
+            self.bench_table.setItem(row, 3, NumericItem(entry['size'] or 0))
+            self.bench_table.setItem(row, 4, NumericItem(entry['cold'] or 0, seconds(entry['cold'])))
+            self.bench_table.setItem(row, 5, NumericItem(entry['warm'] or 0, seconds(entry['warm'])))
+            rss = NumericItem(entry['peak_rss'])
+            rss.setToolTip(f'Extracted temp dir: {format_size(entry["extracted"])}')
+            self.bench_table.setItem(row, 6, rss)
+        self.bench_table.setSortingEnabled(True)
     
     def on_finished(self, success, message):
+        self.log_timer.stop()
+        self.flush_log()
+        self.refresh_history()
         self.convert_btn.setEnabled(True)
         self.convert_btn.setText('Convert to EXE')
+        self.cancel_btn.setEnabled(False)
+        self.set_batch_buttons_enabled(True)
+        
+        if self.convert_thread.cancel_token.cancelled:
+            # Worker của build bị huỷ đã bị kill, làm ấm worker thay thế
+            self.warm_workers()
+        if not success and self.convert_thread.cancel_token.reason == USER_CANCEL:
+            self.progress_bar.setValue(0)
+            self.progress_label.setText('Cancelled')
+            self.log_display.appendPlainText(f'\n{message}')
+            return
         
+        self.start_warn_report(self.last_build_options)
+        if self.minimal_smoke:
+            from pydeloy import minimal_bundle
+            # Lần plan sau không được dùng TOC của bản minimal này
+            minimal_bundle.mark_minimal(self.last_build_options)
         if success:
             self.progress_bar.setValue(100)
             self.progress_label.setText('Complete!')
-            self.log_display.append(f'\n{message}')
+            self.log_display.appendPlainText(f'\n{message}')
             exe_path = f'{self.output_dir}/{self.name_input.text()}.exe'
-            self.log_display.append(f'Output: {exe_path}')
+            self.log_display.appendPlainText(f'Output: {exe_path}')
             self.open_folder_btn.setEnabled(True)
+            self.start_size_report(self.last_build_options)
+            if self.minimal_smoke:
+                self.start_minimal_verify(self.last_build_options)
             QMessageBox.information(self, 'Success', 
                 f'Build completed!\n\nOutput: {self.name_input.text()}.exe')
         else:
             self.progress_bar.setValue(0)
             self.progress_label.setText('Failed')
-            self.log_display.append(f'\n{message}')
+            self.log_display.appendPlainText(f'\n{message}')
+            self.log_display.appendPlainText(f'Full log: {self.build_logs[0]}')
             
             error_box = QMessageBox(self)
             error_box.setIcon(QMessageBox.Critical)
@@ -605,6 +2290,10 @@ class PyToExeConverter(QMainWindow):
 
 
 def main():
+    from pydeloy import worker
+    if getattr(sys, 'frozen', False):
+        import multiprocessing
+        multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     
     # Use native Windows style
@@ -615,6 +2304,8 @@ def main():
     app.setFont(font)
     
     window = PyToExeConverter()
+    if '--startup-time' in sys.argv:
+        StartupTimer(window)
     window.show()
     
     # Center window with slight upward offset
@@ -630,7 +2321,9 @@ def main():
     
     window.move(center_x, final_y)
     
-    sys.exit(app.exec_())
+    code = app.exec_()
+    worker.shutdown()
+    sys.exit(code)
 
 
 if __name__ == '__main__':
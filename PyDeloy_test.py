@@ -2,6 +2,7 @@ import sys
 import subprocess
 import ast
 import os
+from collections import deque
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QFileDialog, 
                              QCheckBox, QLineEdit, QComboBox, QTextEdit, 
@@ -10,6 +11,9 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QColor, QIcon
 
+from pydeloy import toolchains
+from pydeloy.build_phases import BuildLogParser
+
 
 # ==================== GUIDE MODULE ====================
 APP_NAME = "PyDeloy"
@@ -66,41 +70,31 @@ class ConvertThread(QThread):
                 env=env
             )
             
-            progress_keywords = {
-                'building': 15, 'analyzing': 25, 'running': 35,
-                'processing': 45, 'collecting': 55, 'copying': 65,
-                'building exe': 75, 'building pyz': 80,
-                'appending': 85, 'completed successfully': 100
-            }
-            
-            current_progress = 5
-            self.progress.emit(5)
-            all_output = []
+            log_parser = BuildLogParser()
+            self.progress.emit(0)
+            # Chỉ giữ các dòng cần cho thông báo lỗi
+            error_lines = deque(maxlen=5)
+            tail = deque(maxlen=10)
             
             for line in process.stdout:
                 line_lower = line.lower().strip()
                 self.output.emit(line.strip())
-                all_output.append(line.strip())
+                tail.append(line.strip())
+                if 'error' in line_lower or 'failed' in line_lower:
+                    error_lines.append(line.strip())
                 
-                for keyword, progress_value in progress_keywords.items():
-                    if keyword in line_lower:
-                        if progress_value > current_progress:
-                            current_progress = progress_value
-                            self.progress.emit(current_progress)
-                        break
-                
-                if current_progress < 90 and line.strip():
-                    current_progress = min(current_progress + 1, 90)
-                    self.progress.emit(current_progress)
+                if log_parser.feed(line):
+                    self.progress.emit(log_parser.progress)
             
             process.wait()
+            for line in log_parser.summary().splitlines():
+                self.output.emit(line)
             
             if process.returncode == 0:
                 self.progress.emit(100)
                 self.finished.emit(True, "Chuyển đổi thành công!")
             else:
-                error_lines = [line for line in all_output if 'error' in line.lower() or 'failed' in line.lower()]
-                error_msg = '\n'.join(error_lines[-5:]) if error_lines else '\n'.join(all_output[-10:])
+                error_msg = '\n'.join(error_lines or tail)
                 self.finished.emit(False, f"PyInstaller lỗi (code {process.returncode}):\n\n{error_msg}")
                 
         except Exception as e:
@@ -108,12 +102,18 @@ class ConvertThread(QThread):
 
 
 class PyToExeConverter(QMainWindow):
+    # Số dòng tối đa trong Log tab
+    LOG_VIEW_LINES = 5000
+    
     def __init__(self):
         super().__init__()
         self.selected_file = None
         self.convert_thread = None
         self.used_modules = set()
         self.output_dir = "dist"
+        self.lazy_tabs = {}
+        self.command_display = None
+        self.log_display = None
         
         # Tìm PyInstaller local hoặc system
         self.script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -124,7 +124,7 @@ class PyToExeConverter(QMainWindow):
         self.setAcceptDrops(True)
     
     def find_pyinstaller(self):
-        """Tìm PyInstaller từ ./libs/bin hoặc system"""
+        """Tìm PyInstaller từ ./libs/bin, toolchain mặc định trong registry hoặc system"""
         if sys.platform == 'win32':
             local_path = os.path.join(self.script_dir, 'libs', 'bin', 'pyinstaller.exe')
         else:
@@ -134,6 +134,12 @@ class PyToExeConverter(QMainWindow):
             print(f"Using local PyInstaller: {local_path}")
             return local_path
         
+        # `python -m pydeloy toolchains --add INTERPRETER --default`
+        registered = toolchains.default_pyinstaller()
+        if registered:
+            print(f"Using toolchain PyInstaller: {registered}")
+            return registered
+        
         print("Using system PyInstaller")
         return 'pyinstaller'
     
@@ -141,8 +147,10 @@ class PyToExeConverter(QMainWindow):
         """Kiểm tra trạng thái PyInstaller"""
         if self.pyinstaller_path == 'pyinstaller':
             return 'System'
-        else:
+        elif self.pyinstaller_path.startswith(self.libs_path):
             return 'Local'
+        else:
+            return 'Toolchain'
     
     def analyze_imports(self, file_path):
         """Phân tích file Python để tìm modules được import"""
@@ -333,63 +341,11 @@ class PyToExeConverter(QMainWindow):
         advanced_tab.setLayout(advanced_layout)
         self.tabs.addTab(advanced_tab, "Advanced")
         
-        # Tab 3: Command
-        command_tab = QWidget()
-        command_layout = QVBoxLayout()
-        command_layout.setSpacing(10)
-        command_layout.setContentsMargins(10, 10, 10, 10)
-        
-        command_layout.addWidget(QLabel('PyInstaller Command:'))
-        
-        self.command_display = QTextEdit()
-        self.command_display.setReadOnly(True)
-        cmd_font = QFont("Courier New", 9)
-        self.command_display.setFont(cmd_font)
-        command_layout.addWidget(self.command_display)
-        
-        copy_cmd_btn = QPushButton('Copy Command')
-        copy_cmd_btn.clicked.connect(self.copy_command_text)
-        command_layout.addWidget(copy_cmd_btn)
-        
-        command_tab.setLayout(command_layout)
-        self.tabs.addTab(command_tab, "Command")
-        
-        # Tab 4: Log
-        log_tab = QWidget()
-        log_layout = QVBoxLayout()
-        log_layout.setSpacing(10)
-        log_layout.setContentsMargins(10, 10, 10, 10)
-        
-        log_layout.addWidget(QLabel('Output Log:'))
-        
-        self.log_display = QTextEdit()
-        self.log_display.setReadOnly(True)
-        log_font = QFont("Courier New", 9)
-        self.log_display.setFont(log_font)
-        log_layout.addWidget(self.log_display)
-        
-        clear_log_btn = QPushButton('Clear Log')
-        clear_log_btn.clicked.connect(self.log_display.clear)
-        log_layout.addWidget(clear_log_btn)
-        
-        log_tab.setLayout(log_layout)
-        self.tabs.addTab(log_tab, "Log")
-        
-        # Tab 5: Guide
-        guide_tab = QWidget()
-        guide_layout = QVBoxLayout()
-        guide_layout.setSpacing(10)
-        guide_layout.setContentsMargins(10, 10, 10, 10)
-        
-        self.guide_display = QTextEdit()
-        self.guide_display.setReadOnly(True)
-        guide_font = QFont("Segoe UI", 9)
-        self.guide_display.setFont(guide_font)
-        self.guide_display.setPlainText(get_guide_text())
-        guide_layout.addWidget(self.guide_display)
-        
-        guide_tab.setLayout(guide_layout)
-        self.tabs.addTab(guide_tab, "Guide")
+        # Tab 3-5: tạo nội dung khi mở lần đầu
+        self.add_lazy_tab("Command", self.init_command_tab)
+        self.add_lazy_tab("Log", self.init_log_tab)
+        self.add_lazy_tab("Guide", self.init_guide_tab)
+        self.tabs.currentChanged.connect(self.build_lazy_tab)
         
         main_layout.addWidget(self.tabs)
         
@@ -439,6 +395,81 @@ class PyToExeConverter(QMainWindow):
         
         main_layout.addLayout(btn_layout)
     
+    def add_lazy_tab(self, title, builder):
+        """Thêm tab rỗng, nội dung chỉ được tạo khi tab được mở lần đầu"""
+        tab = QWidget()
+        self.lazy_tabs[tab] = builder
+        self.tabs.addTab(tab, title)
+    
+    def build_lazy_tab(self, index):
+        tab = self.tabs.widget(index)
+        builder = self.lazy_tabs.pop(tab, None)
+        if builder:
+            builder(tab)
+    
+    def show_tab(self, title):
+        for index in range(self.tabs.count()):
+            if self.tabs.tabText(index) == title:
+                self.tabs.setCurrentIndex(index)
+                # currentChanged không phát nếu tab đã đang mở
+                self.build_lazy_tab(index)
+                return
+    
+    def init_command_tab(self, tab):
+        command_layout = QVBoxLayout()
+        command_layout.setSpacing(10)
+        command_layout.setContentsMargins(10, 10, 10, 10)
+        
+        command_layout.addWidget(QLabel('PyInstaller Command:'))
+        
+        self.command_display = QTextEdit()
+        self.command_display.setReadOnly(True)
+        cmd_font = QFont("Courier New", 9)
+        self.command_display.setFont(cmd_font)
+        command_layout.addWidget(self.command_display)
+        
+        copy_cmd_btn = QPushButton('Copy Command')
+        copy_cmd_btn.clicked.connect(self.copy_command_text)
+        command_layout.addWidget(copy_cmd_btn)
+        
+        tab.setLayout(command_layout)
+        self.update_command()
+    
+    def init_log_tab(self, tab):
+        log_layout = QVBoxLayout()
+        log_layout.setSpacing(10)
+        log_layout.setContentsMargins(10, 10, 10, 10)
+        
+        log_layout.addWidget(QLabel('Output Log:'))
+        
+        self.log_display = QTextEdit()
+        self.log_display.setReadOnly(True)
+        # Chỉ giữ LOG_VIEW_LINES dòng cuối
+        self.log_display.document().setMaximumBlockCount(self.LOG_VIEW_LINES)
+        log_font = QFont("Courier New", 9)
+        self.log_display.setFont(log_font)
+        log_layout.addWidget(self.log_display)
+        
+        clear_log_btn = QPushButton('Clear Log')
+        clear_log_btn.clicked.connect(self.log_display.clear)
+        log_layout.addWidget(clear_log_btn)
+        
+        tab.setLayout(log_layout)
+    
+    def init_guide_tab(self, tab):
+        guide_layout = QVBoxLayout()
+        guide_layout.setSpacing(10)
+        guide_layout.setContentsMargins(10, 10, 10, 10)
+        
+        self.guide_display = QTextEdit()
+        self.guide_display.setReadOnly(True)
+        guide_font = QFont("Segoe UI", 9)
+        self.guide_display.setFont(guide_font)
+        self.guide_display.setPlainText(get_guide_text())
+        guide_layout.addWidget(self.guide_display)
+        
+        tab.setLayout(guide_layout)
+    
     def copy_command_text(self):
         cmd_text = self.command_display.toPlainText()
         if cmd_text:
@@ -597,6 +628,8 @@ class PyToExeConverter(QMainWindow):
         return cmd
     
     def update_command(self):
+        if self.command_display is None:
+            return
         cmd_text = self.generate_command()
         self.command_display.setPlainText(cmd_text)
     
@@ -605,7 +638,7 @@ class PyToExeConverter(QMainWindow):
             QMessageBox.warning(self, 'Warning', 'Please select a Python file first!')
             return
         
-        self.tabs.setCurrentIndex(3)
+        self.show_tab('Log')
         
         self.progress_bar.setValue(0)
         self.progress_label.setText('Starting conversion...')
@@ -616,7 +649,9 @@ class PyToExeConverter(QMainWindow):
         self.log_display.append(f'Using: {self.pyinstaller_path}\n')
         self.log_display.append('Starting PyInstaller...\n')
         
-        libs_path = self.libs_path if os.path.exists(self.libs_path) else None
+        # PyInstaller của toolchain dùng site-packages của venv đó, không trộn ./libs vào
+        use_libs = os.path.exists(self.libs_path) and self.get_pyinstaller_status() != 'Toolchain'
+        libs_path = self.libs_path if use_libs else None
         
         self.convert_thread = ConvertThread(self.generate_command(), libs_path)
         self.convert_thread.output.connect(self.on_output)
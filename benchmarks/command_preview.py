@@ -0,0 +1,110 @@
+"""
+So sánh phần xem trước lệnh khi gõ một danh sách hidden import dài với
+Command tab đang mở: đường cũ (mỗi phím tạo lại lệnh + setPlainText) với
+CommandModel (debounce, memo, chỉ sửa phần chữ đổi).
+
+    python benchmarks/command_preview.py [số hidden import] [ms giữa hai phím]
+
+Đo thời gian xử lý mỗi phím, khoảng lag lớn nhất của event loop (timer
+10 ms), số lần tạo lệnh và kiểm tra lệnh cuối cùng hiển thị đúng.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import QApplication
+
+import PyDeloy
+from pydeloy import spec_file
+from pydeloy.command_model import DEBOUNCE_MS
+
+
+class LegacyConverter(PyDeloy.PyToExeConverter):
+    """Cập nhật Command tab như trước: tạo lại cả lệnh cho mỗi lần sửa"""
+
+    builds = 0
+
+    def update_command(self):
+        if self.command_display is None:
+            return
+        self.command_display.setPlainText(spec_file.build_command(self.collect_options()))
+        self.builds += 1
+
+
+def make_window(cls, script):
+    window = cls()
+    # Không khởi động worker PyInstaller trong lúc đo
+    window.api_backend_cb.setChecked(False)
+    window.load_python_file(script)
+    window.show_tab('Command')
+    window.show()
+    return window
+
+
+def measure(app, cls, script, text, key_ms):
+    window = make_window(cls, script)
+    app.processEvents()
+    state = {'typed': 0, 'key_times': [], 'max_gap': 0.0, 'last_tick': time.perf_counter()}
+
+    def tick():
+        now = time.perf_counter()
+        state['max_gap'] = max(state['max_gap'], now - state['last_tick'])
+        state['last_tick'] = now
+
+    heartbeat = QTimer()
+    heartbeat.setInterval(10)
+    heartbeat.timeout.connect(tick)
+
+    def key():
+        if state['typed'] == len(text):
+            keys.stop()
+            # Chờ lần cập nhật cuối (debounce) rồi dừng
+            QTimer.singleShot(DEBOUNCE_MS * 2, app.quit)
+            return
+        start = time.perf_counter()
+        window.hidden_input.insert(text[state['typed']])
+        state['key_times'].append(time.perf_counter() - start)
+        state['typed'] += 1
+
+    keys = QTimer()
+    keys.setInterval(key_ms)
+    keys.timeout.connect(key)
+
+    start = time.perf_counter()
+    heartbeat.start()
+    keys.start()
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    heartbeat.stop()
+
+    expected = spec_file.build_command(window.collect_options())
+    correct = window.command_display.toPlainText() == expected
+    builds = window.builds if cls is LegacyConverter else window.command_model.builds
+    window.close()
+    key_times = state['key_times']
+    return elapsed, sum(key_times) / len(key_times), max(key_times), state['max_gap'], builds, correct
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    key_ms = int(sys.argv[2]) if len(sys.argv) > 2 else 15
+    text = ', '.join(f'plugins.backend_{i:03d}.loader' for i in range(count))
+    app = QApplication(sys.argv[:1])
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, 'app.py')
+        with open(script, 'w', encoding='utf-8') as f:
+            f.write('print("hello")\n')
+        print(f'{len(text)} keystrokes, one every {key_ms} ms, debounce {DEBOUNCE_MS} ms')
+        print(f'{"path":<10}{"time":>9}{"mean key":>11}{"max key":>10}{"max lag":>10}{"builds":>8}  correct')
+        for name, cls in (('legacy', LegacyConverter), ('model', PyDeloy.PyToExeConverter)):
+            elapsed, mean_key, max_key, max_gap, builds, correct = measure(app, cls, script, text, key_ms)
+            print(f'{name:<10}{elapsed:>8.2f}s{mean_key * 1000:>9.2f}ms{max_key * 1000:>8.2f}ms'
+                  f'{max_gap * 1000:>8.0f}ms{builds:>8}  {correct}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+So sánh thông lượng hiển thị log: đường cũ (một signal + QTextEdit.append
+cho mỗi dòng) với LogBuffer được UI lấy theo chu kỳ FLUSH_INTERVAL_MS.
+
+    python benchmarks/log_sink.py [số dòng]
+
+Đo thời gian tới khi dòng cuối hiện trên UI và khoảng lag lớn nhất của
+event loop (đo bằng một timer 10 ms).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor
+from PyQt5.QtWidgets import QApplication, QTextEdit
+
+from pydeloy.logbuffer import FLUSH_INTERVAL_MS, LogBuffer
+
+LINE = '12345 INFO: Processing module hooks (post-graph stage) for PyQt5.QtWidgets ... {}'
+
+
+class Producer(QThread):
+    output = pyqtSignal(str)
+
+    def __init__(self, count, on_output=None):
+        super().__init__()
+        self.count = count
+        self.on_output = on_output
+
+    def run(self):
+        write = self.on_output or self.output.emit
+        for i in range(self.count):
+            write(LINE.format(i))
+
+
+def measure(app, count, batched):
+    view = QTextEdit()
+    view.setReadOnly(True)
+    view.show()
+    state = {'shown': 0, 'updates': 0, 'max_gap': 0.0, 'last_tick': time.perf_counter()}
+
+    def tick():
+        now = time.perf_counter()
+        state['max_gap'] = max(state['max_gap'], now - state['last_tick'])
+        state['last_tick'] = now
+
+    heartbeat = QTimer()
+    heartbeat.setInterval(10)
+    heartbeat.timeout.connect(tick)
+
+    def shown(n):
+        state['shown'] += n
+        state['updates'] += 1
+        view.verticalScrollBar().setValue(view.verticalScrollBar().maximum())
+        if state['shown'] >= count:
+            app.quit()
+
+    if batched:
+        buffer = LogBuffer()
+        producer = Producer(count, buffer.write)
+
+        def flush():
+            lines = buffer.drain()
+            if lines:
+                cursor = QTextCursor(view.document())
+                cursor.movePosition(QTextCursor.End)
+                text = '\n'.join(lines)
+                cursor.insertText('\n' + text if not view.document().isEmpty() else text)
+                shown(len(lines))
+
+        timer = QTimer()
+        timer.setInterval(FLUSH_INTERVAL_MS)
+        timer.timeout.connect(flush)
+        timer.start()
+    else:
+        producer = Producer(count)
+
+        def append(line):
+            view.append(line)
+            shown(1)
+
+        producer.output.connect(append)
+
+    start = time.perf_counter()
+    heartbeat.start()
+    producer.start()
+    app.exec_()
+    elapsed = time.perf_counter() - start
+    producer.wait()
+    heartbeat.stop()
+    view.close()
+    return elapsed, state['updates'], state['max_gap']
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = QApplication(sys.argv[:1])
+    print(f'{count} lines, flush every {FLUSH_INTERVAL_MS} ms')
+    print(f'{"path":<10}{"time":>10}{"lines/s":>12}{"updates":>10}{"max lag":>10}')
+    for name, batched in (('per-line', False), ('batched', True)):
+        elapsed, updates, max_gap = measure(app, count, batched)
+        print(f'{name:<10}{elapsed:>9.2f}s{count / elapsed:>12.0f}{updates:>10}{max_gap * 1000:>8.0f}ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+So sánh độ trễ mỗi build giữa backend subprocess (mỗi build một process
+pyinstaller mới) và pool worker ấm (PyInstaller đã import sẵn, module
+graph base_library đã cache).
+
+    python benchmarks/worker_latency.py [số build mỗi backend]
+
+Build một script nhỏ ở thư mục tạm (onedir, --clean), in wall time và thời
+gian Analysis của từng build.
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydeloy import config, runner, worker
+from pydeloy.build_phases import BuildLogParser
+
+
+def measure(run, count):
+    results = []
+    for _ in range(count):
+        parser = BuildLogParser()
+        start = time.perf_counter()
+        returncode, _, _ = run(parser.feed)
+        wall = time.perf_counter() - start
+        if returncode != 0:
+            raise SystemExit(f'build failed with code {returncode}')
+        results.append((wall, dict(parser.durations()).get('Analysis', 0.0)))
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    with tempfile.TemporaryDirectory() as project:
+        script = os.path.join(project, 'hello.py')
+        with open(script, 'w') as f:
+            f.write('import json\nprint(json.dumps({"hello": "world"}))\n')
+        options = config.make_options(script, onefile=False, cache=False)
+        args = config.build_args(options)
+
+        rows = [('subprocess', measure(lambda on_line: runner.run_subprocess(args, project, on_line), count))]
+
+        # Worker mới: lần đầu tính cả khởi động interpreter và dựng graph
+        worker.shutdown()
+        rows.append(('api', measure(
+            lambda on_line: runner.run_api(args, project, on_line, options['excludes']), count)))
+
+        # Worker đã được làm ấm trước (như GUI làm khi mở file)
+        worker.shutdown()
+        worker.prestart(options['excludes']).join()
+        rows.append(('api warm', measure(
+            lambda on_line: runner.run_api(args, project, on_line, options['excludes']), count)))
+        worker.shutdown()
+
+    print(f'{count} builds per backend')
+    print(f'{"backend":<12}{"first":>9}{"median":>9}{"Analysis":>10}')
+    for name, results in rows:
+        walls = [wall for wall, _ in results]
+        analysis = statistics.median(a for _, a in results)
+        print(f'{name:<12}{walls[0]:>8.2f}s{statistics.median(walls):>8.2f}s{analysis:>9.2f}s')
+
+
+if __name__ == '__main__':
+    main()
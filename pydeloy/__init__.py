@@ -0,0 +1,16 @@
+"""
+PyDeloy - các module hỗ trợ build không phụ thuộc Qt
+"""
+import os
+
+# Thư mục lưu cache/lịch sử dùng chung cho mọi project
+DATA_DIR = os.path.join(os.path.expanduser('~'), '.pydeloy')
+
+
+def format_size(size):
+    """12345678 -> '11.8 MB'"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.0f} {unit}' if unit == 'B' else f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
@@ -0,0 +1,129 @@
+"""
+Benchmark thời gian khởi động của artifact vừa build: chạy N lần có
+timeout, đo wall-clock (lần đầu = cold, các lần sau = warm), peak RSS và
+dung lượng thư mục tạm _MEIxxxx mà bản onefile giải nén ra.
+"""
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+
+from pydeloy import DATA_DIR, procstats
+
+HISTORY_FILE = os.path.join(DATA_DIR, 'benchmarks.json')
+
+
+def _mei_dirs(temp_dir):
+    try:
+        return {name for name in os.listdir(temp_dir) if name.startswith('_MEI')}
+    except OSError:
+        return set()
+
+
+def run_once(artifact, args=(), timeout=30):
+    """Chạy artifact một lần, trả về dict số đo"""
+    temp_dir = tempfile.gettempdir()
+    before = _mei_dirs(temp_dir)
+    extracted = [0]
+    first_output = [None]
+    done = threading.Event()
+
+    start = time.perf_counter()
+    proc = subprocess.Popen([artifact] + list(args), stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    def read_output():
+        if proc.stdout.read(1):
+            first_output[0] = time.perf_counter() - start
+        for _ in iter(lambda: proc.stdout.read(65536), b''):
+            pass
+
+    def watch_extraction():
+        # Thư mục _MEI bị xoá khi app thoát nên phải đo trong lúc chạy
+        while not done.is_set():
+            for name in _mei_dirs(temp_dir) - before:
+                extracted[0] = max(extracted[0], procstats.dir_size(os.path.join(temp_dir, name)))
+            done.wait(0.02)
+
+    reader = threading.Thread(target=read_output, daemon=True)
+    watcher = threading.Thread(target=watch_extraction, daemon=True)
+    reader.start()
+    watcher.start()
+
+    returncode, peak_rss, cpu = procstats.wait_with_usage(proc, timeout)
+    wall = time.perf_counter() - start
+    done.set()
+    reader.join(1)
+    watcher.join(1)
+
+    return {
+        'wall': wall,
+        'first_output': first_output[0],
+        'returncode': returncode,
+        'timed_out': returncode is None,
+        'peak_rss': peak_rss,
+        'cpu': cpu,
+        'extracted': extracted[0],
+    }
+
+
+def run_benchmark(artifact, runs=5, timeout=30, args=(), on_run=None):
+    """Chạy artifact runs lần; lần đầu tính là cold, các lần sau là warm"""
+    results = []
+    for i in range(runs):
+        result = run_once(artifact, args, timeout)
+        results.append(result)
+        if on_run:
+            on_run(i, result)
+
+    warm = [r['wall'] for r in results[1:] if not r['timed_out']]
+    return {
+        'runs': results,
+        'cold': results[0]['wall'] if results else None,
+        'warm': statistics.median(warm) if warm else None,
+        'peak_rss': max((r['peak_rss'] for r in results), default=0),
+        'extracted': max((r['extracted'] for r in results), default=0),
+        'timeouts': sum(r['timed_out'] for r in results),
+    }
+
+
+def load_history():
+    try:
+        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def record(artifact, options, summary):
+    """Lưu kết quả benchmark vào file lịch sử, trả về bản ghi vừa lưu"""
+    entry = {
+        'time': time.time(),
+        'artifact': artifact,
+        'name': options['name'],
+        'onefile': options['onefile'],
+        'excludes': sorted(options['excludes']),
+        'size': os.path.getsize(artifact) if os.path.isfile(artifact) else None,
+        'cold': summary['cold'],
+        'warm': summary['warm'],
+        'peak_rss': summary['peak_rss'],
+        'extracted': summary['extracted'],
+        'runs': len(summary['runs']),
+        'timeouts': summary['timeouts'],
+    }
+    history = load_history()
+    history.append(entry)
+    try:
+        os.makedirs(DATA_DIR, exist_ok=True)
+        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=1)
+    except OSError:
+        pass
+    return entry
+
+
+def history_for(name):
+    return [entry for entry in load_history() if entry['name'] == name]
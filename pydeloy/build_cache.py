@@ -0,0 +1,193 @@
+"""
+Build cache: bỏ qua PyInstaller khi script, các module local, option
+và phiên bản PyInstaller đều không đổi so với lần build trước.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+
+from pydeloy import import_graph
+
+CACHE_FILE = '.pydeloy-cache.json'
+
+# Option không ảnh hưởng tới artifact đầu ra
+IGNORED_OPTIONS = ('clean', 'cache', 'backend', 'timeout', 'shared_analysis')
+
+# In phiên bản PyInstaller và file __init__ của nó (để biết khi nào cài lại)
+VERSION_SCRIPT = 'import os, PyInstaller; print(PyInstaller.__version__); print(os.path.realpath(PyInstaller.__file__))'
+
+# command -> (file đánh dấu, mtime của nó, (interpreter, phiên bản))
+_toolchains = {}
+_toolchain_lock = threading.Lock()
+_store_lock = threading.Lock()
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _probe(command):
+    """(phiên bản, file đánh dấu) của PyInstaller mà command chạy"""
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return '', command[0]
+    lines = result.stdout.strip().splitlines() if result.returncode == 0 else []
+    if len(lines) == 2:
+        return lines[0], lines[1]
+    # `pyinstaller --version`: chính script pyinstaller được cài lại khi nâng cấp
+    return (lines[0] if lines else ''), command[0]
+
+
+def pyinstaller_toolchain(backend='subprocess'):
+    """
+    (interpreter, phiên bản PyInstaller) mà backend dùng để build: backend
+    api chạy trong module_index.default_interpreter(), backend subprocess
+    chạy pyinstaller trên PATH như runner.pyinstaller_command. Kết quả được
+    nhớ, chỉ hỏi lại interpreter khi PyInstaller được cài lại.
+    """
+    pyinstaller = shutil.which('pyinstaller') if backend == 'subprocess' else None
+    if pyinstaller:
+        command = (pyinstaller, '--version')
+    else:
+        from pydeloy.module_index import default_interpreter
+        command = (default_interpreter(), '-c', VERSION_SCRIPT)
+    with _toolchain_lock:
+        cached = _toolchains.get(command)
+        if cached and _mtime(cached[0]) == cached[1]:
+            return cached[2]
+        version, marker = _probe(list(command))
+        info = (os.path.realpath(command[0]), version)
+        _toolchains[command] = (marker, _mtime(marker), info)
+        return info
+
+
+def prefetch_toolchain(backend='subprocess'):
+    """Hỏi trước pyinstaller_toolchain trong nền, để lần dùng đầu không phải chờ"""
+    threading.Thread(target=pyinstaller_toolchain, args=(backend,), daemon=True).start()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def toolchain_info(toolchain):
+    """(interpreter, phiên bản PyInstaller, PYTHONPATH thêm) của toolchains.Toolchain"""
+    return os.path.realpath(toolchain.interpreter), toolchain.pyinstaller or '', list(toolchain.path)
+
+
+def compute_key(options, toolchain=None):
+    """
+    Hash nội dung: script + module local + option + interpreter/phiên bản
+    PyInstaller (của toolchain nếu build bằng toolchain khác)
+    """
+    script = os.path.abspath(options['script'])
+    root = os.path.dirname(script)
+
+    modules = {}
+    for path in import_graph.analyze(script).local_files():
+        modules[os.path.relpath(path, root)] = hash_file(path)
+
+    payload = {
+        'script': hash_file(script),
+        'modules': modules,
+        'options': {k: v for k, v in sorted(options.items()) if k not in IGNORED_OPTIONS},
+        'pyinstaller': (toolchain_info(toolchain) if toolchain else
+                        pyinstaller_toolchain(options.get('backend', 'subprocess'))),
+    }
+    if options.get('spec'):
+        # Spec có thể đã được sửa tay, option không phản ánh nội dung của nó
+        payload['spec'] = hash_file(options['spec'])
+    data = json.dumps(payload, sort_keys=True).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def artifact_path(options, dist_dir=None):
+    """Đường dẫn file thực thi PyInstaller sẽ tạo trong dist/ (hoặc dist_dir)"""
+    script = options['script']
+    name = options['name'] or os.path.splitext(os.path.basename(script))[0]
+    exe_name = name + '.exe' if sys.platform == 'win32' else name
+    dist_dir = dist_dir or os.path.join(os.path.dirname(script), 'dist')
+    if options['onefile']:
+        return os.path.join(dist_dir, exe_name)
+    return os.path.join(dist_dir, name, exe_name)
+
+
+def _cache_file(options):
+    return os.path.join(os.path.dirname(options['script']), 'build', CACHE_FILE)
+
+
+def _load(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _signature(options, artifact):
+    """
+    [size, mtime] của file thực thi; onedir thì thêm hash của (đường dẫn,
+    size, mtime) mọi file trong thư mục COLLECT, để file bị xoá/sửa cạnh
+    exe cũng làm cache miss. OSError nếu thiếu artifact.
+    """
+    st = os.stat(artifact)
+    signature = [st.st_size, st.st_mtime_ns]
+    if options['onefile']:
+        return signature
+    root = os.path.dirname(artifact)
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            st = os.lstat(path)
+            entries.append([os.path.relpath(path, root), st.st_size, st.st_mtime_ns])
+    digest = hashlib.sha256(json.dumps(entries).encode('utf-8')).hexdigest()
+    return signature + [digest]
+
+
+def lookup(options, key):
+    """Trả về đường dẫn artifact nếu cache hit, ngược lại None"""
+    artifact = artifact_path(options)
+    entry = _load(_cache_file(options)).get(artifact)
+    if not entry or entry.get('key') != key:
+        return None
+    try:
+        if _signature(options, artifact) != entry.get('signature'):
+            return None
+    except OSError:
+        return None
+    return artifact
+
+
+def store(options, key):
+    """Ghi lại key của artifact vừa build xong"""
+    artifact = artifact_path(options)
+    try:
+        signature = _signature(options, artifact)
+    except OSError:
+        return
+
+    path = _cache_file(options)
+    # Các job batch chạy song song có thể cùng ghi một file cache
+    with _store_lock:
+        entries = _load(path)
+        entries[artifact] = {'key': key, 'signature': signature}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, indent=2)
+        except OSError:
+            pass
@@ -0,0 +1,130 @@
+"""
+Lịch sử build trong SQLite: thời gian từng giai đoạn PyInstaller, tổng
+wall time, peak RSS và CPU time của mỗi lần build, theo script + options.
+Dùng để vẽ biểu đồ và phát hiện giai đoạn bị chậm đi (regression).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import statistics
+import time
+from contextlib import closing
+
+from pydeloy import DATA_DIR
+from pydeloy.build_cache import IGNORED_OPTIONS
+
+HISTORY_DB = os.path.join(DATA_DIR, 'build-history.sqlite3')
+
+# Chậm hơn REGRESSION_FACTOR lần trung vị của REGRESSION_WINDOW lần build
+# thành công trước đó (và chậm hơn ít nhất REGRESSION_MIN_DELTA giây)
+REGRESSION_FACTOR = 1.5
+REGRESSION_WINDOW = 5
+REGRESSION_MIN_DELTA = 1.0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    script TEXT NOT NULL,
+    name TEXT NOT NULL,
+    options_key TEXT NOT NULL,
+    options TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    wall REAL NOT NULL,
+    cpu REAL,
+    peak_rss INTEGER,
+    phases TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS builds_by_key ON builds (script, options_key, started);
+'''
+
+
+def _connect(db):
+    os.makedirs(os.path.dirname(db), exist_ok=True)
+    conn = sqlite3.connect(db)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def options_key(options):
+    """Hash các option ảnh hưởng tới build (bỏ script và các option như clean/cache)"""
+    relevant = {key: value for key, value in options.items()
+                if key not in IGNORED_OPTIONS and key != 'script'}
+    return hashlib.sha1(json.dumps(relevant, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def record(options, success, wall, cpu, peak_rss, phases, started=None, db=HISTORY_DB):
+    """Lưu một lần build; phases là list (giai đoạn, giây). Trả về id"""
+    with closing(_connect(db)) as conn, conn:
+        cursor = conn.execute(
+            'INSERT INTO builds (started, script, name, options_key, options, success, '
+            'wall, cpu, peak_rss, phases) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (started or time.time(), os.path.abspath(options['script']), options['name'] or '',
+             options_key(options), json.dumps(options, sort_keys=True), int(success),
+             wall, cpu, peak_rss, json.dumps(phases)))
+        return cursor.lastrowid
+
+
+def _row(row):
+    build = dict(row)
+    build['success'] = bool(build['success'])
+    build['phases'] = [tuple(item) for item in json.loads(build['phases'])]
+    return build
+
+
+def history(script, key=None, limit=200, db=HISTORY_DB):
+    """Các lần build của script (và options_key nếu có), cũ trước mới sau"""
+    if not os.path.isfile(db):
+        return []
+    query = 'SELECT * FROM builds WHERE script = ?'
+    params = [os.path.abspath(script)]
+    if key:
+        query += ' AND options_key = ?'
+        params.append(key)
+    query += ' ORDER BY started DESC LIMIT ?'
+    params.append(limit)
+    with closing(_connect(db)) as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [_row(row) for row in reversed(rows)]
+
+
+def option_sets(script, db=HISTORY_DB):
+    """List (options_key, options, số lần build) của script, mới dùng trước"""
+    if not os.path.isfile(db):
+        return []
+    with closing(_connect(db)) as conn:
+        rows = conn.execute(
+            'SELECT options_key, options, COUNT(*) AS builds, MAX(started) AS last FROM builds '
+            'WHERE script = ? GROUP BY options_key ORDER BY last DESC',
+            (os.path.abspath(script),)).fetchall()
+    return [(row['options_key'], json.loads(row['options']), row['builds']) for row in rows]
+
+
+def regressions(builds):
+    """
+    {id build: [(tên, giây, baseline)]} cho các build thành công có tổng
+    thời gian hoặc một giai đoạn chậm hơn hẳn các build cùng options trước đó.
+    """
+    flagged = {}
+    previous = {}
+    for build in builds:
+        if not build['success']:
+            continue
+        key = build['options_key']
+        earlier = previous.setdefault(key, [])
+        window = earlier[-REGRESSION_WINDOW:]
+        if window:
+            measures = [('Total', build['wall'], [b['wall'] for b in window])]
+            for phase, seconds in build['phases']:
+                baseline = [dict(b['phases']).get(phase) for b in window]
+                baseline = [value for value in baseline if value is not None]
+                if baseline:
+                    measures.append((phase, seconds, baseline))
+            for name, seconds, baseline in measures:
+                median = statistics.median(baseline)
+                if seconds > median * REGRESSION_FACTOR and seconds - median >= REGRESSION_MIN_DELTA:
+                    flagged.setdefault(build['id'], []).append((name, seconds, median))
+        earlier.append(build)
+    return flagged
@@ -0,0 +1,124 @@
+"""
+Parse output của PyInstaller thành các giai đoạn thật (Analysis, PYZ, PKG,
+EXE, COLLECT) để báo progress theo giai đoạn và đo thời gian từng giai
+đoạn bằng mốc ms ở đầu mỗi dòng log.
+"""
+import re
+
+# Khoảng progress (%) của từng giai đoạn, theo thứ tự chạy
+PHASE_PROGRESS = {
+    'Setup': (0, 5), 'Analysis': (5, 55), 'PYZ': (55, 65),
+    'PKG': (65, 85), 'EXE': (85, 95), 'COLLECT': (95, 99),
+}
+
+# Các bước trong Analysis và vị trí tương đối (0..1) trong giai đoạn.
+# Khớp prefix đầu tiên, nên "Analyzing <script>" phải đứng cuối
+ANALYSIS_STEPS = (
+    ('Initializing module dependency graph', 0.05),
+    ('Analyzing modules for base_library.zip', 0.1),
+    ('Caching module dependency graph', 0.45),
+    ('Reusing cached module dependency graph', 0.45),
+    ('Processing module hooks (post-graph stage)', 0.7),
+    ('Analyzing run-time hooks', 0.8),
+    ('Looking for dynamic libraries', 0.85),
+    ('Warnings written to', 0.95),
+    ('Analyzing ', 0.5),
+)
+
+LINE_PATTERN = re.compile(r'^(\d+) (DEBUG|INFO|WARNING|ERROR|CRITICAL|DEPRECATION): (.*)$')
+CHECKING_PATTERN = re.compile(r'^checking (\w+)$')
+
+COUNTER_PATTERNS = (
+    ('hooks', re.compile(r'^Processing (?:standard |pre-\S+ |pre-find module path |pre-safe import module '
+                         r'|post-graph )?(?:module )?hook\b')),
+    ('runtime_hooks', re.compile(r'^Including run-time hook')),
+    ('hidden_imports', re.compile(r'^Analyzing hidden import')),
+)
+
+
+class BuildLogParser:
+    """Nhận từng dòng output, theo dõi giai đoạn hiện tại, progress và bộ đếm"""
+
+    def __init__(self):
+        self.phase = None
+        self.progress = 0
+        # {phase: [ms bắt đầu, ms kết thúc]} theo thứ tự xuất hiện
+        self.phases = {}
+        self.rebuilt = set()
+        self.counters = {'hooks': 0, 'runtime_hooks': 0, 'hidden_imports': 0,
+                         'warnings': 0, 'errors': 0}
+        self.last_ms = None
+
+    def feed(self, line):
+        """Xử lý một dòng, trả về True nếu giai đoạn hoặc progress thay đổi"""
+        match = LINE_PATTERN.match(line.strip())
+        if not match:
+            return False
+        ms, level, message = int(match.group(1)), match.group(2), match.group(3)
+        self.last_ms = ms
+        if level == 'WARNING':
+            self.counters['warnings'] += 1
+        elif level in ('ERROR', 'CRITICAL'):
+            self.counters['errors'] += 1
+        for name, pattern in COUNTER_PATTERNS:
+            if pattern.match(message):
+                self.counters[name] += 1
+                break
+
+        changed = False
+        if self.phase is None:
+            changed = self._enter('Setup', ms)
+
+        checking = CHECKING_PATTERN.match(message)
+        if checking and checking.group(1) in PHASE_PROGRESS:
+            return self._enter(checking.group(1), ms) or changed
+        if self.phase and message.startswith(f'Building {self.phase} because'):
+            self.rebuilt.add(self.phase)
+        if self.phase == 'Analysis':
+            for prefix, fraction in ANALYSIS_STEPS:
+                if message.startswith(prefix):
+                    changed = self._advance(fraction) or changed
+                    break
+        if (self.phase and message.startswith(f'Building {self.phase}')
+                and message.endswith('completed successfully.')):
+            changed = self._advance(1.0) or changed
+        return changed
+
+    def _enter(self, phase, ms):
+        if self.phase:
+            self.phases[self.phase][1] = ms
+        previous = self.phases.get(phase)
+        self.phase = phase
+        # Spec nhiều target chạy lại một giai đoạn: cộng dồn, dời mốc bắt đầu
+        self.phases[phase] = [ms - (previous[1] - previous[0]) if previous else ms, ms]
+        return self._advance(0.0)
+
+    def _advance(self, fraction):
+        low, high = PHASE_PROGRESS[self.phase]
+        value = int(low + (high - low) * fraction)
+        if value <= self.progress:
+            return False
+        self.progress = value
+        return True
+
+    def durations(self):
+        """List (phase, giây) theo thứ tự, giai đoạn cuối tính tới dòng log cuối"""
+        result = []
+        for phase, (start, end) in self.phases.items():
+            if phase == self.phase and self.last_ms is not None:
+                end = self.last_ms
+            result.append((phase, (end - start) / 1000))
+        return result
+
+    def summary(self):
+        """Tóm tắt thời gian từng giai đoạn và bộ đếm module graph (hai dòng)"""
+        durations = self.durations()
+        if not durations:
+            return ''
+        total = sum(seconds for _, seconds in durations) or 1
+        slowest = max(durations, key=lambda item: item[1])
+        parts = ', '.join(f'{phase} {seconds:.1f} s' for phase, seconds in durations)
+        counters = self.counters
+        return (f'Phase times: {parts} (slowest: {slowest[0]}, {slowest[1] * 100 / total:.0f}%)\n'
+                f'Module graph: {counters["hooks"]} hooks, {counters["runtime_hooks"]} run-time hooks, '
+                f'{counters["hidden_imports"]} hidden imports, {counters["warnings"]} warnings')
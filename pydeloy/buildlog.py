@@ -0,0 +1,74 @@
+"""
+Log đầy đủ của từng build được ghi ra đĩa, UI chỉ giữ phần cuối.
+Chỉ giữ KEEP_LOGS file mới nhất, nhưng không xoá log của build đang chạy
+hay log mới hơn build đang chạy lâu nhất (batch nhiều hơn KEEP_LOGS job).
+"""
+import datetime
+import glob
+import os
+import threading
+import time
+
+from pydeloy import DATA_DIR
+
+LOG_DIR = os.path.join(DATA_DIR, 'logs')
+KEEP_LOGS = 50
+
+# {path: thời điểm bắt đầu} của các log đang được ghi (open_log)
+_running = {}
+_running_lock = threading.Lock()
+
+
+def _logs():
+    """[(mtime, path)] của các log còn trên đĩa, cũ nhất trước"""
+    logs = []
+    for path in glob.glob(os.path.join(LOG_DIR, '*.log')):
+        try:
+            logs.append((os.path.getmtime(path), path))
+        except OSError:
+            # Bị xoá giữa glob và stat (process khác cũng đang dọn)
+            pass
+    return sorted(logs)
+
+
+def prune():
+    """Xoá log cũ cho còn dưới KEEP_LOGS file, chừa chỗ cho một log mới"""
+    with _running_lock:
+        running = dict(_running)
+    oldest = min(running.values(), default=None)
+    logs = _logs()
+    for mtime, old in logs[:max(0, len(logs) - KEEP_LOGS + 1)]:
+        if oldest is not None and mtime >= oldest:
+            break
+        if old in running:
+            continue
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def new_log_path(name):
+    """Đường dẫn file log cho một build mới, xoá bớt log cũ"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    prune()
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return os.path.join(LOG_DIR, f'{name}-{stamp}.log')
+
+
+def open_log(path):
+    """Mở log để ghi; prune không đụng tới log này tới khi close_log"""
+    with _running_lock:
+        _running[path] = time.time()
+    try:
+        return open(path, 'w', encoding='utf-8')
+    except OSError:
+        with _running_lock:
+            _running.pop(path, None)
+        raise
+
+
+def close_log(log_file):
+    log_file.close()
+    with _running_lock:
+        _running.pop(log_file.name, None)
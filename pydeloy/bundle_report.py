@@ -0,0 +1,170 @@
+"""
+Phân tích dung lượng bundle sau khi build: đọc TOC trong workpath, archive
+PYZ (module Python đã nén) và PKG (binary/data) để biết thứ gì làm EXE to.
+"""
+import ast
+import glob
+import marshal
+import os
+import re
+import struct
+
+PYZ_MAGIC = b'PYZ\0'
+PKG_COOKIE_MAGIC = b'MEI\014\013\012\013\016'
+PKG_COOKIE_FORMAT = '!8sIIII64s'
+PKG_ENTRY_FORMAT = '!IIIIBc'
+
+PKG_KINDS = {
+    'b': 'binary', 'x': 'data', 's': 'script', 'm': 'module', 'M': 'module',
+    'Z': 'zip', 'l': 'splash', 'd': 'binary',
+}
+EXTENSION_PATTERN = re.compile(r'(lib-dynload/|\.cpython-|\.abi3\.|\.pyd$)')
+TOC_KINDS = {
+    'BINARY': 'binary', 'EXTENSION': 'extension', 'DATA': 'data',
+    'ZIPFILE': 'zip', 'SPLASH': 'splash',
+}
+
+
+class BundleEntry:
+    def __init__(self, name, package, kind, size):
+        self.name = name
+        self.package = package
+        self.kind = kind
+        self.size = size
+
+
+class BundleReport:
+    def __init__(self, build_dir, entries):
+        self.build_dir = build_dir
+        self.entries = entries
+
+    @property
+    def total_size(self):
+        return sum(entry.size for entry in self.entries)
+
+    def by_package(self):
+        """List (package, size, số entry) xếp giảm dần theo dung lượng"""
+        packages = {}
+        for entry in self.entries:
+            size, count = packages.get(entry.package, (0, 0))
+            packages[entry.package] = (size + entry.size, count + 1)
+        rows = [(name, size, count) for name, (size, count) in packages.items()]
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows
+
+
+def read_pyz(path):
+    """{module: dung lượng nén} từ PYZ archive"""
+    with open(path, 'rb') as f:
+        if f.read(4) != PYZ_MAGIC:
+            raise ValueError(f'{path} is not a PYZ archive')
+        f.read(4)  # magic của bytecode Python
+        toc_offset, = struct.unpack('!i', f.read(4))
+        f.seek(toc_offset)
+        toc = dict(marshal.load(f))
+    # Entry là (typecode, offset, length) hoặc (ispkg, offset, length) ở bản cũ
+    return {name: entry[-1] for name, entry in toc.items()}
+
+
+def read_pkg(path):
+    """List (tên, dung lượng nén, typecode) từ CArchive (PKG)"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        # Cookie nằm ở cuối archive
+        tail_start = max(0, end - 4096)
+        f.seek(tail_start)
+        cookie_pos = f.read().rfind(PKG_COOKIE_MAGIC)
+        if cookie_pos == -1:
+            raise ValueError(f'{path} is not a PKG archive')
+        cookie_pos += tail_start
+        f.seek(cookie_pos)
+        cookie_size = struct.calcsize(PKG_COOKIE_FORMAT)
+        _, length, toc_offset, toc_length, _, _ = struct.unpack(PKG_COOKIE_FORMAT, f.read(cookie_size))
+        start = cookie_pos + cookie_size - length
+        f.seek(start + toc_offset)
+        data = f.read(toc_length)
+
+    entries = []
+    header_size = struct.calcsize(PKG_ENTRY_FORMAT)
+    pos = 0
+    while pos < len(data):
+        entry_length, _, compressed, _, _, typecode = struct.unpack(
+            PKG_ENTRY_FORMAT, data[pos:pos + header_size])
+        name = data[pos + header_size:pos + entry_length].rstrip(b'\0').decode('utf-8')
+        entries.append((name, compressed, typecode.decode('ascii')))
+        pos += entry_length
+    return entries
+
+
+def read_toc(path):
+    """Các entry (dest, src, typecode) trong một file .toc của workpath"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = ast.literal_eval(f.read())
+
+    entries = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (list, tuple)):
+            if (len(node) == 3 and all(isinstance(x, str) for x in node)
+                    and node[2].isupper()):
+                entries.append(tuple(node))
+            else:
+                stack.extend(node)
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+    return entries
+
+
+def package_of(name, kind):
+    """Gom entry theo package top-level (hoặc tên thư viện với binary)"""
+    if kind == 'module':
+        return name.split('.')[0]
+    parts = name.replace('\\', '/').split('/')
+    if len(parts) > 1 and not re.match(r'python\d', parts[0]) and parts[0] not in ('lib-dynload', '_internal'):
+        return parts[0]
+    return parts[-1].split('.')[0]
+
+
+def analyze_build(build_dir):
+    """Đọc artifact trong build_dir (workpath/<name>) thành BundleReport"""
+    entries = []
+    seen = set()
+
+    for pyz in glob.glob(os.path.join(build_dir, 'PYZ-*.pyz')):
+        for module, size in read_pyz(pyz).items():
+            entries.append(BundleEntry(module, package_of(module, 'module'), 'module', size))
+
+    for pkg in glob.glob(os.path.join(build_dir, '*.pkg')):
+        for name, size, typecode in read_pkg(pkg):
+            kind = PKG_KINDS.get(typecode)
+            if not kind or name in seen:
+                continue
+            if kind == 'binary' and EXTENSION_PATTERN.search(name.replace('\\', '/')):
+                kind = 'extension'
+            seen.add(name)
+            entries.append(BundleEntry(name, package_of(name, kind), kind, size))
+
+    # Onedir: binary/data nằm cạnh EXE chứ không nằm trong PKG
+    for collect in glob.glob(os.path.join(build_dir, 'COLLECT-*.toc')):
+        for dest, src, typecode in read_toc(collect):
+            kind = TOC_KINDS.get(typecode)
+            if not kind or dest in seen or not os.path.isfile(src):
+                continue
+            seen.add(dest)
+            entries.append(BundleEntry(dest, package_of(dest, kind), kind, os.path.getsize(src)))
+
+    if not entries:
+        raise FileNotFoundError(f'No PyInstaller artifacts found in {build_dir}')
+    return BundleReport(build_dir, entries)
+
+
+def suggest_excludes(report, candidates, limit=10):
+    """
+    Các package trong bundle cũng nằm trong tập candidates (module có thể
+    exclude), xếp theo dung lượng thực tế trong bundle.
+    """
+    candidates = set(candidates)
+    rows = [row for row in report.by_package() if row[0] in candidates]
+    return rows[:limit]
@@ -0,0 +1,66 @@
+"""
+Huỷ build: CancelToken dùng chung giữa UI/CLI và runner, và kill cả cây
+process (PyInstaller tự chạy thêm process con khi phân tích hook).
+"""
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+# Popen kwargs: process con đứng đầu một process group riêng để kill cả cây
+if sys.platform == 'win32':
+    NEW_GROUP = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    NEW_GROUP = {'start_new_session': True}
+
+# Lý do mặc định khi người dùng bấm Cancel / Ctrl+C (timeout có lý do riêng)
+USER_CANCEL = 'cancelled by user'
+
+
+def kill_tree(pid):
+    """Kill process pid và mọi process con của nó"""
+    try:
+        if sys.platform == 'win32':
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        # Process đã thoát
+        pass
+
+
+class CancelToken:
+    """Cờ huỷ kèm các callback (vd. kill process) chạy ngay khi bị huỷ"""
+
+    def __init__(self):
+        self.reason = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self.reason is not None
+
+    def cancel(self, reason=USER_CANCEL):
+        with self._lock:
+            if self.reason is not None:
+                return
+            self.reason = reason
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Đăng ký callback; nếu đã bị huỷ thì gọi luôn"""
+        with self._lock:
+            if self.reason is None:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
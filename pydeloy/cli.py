@@ -0,0 +1,425 @@
+"""
+CLI không cần Qt:
+
+    python -m pydeloy build app.py --onedir --hidden-import requests
+    python -m pydeloy build --config builds.json --jobs 8
+    python -m pydeloy build app.py admin.py --merge suite
+    python -m pydeloy build --spec app.spec
+    python -m pydeloy trace app.py --args "--version"
+    python -m pydeloy build app.py --minimal --trace-args "--selftest"
+    python -m pydeloy warnings app.py
+    python -m pydeloy build app.py --matrix py3.11-pyi6.3.0,py3.12-pyi6.10.0
+    python -m pydeloy toolchains --add ~/venvs/py312/bin/python
+"""
+import argparse
+import copy
+import os
+import shlex
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pydeloy import (buildlog, config, import_graph, import_trace, matrix,
+                     minimal_bundle, module_index, multi_target, runner, shared_analysis, spec_file,
+                     toolchains, warn_report, worker)
+from pydeloy.cancel import CancelToken
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pydeloy', description='PyInstaller build front-end')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='build one or more scripts')
+    build.add_argument('scripts', nargs='*', help='Python entry scripts')
+    build.add_argument('--config', action='append', default=[],
+                       help='JSON config file (may be given several times)')
+    build.add_argument('--spec', action='append', default=[],
+                       help='build from an existing .spec file (may be given several times)')
+    build.add_argument('--onefile', dest='onefile', action='store_true', default=None)
+    build.add_argument('--onedir', dest='onefile', action='store_false')
+    build.add_argument('--noconsole', action='store_true', default=None)
+    build.add_argument('--no-clean', dest='clean', action='store_false', default=None)
+    build.add_argument('--incremental', action='store_true', default=None)
+    build.add_argument('--no-cache', dest='cache', action='store_false', default=None)
+    build.add_argument('--name', help='output name (single script only)')
+    build.add_argument('--icon')
+    build.add_argument('--gui', choices=config.GUI_FRAMEWORKS)
+    build.add_argument('--hidden-import', dest='hidden_imports', action='append')
+    build.add_argument('--exclude-module', dest='excludes', action='append')
+    build.add_argument('--add-data', dest='datas', action='append', type=config.parse_pair,
+                       metavar='SRC:DEST')
+    build.add_argument('--add-binary', dest='binaries', action='append', type=config.parse_pair,
+                       metavar='SRC:DEST')
+    build.add_argument('--exclude-binary', dest='binary_excludes', action='append', metavar='GLOB',
+                       help='drop collected binaries whose destination path matches (builds via a spec)')
+    build.add_argument('--exclude-pure', dest='pure_excludes', action='append', metavar='GLOB',
+                       help='drop Python modules matching from the PYZ (builds via a spec)')
+    build.add_argument('--backend', choices=runner.BACKENDS,
+                       help='subprocess: a new pyinstaller process per build (default); '
+                            'api: PyInstaller API in a reused worker process (relies on '
+                            'PyInstaller internals, falls back to subprocess on untested versions)')
+    build.add_argument('--no-shared-analysis', dest='shared_analysis', action='store_false',
+                       default=None,
+                       help='do not pre-analyze the project\'s third-party packages in the worker')
+    build.add_argument('--timeout', type=float,
+                       help='cancel a build that runs longer than this many seconds')
+    build.add_argument('--auto-exclude', action='store_true',
+                       help='add the excludes the GUI "Auto detect" button would select')
+    build.add_argument('--trace-imports', action='store_true',
+                       help='run each script once under an import tracer and add the modules '
+                            'static analysis misses as hidden imports')
+    build.add_argument('--minimal', action='store_true',
+                       help='trace a smoke run (the script with --trace-args), strip every module '
+                            'it did not load, then run the frozen app the same way to verify')
+    build.add_argument('--trace-timeout', type=float, default=import_trace.DEFAULT_TIMEOUT,
+                       help='seconds a traced, smoke or --matrix startup run may take before it '
+                            f'is stopped (default: {import_trace.DEFAULT_TIMEOUT})')
+    build.add_argument('--trace-args', default='',
+                       help='arguments for the traced run (the smoke command with --minimal)')
+    build.add_argument('--merge', metavar='NAME',
+                       help='build all scripts as one onedir bundle NAME: one spec, one '
+                            'executable per script, shared binaries and libraries')
+    build.add_argument('--matrix', nargs='?', const='all', metavar='TOOLCHAINS',
+                       help='build the script with several toolchains in parallel (comma separated '
+                            'names from "pydeloy toolchains", default: all) and compare build time, '
+                            'size and startup time')
+    build.add_argument('--matrix-runs', type=int, default=3,
+                       help='startup runs per toolchain with --matrix (default: 3, 0 to skip)')
+    build.add_argument('--matrix-args', default='',
+                       help='arguments for the startup runs with --matrix')
+    build.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                       help='number of concurrent builds (default: CPU count)')
+    build.add_argument('--print-command', action='store_true',
+                       help='only print the PyInstaller commands')
+
+    trace = subparsers.add_parser('trace', help='list the imports a script loads at run time '
+                                                'that static analysis misses')
+    trace.add_argument('script')
+    trace.add_argument('--timeout', type=float, default=import_trace.DEFAULT_TIMEOUT,
+                       help='seconds the script may run before it is stopped '
+                            f'(default: {import_trace.DEFAULT_TIMEOUT})')
+    trace.add_argument('--args', default='', help='arguments for the traced run')
+    trace.add_argument('--hidden-import', dest='hidden_imports', action='append', default=[])
+    trace.add_argument('--exclude-module', dest='excludes', action='append', default=[])
+
+    warnings = subparsers.add_parser('warnings', help="report the missing modules of a script's last "
+                                                      'build, grouped by the module importing them')
+    warnings.add_argument('script')
+    warnings.add_argument('--name', help='executable name used for the build')
+    warnings.add_argument('--all', action='store_true',
+                          help='also list optional and other-platform imports')
+
+    chains = subparsers.add_parser('toolchains', help='list, register or remove interpreters with '
+                                                      'PyInstaller for --matrix builds')
+    chains.add_argument('--add', metavar='INTERPRETER', help='register a Python interpreter')
+    chains.add_argument('--name', help='name for --add (default: from the Python/PyInstaller versions)')
+    chains.add_argument('--path', action='append', default=[],
+                        help='extra PYTHONPATH entry for --add, e.g. a pip --target folder')
+    chains.add_argument('--default', action='store_true',
+                        help='with --add: use it as the default PyInstaller')
+    chains.add_argument('--remove', metavar='NAME', help='remove a registered toolchain')
+    chains.add_argument('--project', help='also look for virtual environments in this folder')
+    return parser
+
+
+def collect_builds(args):
+    overrides = {key: value for key, value in (
+        ('onefile', args.onefile), ('noconsole', args.noconsole), ('clean', args.clean),
+        ('incremental', args.incremental), ('cache', args.cache), ('icon', args.icon),
+        ('gui', args.gui), ('hidden_imports', args.hidden_imports), ('excludes', args.excludes),
+        ('backend', args.backend), ('timeout', args.timeout),
+        ('shared_analysis', args.shared_analysis), ('datas', args.datas),
+        ('binaries', args.binaries), ('binary_excludes', args.binary_excludes),
+        ('pure_excludes', args.pure_excludes),
+    ) if value is not None}
+
+    # Mỗi build một bản list riêng: auto_exclude/trace_imports sửa list tại chỗ
+    fresh = lambda: copy.deepcopy(overrides)
+
+    builds = []
+    for path in args.config:
+        try:
+            loaded = config.load_config(path)
+        except OSError as e:
+            raise SystemExit(f'error: {path}: {e.strerror}')
+        except (ValueError, TypeError) as e:
+            # json.JSONDecodeError cũng là ValueError; TypeError khi build không phải dict
+            raise SystemExit(f'error: {path}: {e}')
+        except KeyError as e:
+            raise SystemExit(f'error: {path}: missing {e}')
+        for options in loaded:
+            options.update(fresh())
+            builds.append(options)
+    for path in args.spec:
+        try:
+            targets, warnings = spec_file.parse_spec(path)
+        except OSError as e:
+            raise SystemExit(f'error: {path}: {e.strerror}')
+        except spec_file.SpecError as e:
+            # SpecError đã có đường dẫn spec ở đầu
+            raise SystemExit(f'error: {e}')
+        for warning in warnings:
+            print(f'{path}: {warning}', file=sys.stderr)
+        options = dict(targets[0], **fresh())
+        builds.append(spec_file.spec_build_options(options, path, len(targets)))
+    for script in args.scripts:
+        builds.append(config.make_options(script, **fresh()))
+
+    if args.name:
+        if len(builds) != 1:
+            raise SystemExit('--name can only be used with a single script')
+        builds[0]['name'] = args.name
+    return builds
+
+
+def auto_exclude(options):
+    roots = config.get_gui_imports(options['gui']) + options['hidden_imports']
+    used_modules = import_graph.analyze(options['script']).top_level_names()
+    candidates, _ = module_index.propose_excludes(options['script'], roots)
+    for name in config.detect_excludes(options, used_modules, candidates):
+        if name not in options['excludes']:
+            options['excludes'].append(name)
+
+
+def trace_imports(options, args, timeout, verbose=False):
+    """Chạy thử script, in module bị phân tích tĩnh bỏ sót, trả về hidden import đề xuất"""
+    result, missing, suggestions, source = import_trace.trace_options(
+        options, shlex.split(args), timeout)
+    status = 'stopped after time limit' if result.timed_out else f'exit code {result.returncode}'
+    print(f'[{options["name"]}] Traced run: {len(result.modules)} modules loaded in '
+          f'{result.elapsed:.1f} s ({status}), compared with {source}')
+    if result.returncode:
+        print(result.output.rstrip()[-2000:], file=sys.stderr)
+    if verbose:
+        for module in missing:
+            print(f'  {module.name:<40} {module.how:<8} from {module.importer}')
+    if suggestions:
+        print(f'[{options["name"]}] Hidden imports: {", ".join(suggestions)}')
+    return suggestions
+
+
+def build_workpaths(builds):
+    """[(options, workpath)]: nhiều build song song thì mỗi build dùng workpath riêng"""
+    if len(builds) > 1:
+        return config.job_workpaths(builds)
+    return [(options, None) for options in builds]
+
+
+def run_builds(builds, jobs, minimal=None):
+    print_lock = threading.Lock()
+    prefix = len(builds) > 1
+
+    def emit(name, line):
+        with print_lock:
+            print(f'[{name}] {line}' if prefix else line, flush=True)
+
+    # Ctrl+C huỷ mọi build: build đang chạy bị kill, build chưa chạy bỏ qua
+    tokens = [CancelToken() for _ in builds]
+
+    def build(options, workpath, cancel):
+        pyi_args = spec_file.pyinstaller_args(options, workpath)
+        log_path = buildlog.new_log_path(options['name'])
+        success, message = runner.run_build(pyi_args, options,
+                                            on_output=lambda line: emit(options['name'], line),
+                                            log_path=log_path, cancel=cancel)
+        emit(options['name'], message)
+        if not success:
+            emit(options['name'], f'Full log: {log_path}')
+        return success
+
+    def run(options, workpath, cancel):
+        if minimal is None:
+            return build(options, workpath, cancel)
+        args, timeout = minimal
+        success, message = minimal_bundle.run_minimal(
+            options, lambda opts: build(opts, workpath, cancel), args, timeout,
+            on_output=lambda line: emit(options['name'], line), cancel=cancel)
+        emit(options['name'], message)
+        return success
+
+    # Ghi package của mọi script trước, để mọi worker dựng cùng một graph dùng chung
+    for options in builds:
+        if options['backend'] == 'api' and options['shared_analysis']:
+            try:
+                shared_analysis.project_packages(options)
+            except (RuntimeError, OSError, subprocess.SubprocessError):
+                pass
+
+    executor = ThreadPoolExecutor(max_workers=max(1, jobs))
+    futures = [executor.submit(run, options, workpath, cancel)
+               for (options, workpath), cancel in zip(build_workpaths(builds), tokens)]
+    try:
+        results = [future.result() for future in futures]
+    except KeyboardInterrupt:
+        for cancel in tokens:
+            cancel.cancel()
+        results = [future.result() for future in futures]
+    finally:
+        executor.shutdown()
+        worker.shutdown()
+
+    failed = [options['name'] for options, ok in zip(builds, results) if not ok]
+    if prefix:
+        print(f'\n{len(builds) - len(failed)}/{len(builds)} builds succeeded')
+    if failed:
+        print('Failed: ' + ', '.join(failed), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_merged(builds, name):
+    log_path = buildlog.new_log_path(name)
+    cancel = CancelToken()
+    try:
+        success, message = multi_target.run_multi_target(
+            builds, name, on_output=lambda line: print(line, flush=True),
+            log_path=log_path, cancel=cancel)
+    except KeyboardInterrupt:
+        cancel.cancel()
+        success, message = False, 'Build bị huỷ'
+    finally:
+        worker.shutdown()
+    print(message)
+    if not success:
+        print(f'Full log: {log_path}')
+    return 0 if success else 1
+
+
+def run_matrix(options, names, jobs, runs, timeout, args):
+    try:
+        selected = toolchains.select([] if names == 'all' else names.split(','),
+                                     os.path.dirname(options['script']))
+    except KeyError as e:
+        raise SystemExit(f'Unknown toolchain(s): {e.args[0]} (see "pydeloy toolchains")')
+    if not selected:
+        raise SystemExit('No toolchain with PyInstaller found (see "pydeloy toolchains --add")')
+    print(f'Matrix: {", ".join(t.name for t in selected)}', flush=True)
+
+    cancel = CancelToken()
+    results = []
+    print_lock = threading.Lock()
+
+    def emit(line):
+        with print_lock:
+            print(line, flush=True)
+
+    # Chạy trong thread riêng để Ctrl+C huỷ được mọi build đang chạy
+    thread = threading.Thread(target=lambda: results.extend(matrix.run_matrix(
+        options, selected, jobs, runs, timeout, args, on_output=emit, cancel=cancel)))
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        cancel.cancel()
+        thread.join()
+    if cancel.cancelled:
+        return 1
+    print()
+    for line in matrix.format_table(results):
+        print(line)
+    return 0 if all(result.success for result in results) else 1
+
+
+def run_toolchains(args):
+    if args.add:
+        try:
+            toolchain = toolchains.register(args.add, args.name, args.path, args.default)
+        except (RuntimeError, ValueError) as e:
+            raise SystemExit(str(e))
+        print(f'Registered {toolchain.label()}')
+        return 0
+    if args.remove:
+        try:
+            toolchains.unregister(args.remove)
+        except KeyError:
+            raise SystemExit(f'{args.remove} is not registered')
+        print(f'Removed {args.remove}')
+        return 0
+    registered, default = toolchains.load_registry()
+    registered = {t.name for t in registered}
+    for toolchain in toolchains.available(args.project and os.path.abspath(args.project)):
+        source = 'default' if toolchain.name == default else (
+            'registered' if toolchain.name in registered else 'found')
+        path = f' +{os.pathsep.join(toolchain.path)}' if toolchain.path else ''
+        print(f'{toolchain.label():<50} {source:<10} {toolchain.interpreter}{path}')
+    return 0
+
+
+def run_trace(args):
+    options = config.make_options(args.script, hidden_imports=args.hidden_imports,
+                                  excludes=args.excludes)
+    suggestions = trace_imports(options, args.args, args.timeout, verbose=True)
+    if suggestions:
+        print(' '.join(f'--hidden-import {name}' for name in suggestions))
+    else:
+        print('Static analysis found every module the run loaded')
+    return 0
+
+
+def run_warnings(args):
+    options = config.make_options(args.script, name=args.name or '')
+    workpath = warn_report.latest_workpath(options)
+    report = warn_report.load_report(options, workpath=workpath) if workpath else None
+    if report is None:
+        raise SystemExit(f'No warn file for {options["name"]}, build {args.script} first')
+    print(report.summary())
+    categories = None if args.all else (warn_report.CRITICAL, warn_report.EXCLUDED)
+    flags = []
+    for importer, modules in report.by_importer(categories).items():
+        print(importer)
+        for module in modules:
+            kinds = ', '.join(sorted(next(k for name, k in module.importers if name == importer)))
+            line = f'  {module.name:<40} {module.category:<9} {kinds}'
+            if module.fix:
+                line += f' -> {warn_report.describe_fix(module.fix)}'
+                flag = warn_report.fix_flag(module.fix)
+                if flag and flag not in flags:
+                    flags.append(flag)
+            print(line)
+    if flags:
+        print(' '.join(flags))
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'trace':
+        return run_trace(args)
+    if args.command == 'warnings':
+        return run_warnings(args)
+    if args.command == 'toolchains':
+        return run_toolchains(args)
+
+    builds = collect_builds(args)
+    if not builds:
+        raise SystemExit('No scripts given (pass scripts, --config or --spec)')
+
+    if args.auto_exclude:
+        for options in builds:
+            auto_exclude(options)
+
+    if args.trace_imports:
+        for options in builds:
+            options['hidden_imports'] += trace_imports(options, args.trace_args, args.trace_timeout)
+
+    if args.matrix:
+        if len(builds) != 1:
+            raise SystemExit('--matrix builds a single script')
+        return run_matrix(builds[0], args.matrix, args.jobs, args.matrix_runs, args.trace_timeout,
+                          shlex.split(args.matrix_args))
+
+    if args.merge:
+        if args.print_command:
+            builds = [dict(options, onefile=False) for options in builds]
+            print(multi_target.generate_spec(builds, args.merge), end='')
+            return 0
+        return run_merged(builds, args.merge)
+
+    if args.print_command:
+        for options, workpath in build_workpaths(builds):
+            print(spec_file.build_command(options, workpath))
+        return 0
+
+    minimal = (shlex.split(args.trace_args), args.trace_timeout) if args.minimal else None
+    return run_builds(builds, args.jobs, minimal)
@@ -0,0 +1,76 @@
+"""
+Model cho phần xem trước lệnh PyInstaller: nhớ lệnh của bộ option gần
+nhất, chỉ tạo lại khi option thật sự đổi (gõ thêm dấu cách, chọn lại đúng
+các module cũ thì không), và tính phần chữ đổi để view sửa tại chỗ thay
+vì thay cả document.
+"""
+from pydeloy import spec_file
+
+# Gom các lần sửa liên tiếp (gõ phím, chọn module) thành một lần cập nhật
+DEBOUNCE_MS = 150
+
+
+def options_key(options):
+    """Khoá hashable của dict option"""
+    return tuple(sorted((key, repr(value)) for key, value in options.items()))
+
+
+def text_diff(old, new):
+    """
+    (vị trí, số ký tự bỏ, chuỗi chèn) để biến old thành new, theo phần
+    đầu và phần cuối chung. None nếu giống nhau.
+    """
+    if old == new:
+        return None
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    return start, len(old) - start - end, new[start:len(new) - end]
+
+
+def utf16_len(text):
+    """Độ dài text theo đơn vị UTF-16, đơn vị vị trí của QTextCursor"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def utf16_diff(old, diff):
+    """text_diff(old, ...) với vị trí và số ký tự bỏ tính theo UTF-16 (ký tự ngoài BMP tính 2)"""
+    if diff is None:
+        return None
+    start, removed, inserted = diff
+    return utf16_len(old[:start]), utf16_len(old[start:start + removed]), inserted
+
+
+class CommandModel:
+    """Lệnh PyInstaller của options, memo theo options_key"""
+
+    def __init__(self, build=spec_file.build_command):
+        self.build = build
+        self.key = None
+        self.text = ''
+        # Số lần tạo lệnh thật sự, để đo
+        self.builds = 0
+
+    def command(self, options):
+        if not options.get('script'):
+            self.key, self.text = None, ''
+            return self.text
+        key = options_key(options)
+        if key != self.key:
+            self.text = self.build(options)
+            self.key = key
+            self.builds += 1
+        return self.text
+
+    def update(self, options):
+        """
+        Lệnh mới và text_diff so với lệnh trước (None nếu không đổi), vị trí
+        tính theo UTF-16 như QTextCursor
+        """
+        old = self.text
+        new = self.command(options)
+        return new, utf16_diff(old, text_diff(old, new))
@@ -0,0 +1,232 @@
+"""
+Build config dùng chung cho GUI và CLI: option mặc định, hidden imports
+theo GUI framework, danh sách exclude và tạo lệnh PyInstaller. Không
+import Qt.
+"""
+import json
+import os
+import shlex
+import subprocess
+import sys
+
+from pydeloy import incremental
+
+GUI_FRAMEWORKS = ['None', 'Tkinter', 'CustomTkinter', 'PyQt5', 'PyQt6',
+                  'PySide2', 'PySide6', 'Kivy', 'Pygame']
+
+GUI_IMPORTS = {
+    'Tkinter': ['tkinter', 'tkinter.ttk', '_tkinter'],
+    'CustomTkinter': ['customtkinter', 'tkinter', '_tkinter'],
+    'PyQt5': ['PyQt5', 'PyQt5.QtCore', 'PyQt5.QtGui', 'PyQt5.QtWidgets'],
+    'PyQt6': ['PyQt6', 'PyQt6.QtCore', 'PyQt6.QtGui', 'PyQt6.QtWidgets'],
+    'PySide2': ['PySide2', 'PySide2.QtCore', 'PySide2.QtGui', 'PySide2.QtWidgets'],
+    'PySide6': ['PySide6', 'PySide6.QtCore', 'PySide6.QtGui', 'PySide6.QtWidgets'],
+    'Kivy': ['kivy', 'kivy.core.window'],
+    'Pygame': ['pygame', 'pygame.mixer', 'pygame.font']
+}
+
+COMMON_EXCLUDES = [
+    'unittest', 'test', 'doctest', 'pydoc',
+    'tkinter', 'PyQt5', 'PyQt6', 'PySide2',
+    'PySide6', 'matplotlib', 'scipy', 'pandas',
+    'numpy', 'PIL', 'wx', 'sqlite3', 'email'
+]
+
+DEFAULT_OPTIONS = {
+    'clean': True,
+    'incremental': False,
+    'cache': True,
+    'onefile': True,
+    'noconsole': False,
+    'name': '',
+    'icon': '',
+    'gui': 'None',
+    'hidden_imports': [],
+    'excludes': [],
+    # [nguồn, thư mục đích] như --add-data / --add-binary
+    'datas': [],
+    'binaries': [],
+    # Glob lọc binary (tên đích) và module trong PYZ, chỉ build qua spec được
+    'binary_excludes': [],
+    'pure_excludes': [],
+    # Build thẳng từ file .spec này (bỏ qua các option tạo lệnh ở trên)
+    'spec': '',
+    # 'subprocess': mỗi build một process pyinstaller mới,
+    # 'api': chạy PyInstaller.__main__.run trong worker dùng lại được
+    # (dựa vào phần nội bộ của PyInstaller, xem worker)
+    'backend': 'subprocess',
+    # Dựng sẵn module graph các package bên thứ ba của cả project trong worker
+    'shared_analysis': True,
+    # Tự huỷ build chạy quá số giây này (0: không giới hạn)
+    'timeout': 0,
+}
+
+
+def get_gui_imports(framework):
+    return list(GUI_IMPORTS.get(framework, []))
+
+
+def make_options(script, **overrides):
+    """Option đầy đủ cho một script, điền giá trị mặc định như trên GUI"""
+    options = dict(DEFAULT_OPTIONS, **overrides)
+    options['script'] = os.path.abspath(script)
+    for key in ('hidden_imports', 'excludes', 'binary_excludes', 'pure_excludes'):
+        options[key] = list(options[key])
+    for key in ('datas', 'binaries'):
+        options[key] = [list(entry) for entry in options[key]]
+    if not options['name']:
+        options['name'] = os.path.splitext(os.path.basename(script))[0]
+    unknown = set(options) - set(DEFAULT_OPTIONS) - {'script'}
+    if unknown:
+        raise ValueError(f'Unknown option(s): {", ".join(sorted(unknown))}')
+    return options
+
+
+def load_config(path):
+    """
+    Đọc file JSON config, trả về list option. File có thể là một dict
+    option, một list dict, hoặc {"defaults": {...}, "builds": [...]}.
+    Đường dẫn script (và spec) tương đối được tính theo thư mục chứa file config.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    defaults = {}
+    if isinstance(data, dict) and 'builds' in data:
+        defaults = data.get('defaults', {})
+        builds = data['builds']
+    elif isinstance(data, list):
+        builds = data
+    else:
+        builds = [data]
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    result = []
+    for build in builds:
+        entry = dict(defaults, **build)
+        script = os.path.join(base_dir, entry.pop('script'))
+        if entry.get('spec'):
+            entry['spec'] = os.path.join(base_dir, entry['spec'])
+        result.append(make_options(script, **entry))
+    return result
+
+
+def workpath_for(options):
+    if options['incremental']:
+        return incremental.script_workpath(options)
+    return os.path.join(os.path.dirname(options['script']), 'build')
+
+
+def job_workpaths(builds):
+    """
+    [(options, workpath)] cho các build chạy song song: mỗi build một
+    workpath build/<name>. Build trùng workpath với build trước (cùng thư
+    mục, cùng tên) được thêm hậu tố -2, -3... và bỏ incremental, vì state
+    incremental gắn với build/<name>.
+    """
+    jobs = []
+    seen = set()
+    for options in builds:
+        workpath = incremental.script_workpath(options)
+        suffix = 1
+        while os.path.normcase(workpath) in seen:
+            suffix += 1
+            workpath = f'{incremental.script_workpath(options)}-{suffix}'
+        seen.add(os.path.normcase(workpath))
+        if suffix > 1:
+            options = dict(options, incremental=False)
+        jobs.append((options, workpath))
+    return jobs
+
+
+def build_dir(options):
+    """Thư mục PyInstaller ghi TOC/PYZ/PKG của options: workpath/<name>"""
+    return os.path.join(workpath_for(options), options['name'])
+
+
+def build_args(options, workpath=None):
+    """Tạo argv cho PyInstaller (không gồm tên chương trình) từ dict option"""
+    script = options['script']
+    args = []
+
+    if workpath is None or options['incremental']:
+        workpath = workpath_for(options)
+
+    if options['incremental']:
+        # --clean khi toolchain đổi do runner.run_build quyết định lúc build,
+        # để lệnh xem trước không phải hỏi interpreter
+        args.append('-y')
+    elif options['clean']:
+        args += ['--clean', '-y']
+    if options['onefile']:
+        args.append('--onefile')
+    if options['noconsole']:
+        args.append('--noconsole')
+    if options['name']:
+        args.append(f'--name={options["name"]}')
+    if options['icon']:
+        args.append(f'--icon={options["icon"]}')
+
+    file_dir = os.path.dirname(script)
+    args.append(f'--distpath={os.path.join(file_dir, "dist")}')
+    args.append(f'--workpath={workpath}')
+    args.append(f'--specpath={file_dir}')
+
+    gui_imports = get_gui_imports(options['gui'])
+
+    for imp in gui_imports + options['hidden_imports']:
+        args.append(f'--hidden-import={imp}')
+
+    for module in options['excludes']:
+        args.append(f'--exclude-module={module}')
+
+    for src, dest in options['datas']:
+        args.append(f'--add-data={src}{os.pathsep}{dest}')
+    for src, dest in options['binaries']:
+        args.append(f'--add-binary={src}{os.pathsep}{dest}')
+
+    args.append(script)
+    return args
+
+
+def parse_pair(text):
+    """'SRC:DEST' -> [src, dest] như --add-data; thiếu DEST thì dùng '.'"""
+    text = text.strip()
+    src, sep, dest = text.rpartition(':')
+    # 'C:\data.txt' là ổ đĩa Windows, không phải SRC:DEST
+    if not sep or not src or dest.startswith(('\\', '/')):
+        return [text, '.']
+    return [src, dest or '.']
+
+
+def parse_pairs(text):
+    """'a.txt:data, b.dll:.' -> [[src, dest], ...]"""
+    return [parse_pair(entry) for entry in text.split(',') if entry.strip()]
+
+
+def format_pairs(pairs):
+    return ', '.join(f'{src}:{dest}' for src, dest in pairs)
+
+
+def format_command(argv):
+    """argv -> chuỗi lệnh copy/paste được vào shell của hệ điều hành"""
+    if sys.platform == 'win32':
+        return subprocess.list2cmdline(argv)
+    return shlex.join(argv)
+
+
+def build_command(options, workpath=None):
+    """Lệnh PyInstaller dạng chuỗi, để hiển thị"""
+    return format_command(['pyinstaller'] + build_args(options, workpath))
+
+
+def detect_excludes(options, used_modules, candidates=(), limit=20):
+    """
+    Các module nên exclude: module phổ biến mà project không import, cộng
+    với tối đa limit đề xuất từ module_index.propose_excludes.
+    """
+    excludes = [name for name in COMMON_EXCLUDES if name not in used_modules]
+    for name, _, _ in list(candidates)[:limit]:
+        if name not in excludes:
+            excludes.append(name)
+    return excludes
@@ -0,0 +1,306 @@
+"""
+Phân tích đồ thị import của cả project: đi theo các module local một cách
+đệ quy, giải relative import, bắt cả import có điều kiện và
+importlib.import_module("literal").
+
+Import của từng file được cache theo (path, mtime, size) nên phân tích lại
+sau khi sửa một file chỉ phải parse đúng file đó.
+"""
+import ast
+import os
+import threading
+
+SOURCE_SUFFIXES = ('.py', '.pyw')
+EXTENSION_SUFFIXES = ('.pyd', '.so')
+
+_parse_cache = {}
+_parse_cache_lock = threading.Lock()
+
+
+# Import nằm trong các node này là import tuỳ chọn (delayed/conditional/optional)
+GUARD_NODES = tuple(getattr(ast, name) for name in (
+    'FunctionDef', 'AsyncFunctionDef', 'Lambda', 'If', 'IfExp', 'Try', 'TryStar',
+    'While', 'For', 'AsyncFor') if hasattr(ast, name))
+
+
+def parse_imports(path):
+    """
+    Parse một file, trả về list (module, level, names, optional) cho mọi câu
+    import; optional=True khi import nằm trong hàm, if, try, vòng lặp.
+    """
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    records = []
+    stack = [(tree, False)]
+    while stack:
+        node, optional = stack.pop()
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                records.append((alias.name, 0, (), optional))
+        elif isinstance(node, ast.ImportFrom):
+            names = tuple(alias.name for alias in node.names if alias.name != '*')
+            records.append((node.module or '', node.level, names, optional))
+        elif isinstance(node, ast.Call):
+            record = _dynamic_import(node)
+            if record:
+                records.append(record + (optional,))
+
+        child_optional = optional or isinstance(node, GUARD_NODES)
+        for child in ast.iter_child_nodes(node):
+            stack.append((child, child_optional))
+    return records
+
+
+def _dynamic_import(node):
+    """importlib.import_module('x'), import_module('.x', 'pkg') và __import__('x')"""
+    func = node.func
+    if isinstance(func, ast.Attribute):
+        func_name = func.attr
+    elif isinstance(func, ast.Name):
+        func_name = func.id
+    else:
+        return None
+    if func_name not in ('import_module', '__import__') or not node.args:
+        return None
+
+    literals = [arg.value if isinstance(arg, ast.Constant) and isinstance(arg.value, str) else None
+                for arg in node.args[:2]]
+    name = literals[0]
+    if not name:
+        return None
+
+    if func_name == 'import_module' and name.startswith('.'):
+        package = literals[1] if len(literals) > 1 else None
+        if not package:
+            return None
+        stripped = name.lstrip('.')
+        level = len(name) - len(stripped)
+        base = package.split('.')
+        if level > 1:
+            base = base[:-(level - 1)]
+        if not base:
+            return None
+        return ('.'.join(base + ([stripped] if stripped else [])), 0, ())
+    return (name, 0, ())
+
+
+def file_stamp(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def lookup_cached(path, stamp):
+    """Tra cache theo (path, mtime, size)"""
+    with _parse_cache_lock:
+        entry = _parse_cache.get(path)
+    if entry and entry[0] == stamp:
+        return True, entry[1]
+    return False, None
+
+
+def store_parsed(path, stamp, records):
+    with _parse_cache_lock:
+        _parse_cache[path] = (stamp, records)
+
+
+class ImportGraph:
+    """Kết quả phân tích: các file đã đi qua và mọi tên module được import"""
+
+    def __init__(self, entry, search_path=None):
+        self.entry = os.path.abspath(entry)
+        self.search_path = [os.path.abspath(p) for p in (search_path or [os.path.dirname(self.entry)])]
+        self.files = {self.entry: os.path.splitext(os.path.basename(self.entry))[0]}
+        self.roots = []
+        self.imports = set()
+        self.edges = {}
+        self.unparsed = set()
+        self._dir_cache = {}
+        self._resolve_cache = {}
+
+    def top_level_names(self):
+        return {name.split('.')[0] for name in self.imports}
+
+    def local_files(self):
+        """Các file nguồn đã đi qua, trừ entry script"""
+        return sorted(path for path in self.files if path != self.entry)
+
+    def _entries(self, directory):
+        entries = self._dir_cache.get(directory)
+        if entries is None:
+            try:
+                entries = set(os.listdir(directory))
+            except OSError:
+                entries = set()
+            self._dir_cache[directory] = entries
+        return entries
+
+    def resolve(self, name):
+        """Tìm file của module trong search_path, None nếu không phải module local"""
+        if name in self._resolve_cache:
+            return self._resolve_cache[name]
+
+        parts = name.split('.')
+        found = None
+        for root in self.search_path:
+            directory = os.path.join(root, *parts[:-1])
+            if len(parts) > 1 and parts[-2] not in self._entries(os.path.dirname(directory)):
+                continue
+            entries = self._entries(directory)
+            leaf = parts[-1]
+            if leaf in entries and '__init__.py' in self._entries(os.path.join(directory, leaf)):
+                found = os.path.join(directory, leaf, '__init__.py')
+            else:
+                for suffix in SOURCE_SUFFIXES + EXTENSION_SUFFIXES:
+                    if leaf + suffix in entries:
+                        found = os.path.join(directory, leaf + suffix)
+                        break
+                else:
+                    # Extension module có tag ABI: foo.cpython-311-x86_64-linux-gnu.so
+                    for entry in entries:
+                        if entry.startswith(leaf + '.') and entry.endswith(EXTENSION_SUFFIXES):
+                            found = os.path.join(directory, entry)
+                            break
+            if found:
+                break
+
+        self._resolve_cache[name] = found
+        return found
+
+    def absolute_names(self, path, records):
+        """Chuyển các record import của một file thành {tên tuyệt đối: optional}"""
+        module = self.files[path]
+        is_package = os.path.basename(path) == '__init__.py'
+        package = module.split('.') if is_package else module.split('.')[:-1]
+
+        names = {}
+
+        def add(name, optional):
+            names[name] = names.get(name, True) and optional
+
+        for name, level, fromlist, optional in records:
+            if level:
+                # Vượt quá package top-level: Python báo ImportError, không phải module tuyệt đối
+                if level > len(package):
+                    continue
+                base = package[:len(package) - (level - 1)]
+                name = '.'.join(base + ([name] if name else []))
+                if not name:
+                    continue
+            add(name, optional)
+            for sub in fromlist:
+                # "from pkg import x" có thể import submodule pkg.x
+                candidate = f'{name}.{sub}'
+                if self.resolve(candidate):
+                    add(candidate, optional)
+
+        # Import a.b.c cũng chạy a và a.b
+        for name, optional in list(names.items()):
+            parts = name.split('.')
+            for i in range(1, len(parts)):
+                add('.'.join(parts[:i]), optional)
+        return names
+
+    def required_modules(self, trusted_dirs=()):
+        """
+        Các module chắc chắn được dùng: đi theo mọi import của code nằm trong
+        trusted_dirs (code của project), còn code bên ngoài chỉ theo import
+        bắt buộc ở top-level.
+        """
+        trusted_dirs = [os.path.abspath(d) + os.sep for d in trusted_dirs]
+        paths = {name: path for path, name in self.files.items()}
+        required = set()
+        stack = [self.files[self.entry]] + list(self.roots)
+        while stack:
+            module = stack.pop()
+            if module in required:
+                continue
+            required.add(module)
+            path = paths.get(module, '')
+            trusted = path == self.entry or (any(path.startswith(d) for d in trusted_dirs)
+                                             and 'site-packages' not in path)
+            for name, optional in self.edges.get(module, {}).items():
+                if trusted or not optional:
+                    stack.append(name)
+        return required
+
+
+def analyze(entry, search_path=None, parse_many=None, on_wave=None, roots=()):
+    """
+    Phân tích đồ thị import bắt đầu từ entry, đi theo mọi module tìm thấy
+    trong search_path (mặc định: thư mục chứa entry). roots là các tên
+    module được coi như entry cũng import (vd. hidden imports).
+
+    parse_many(paths) -> list records dùng để parse các file chưa có trong
+    cache; on_wave(graph) được gọi sau mỗi lớp BFS.
+    """
+    graph = ImportGraph(entry, search_path)
+    frontier = [graph.entry]
+    expanded = set()
+    for name in roots:
+        parts = name.split('.')
+        expanded.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+    for name in sorted(expanded):
+        graph.roots.append(name)
+        graph.imports.add(name)
+        module_path = graph.resolve(name)
+        if module_path and module_path not in graph.files:
+            graph.files[module_path] = name
+            if module_path.endswith(SOURCE_SUFFIXES):
+                frontier.append(module_path)
+
+    while frontier:
+        records_by_path = {}
+        missing = []
+        for path in frontier:
+            try:
+                stamp = file_stamp(path)
+            except OSError:
+                graph.unparsed.add(path)
+                continue
+            hit, records = lookup_cached(path, stamp)
+            if hit:
+                records_by_path[path] = records
+            else:
+                missing.append((path, stamp))
+
+        if missing:
+            paths = [path for path, _ in missing]
+            if parse_many:
+                parsed = parse_many(paths)
+            else:
+                parsed = [safe_parse(path) for path in paths]
+            for (path, stamp), records in zip(missing, parsed):
+                store_parsed(path, stamp, records)
+                records_by_path[path] = records
+
+        next_frontier = []
+        for path in frontier:
+            records = records_by_path.get(path)
+            if records is None:
+                graph.unparsed.add(path)
+                continue
+            names = graph.absolute_names(path, records)
+            graph.edges[graph.files[path]] = names
+            graph.imports.update(names)
+
+            for name in names:
+                module_path = graph.resolve(name)
+                if module_path and module_path not in graph.files:
+                    graph.files[module_path] = name
+                    if module_path.endswith(SOURCE_SUFFIXES):
+                        next_frontier.append(module_path)
+
+        frontier = sorted(set(next_frontier))
+        if on_wave:
+            on_wave(graph)
+
+    return graph
+
+
+def safe_parse(path):
+    """parse_imports nhưng trả về None khi lỗi (dùng được trong process pool)"""
+    try:
+        return parse_imports(path)
+    except (OSError, SyntaxError, ValueError):
+        return None
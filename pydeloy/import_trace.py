@@ -0,0 +1,334 @@
+"""
+Tìm hidden import bằng cách chạy thử script: một import hook (finder đầu
+sys.meta_path) ghi lại mọi module thực sự được load, kể cả plugin load
+động qua importlib.import_module/entry point, rồi so với phân tích tĩnh
+để biết module nào PyInstaller sẽ bỏ sót.
+
+Script chạy trong process riêng (process group riêng, không stdin, chạy
+headless, HOME/TEMP trỏ vào thư mục tạm) và bị kill cả cây khi quá thời
+gian: app GUI thường không tự thoát, các module đã load tới lúc đó vẫn
+được ghi vì hook ghi từng dòng ngay khi load.
+"""
+import ast
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+
+from pydeloy import bundle_report, config, import_graph, module_index
+from pydeloy.cancel import NEW_GROUP, kill_tree
+
+DEFAULT_TIMEOUT = 10
+
+# Chạy bằng interpreter đích. Chỉ dùng module builtin (đã có sẵn trong
+# sys.modules) để hook không tự load module nào thay cho script.
+TRACE_SCRIPT = r'''
+import sys, builtins, _thread
+script, out_path = sys.argv[1], sys.argv[2]
+sys.argv = [script] + sys.argv[3:]
+sys.path[0] = __import__('os').path.dirname(script)
+
+out = open(out_path, 'w', encoding='utf-8')
+out.write(repr(sorted(sys.modules)) + '\n')
+out.flush()
+lock = _thread.allocate_lock()
+local = _thread._local()
+
+before = set(sys.modules)
+import opcode
+IMPORT_NAME = opcode.opmap['IMPORT_NAME']
+IMPORT_FROM = opcode.opmap.get('IMPORT_FROM')
+EXTENDED_ARG = opcode.opmap['EXTENDED_ARG']
+for name in set(sys.modules) - before:
+    del sys.modules[name]
+BOOTSTRAP = ('<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>')
+
+
+def statement_target(frame):
+    """Tên module trong câu import đang chạy ở frame (kể cả dạng tuyệt đối nếu là relative)"""
+    code, i = frame.f_code.co_code, frame.f_lasti
+    oparg = code[i + 1]
+    if i >= 2 and code[i - 2] == EXTENDED_ARG:
+        oparg |= code[i - 1] << 8
+    target = frame.f_code.co_names[oparg]
+    package = frame.f_globals.get('__package__')
+    package = package.split('.') if package else []
+    return [target] + ['.'.join(package[:n] + ([target] if target else []))
+                       for n in range(len(package), 0, -1)]
+
+
+def importer(name):
+    """
+    (module gọi import, cách import): 'import' là câu import thường,
+    'dynamic' là importlib/__import__ với tên tính lúc chạy, 'native' là
+    import từ code C của một extension module.
+    """
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename in BOOTSTRAP:
+        frame = frame.f_back
+    if frame is None:
+        return None, 'native'
+    op = frame.f_code.co_code[frame.f_lasti]
+    if op == IMPORT_NAME:
+        for target in statement_target(frame):
+            if target and (name == target or target.startswith(name + '.')
+                           or name.startswith(target + '.')):
+                return frame.f_globals.get('__name__'), 'import'
+        # Câu import đang load một extension, extension đó import tiếp từ C
+        return statement_target(frame)[0], 'native'
+    if op == IMPORT_FROM:
+        return frame.f_globals.get('__name__'), 'import'
+    while frame is not None and (frame.f_code.co_filename in BOOTSTRAP
+                                 or frame.f_globals.get('__name__') == 'importlib'):
+        frame = frame.f_back
+    return (frame.f_globals.get('__name__') if frame is not None else None), 'dynamic'
+
+
+class Tracer:
+    def find_spec(self, name, path=None, target=None):
+        if getattr(local, 'busy', False):
+            return None
+        local.busy = True
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if finder is not self and hasattr(finder, 'find_spec'):
+                    spec = finder.find_spec(name, path, target)
+                    if spec is not None:
+                        break
+            if spec is not None and spec.origin != 'built-in':
+                caller, how = importer(name)
+                with lock:
+                    out.write(repr((name, caller, how, spec.origin)) + '\n')
+                    out.flush()
+            return spec
+        finally:
+            local.busy = False
+
+
+sys.meta_path.insert(0, Tracer())
+with open(script, 'rb') as f:
+    code = compile(f.read(), script, 'exec')
+try:
+    exec(code, {'__name__': '__main__', '__file__': script, '__builtins__': builtins})
+except SystemExit:
+    pass
+'''
+
+# Biến môi trường để app GUI/âm thanh chạy được mà không mở cửa sổ
+HEADLESS_ENV = {
+    'QT_QPA_PLATFORM': 'offscreen',
+    'MPLBACKEND': 'Agg',
+    'SDL_VIDEODRIVER': 'dummy',
+    'SDL_AUDIODRIVER': 'dummy',
+    'KIVY_WINDOW': '',
+    'PYTHONDONTWRITEBYTECODE': '1',
+}
+
+
+class TracedModule:
+    def __init__(self, name, importer, how, origin):
+        self.name = name
+        self.importer = importer
+        # 'import', 'dynamic' (importlib, __import__) hoặc 'native' (từ extension C)
+        self.how = how
+        self.origin = origin
+
+
+class TraceResult:
+    """Kết quả chạy thử: module được load theo thứ tự, output và exit code"""
+
+    def __init__(self, modules, preloaded, returncode, output, elapsed):
+        self.modules = modules
+        self.preloaded = preloaded
+        self.returncode = returncode
+        self.output = output
+        self.elapsed = elapsed
+
+    @property
+    def timed_out(self):
+        return self.returncode is None
+
+
+def sandbox_env(sandbox):
+    """Môi trường chạy thử: headless, HOME/TEMP nằm trong thư mục sandbox"""
+    home = os.path.join(sandbox, 'home')
+    os.makedirs(home, exist_ok=True)
+    env = dict(os.environ, HOME=home, USERPROFILE=home, APPDATA=home, LOCALAPPDATA=home,
+               TMP=sandbox, TEMP=sandbox, TMPDIR=sandbox, **HEADLESS_ENV)
+    env.pop('PYTHONSTARTUP', None)
+    return env
+
+
+def run_sandboxed(argv, sandbox, timeout, cancel=None):
+    """
+    Chạy argv với cwd và HOME trong sandbox, kill cả cây process khi quá
+    timeout giây hoặc bị huỷ. Trả về (returncode, output, thời gian);
+    returncode là None nếu quá giờ.
+    """
+    start = time.monotonic()
+    proc = subprocess.Popen(argv, cwd=sandbox, env=sandbox_env(sandbox), stdin=subprocess.DEVNULL,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, **NEW_GROUP)
+    kill = lambda: kill_tree(proc.pid)
+    if cancel is not None:
+        cancel.on_cancel(kill)
+    try:
+        output, _ = proc.communicate(timeout=timeout)
+        returncode = proc.returncode
+    except subprocess.TimeoutExpired:
+        kill()
+        output, _ = proc.communicate()
+        returncode = None
+    finally:
+        if cancel is not None:
+            cancel.remove(kill)
+    return returncode, output.decode('utf-8', 'replace'), time.monotonic() - start
+
+
+def trace_imports(script, args=(), timeout=DEFAULT_TIMEOUT, interpreter=None, cancel=None):
+    """Chạy script trong sandbox tối đa timeout giây, trả về TraceResult"""
+    script = os.path.abspath(script)
+    interpreter = interpreter or module_index.default_interpreter()
+    sandbox = tempfile.mkdtemp(prefix='pydeloy-trace-')
+    out_path = os.path.join(sandbox, 'trace.txt')
+    try:
+        returncode, output, elapsed = run_sandboxed(
+            [interpreter, '-c', TRACE_SCRIPT, script, out_path] + list(args), sandbox, timeout, cancel)
+        modules, preloaded = _read_trace(out_path)
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    return TraceResult(modules, preloaded, returncode, output, elapsed)
+
+
+def _read_trace(path):
+    modules = []
+    preloaded = set()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return modules, preloaded
+    for i, line in enumerate(lines):
+        try:
+            value = ast.literal_eval(line)
+        except (ValueError, SyntaxError):
+            # Dòng cuối có thể bị cắt khi process bị kill
+            continue
+        if i == 0:
+            preloaded = set(value)
+        else:
+            modules.append(TracedModule(*value))
+    return modules, preloaded
+
+
+def extension_module(dest):
+    """'numpy/core/_multiarray_umath.cpython-311-x86_64-linux-gnu.so' -> 'numpy.core._multiarray_umath'"""
+    parts = dest.replace('\\', '/').split('/')
+    # Extension của stdlib: python3.11/lib-dynload/zlib.cpython-311-x86_64-linux-gnu.so
+    if 'lib-dynload' in parts:
+        parts = parts[parts.index('lib-dynload') + 1:]
+    parts[-1] = parts[-1].split('.')[0]
+    return '.'.join(parts)
+
+
+def build_modules(build_dir, hidden_imports):
+    """
+    Module có trong lần build trước (Analysis TOC + base_library.zip).
+    None nếu chưa build, hoặc nếu lần build đó có hidden import mà
+    hidden_imports không còn: module của chúng sẽ không có ở lần build tới.
+    """
+    tocs = sorted(name for name in _listdir(build_dir) if name.startswith('Analysis-') and name.endswith('.toc'))
+    if not tocs:
+        return None
+    path = os.path.join(build_dir, tocs[-1])
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            # Thứ tự field theo Analysis._GUTS: inputs, pathex, hiddenimports, ...
+            previous_hidden = ast.literal_eval(f.read())[2]
+    except (OSError, ValueError, SyntaxError, IndexError, TypeError):
+        return None
+    if not set(previous_hidden) <= set(hidden_imports):
+        return None
+
+    modules = set()
+    for dest, _, typecode in bundle_report.read_toc(path):
+        if typecode == 'PYMODULE':
+            modules.add(dest)
+        elif typecode == 'EXTENSION':
+            modules.add(extension_module(dest))
+    try:
+        with zipfile.ZipFile(os.path.join(build_dir, 'base_library.zip')) as archive:
+            for name in archive.namelist():
+                name = name[:-len('.pyc')] if name.endswith('.pyc') else None
+                if name:
+                    modules.add(name.replace('/', '.').replace('.__init__', ''))
+    except (OSError, zipfile.BadZipFile):
+        pass
+    return modules
+
+
+def _listdir(path):
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+
+def static_modules(options, interpreter=None):
+    """
+    (tập module PyInstaller sẽ gom, nguồn): ưu tiên TOC của lần build
+    trước (đã gồm hidden import của hook), không dùng được thì phân tích
+    tĩnh project và site-packages (không biết tới hook nên có thể báo thừa).
+    """
+    roots = config.get_gui_imports(options['gui']) + options['hidden_imports']
+    modules = build_modules(config.build_dir(options), roots)
+    if modules is not None:
+        return modules, 'last build'
+    index = module_index.load_index(interpreter)
+    project_dir = os.path.dirname(os.path.abspath(options['script']))
+    graph = import_graph.analyze(options['script'], [project_dir] + index['sys_path'],
+                                 roots=tuple(roots) + module_index.BASE_MODULES)
+    return graph.imports, 'static analysis'
+
+
+def _covered(name, names):
+    """name hoặc một package cha của nó có trong names"""
+    parts = name.split('.')
+    return any('.'.join(parts[:i]) in names for i in range(1, len(parts) + 1))
+
+
+def missing_modules(result, static):
+    """Module được load khi chạy nhưng phân tích tĩnh không thấy, theo thứ tự load"""
+    return [module for module in result.modules
+            if module.name not in static and module.name not in result.preloaded
+            and module.name != '__main__']
+
+
+def suggest_hidden_imports(missing, options):
+    """
+    Hidden import tối thiểu: bỏ module được import tĩnh bởi một module đã
+    được đề xuất (PyInstaller sẽ tự đi theo), package cha của module khác
+    trong list, module bị exclude và hidden import đã có.
+    """
+    suggested = []
+    names = set()
+    for module in missing:
+        if _covered(module.name, options['excludes']) or module.name in options['hidden_imports']:
+            continue
+        if module.how == 'import' and module.importer in names:
+            names.add(module.name)
+            continue
+        suggested.append(module.name)
+        names.add(module.name)
+    return [name for name in suggested
+            if not any(other.startswith(name + '.') for other in suggested)]
+
+
+def trace_options(options, args=(), timeout=DEFAULT_TIMEOUT, interpreter=None, cancel=None):
+    """Chạy thử script của options, trả về (result, missing, suggestions, nguồn phân tích tĩnh)"""
+    result = trace_imports(options['script'], args, timeout, interpreter, cancel)
+    static, source = static_modules(options, interpreter)
+    missing = missing_modules(result, static)
+    return result, missing, suggest_hidden_imports(missing, options), source
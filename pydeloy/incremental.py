@@ -0,0 +1,51 @@
+"""
+Incremental build: giữ workpath cố định cho từng script để PyInstaller
+dùng lại cache Analysis/PYZ, chỉ build sạch khi toolchain đổi.
+"""
+import json
+import os
+
+from pydeloy.build_cache import pyinstaller_toolchain
+
+STATE_FILE = '.pydeloy-incremental.json'
+
+
+def script_workpath(options):
+    """Workpath cố định build/<name> cạnh script"""
+    file_dir = os.path.dirname(options['script'])
+    return os.path.join(file_dir, 'build', options['name'])
+
+
+def toolchain_fingerprint(options):
+    """Những thứ mà khi đổi thì cache trong workpath không còn dùng được"""
+    # Interpreter mà backend thật sự dùng để chạy PyInstaller
+    interpreter, version = pyinstaller_toolchain(options.get('backend', 'subprocess'))
+    return {
+        'interpreter': interpreter,
+        'pyinstaller': version,
+        'gui': options['gui'],
+        'hidden_imports': sorted(options['hidden_imports']),
+        'excludes': sorted(options['excludes']),
+    }
+
+
+def needs_clean(options):
+    """True nếu phải build sạch (chưa có state hoặc toolchain đã đổi)"""
+    path = os.path.join(script_workpath(options), STATE_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return True
+    return state != toolchain_fingerprint(options)
+
+
+def save_state(options):
+    """Lưu fingerprint sau khi build thành công"""
+    workpath = script_workpath(options)
+    try:
+        os.makedirs(workpath, exist_ok=True)
+        with open(os.path.join(workpath, STATE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(toolchain_fingerprint(options), f, indent=2)
+    except OSError:
+        pass
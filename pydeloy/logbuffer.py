@@ -0,0 +1,31 @@
+"""
+Bộ đệm log dùng chung giữa thread build và UI: thread build ghi từng dòng
+vào buffer (không phát signal), UI lấy cả loạt theo chu kỳ và hiển thị một
+lần, thay vì một signal + một lần append cho mỗi dòng.
+"""
+import threading
+
+# Chu kỳ UI lấy log từ buffer
+FLUSH_INTERVAL_MS = 50
+
+
+class LogBuffer:
+    """Danh sách dòng log an toàn giữa các thread"""
+
+    def __init__(self):
+        self._lines = []
+        self._lock = threading.Lock()
+
+    def write(self, line):
+        with self._lock:
+            self._lines.append(line)
+
+    def writer(self, prefix):
+        """Hàm ghi thêm prefix vào mỗi dòng, vd. '[name] ' cho build song song"""
+        return lambda line: self.write(prefix + line)
+
+    def drain(self):
+        """Lấy và xoá mọi dòng đang chờ"""
+        with self._lock:
+            lines, self._lines = self._lines, []
+        return lines
@@ -0,0 +1,160 @@
+"""
+Build matrix: build cùng một script với nhiều toolchain song song, mỗi
+toolchain một workpath/distpath riêng (build/matrix/<toolchain>,
+dist/matrix/<toolchain>), rồi đo thời gian khởi động của từng artifact
+lần lượt (chạy song song thì số đo lẫn vào nhau) và so sánh.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pydeloy import benchmark, build_cache, format_size, procstats, runner, spec_file, toolchains
+from pydeloy.cancel import CancelToken
+
+MATRIX_DIR = 'matrix'
+
+
+class MatrixResult:
+    def __init__(self, toolchain, success, message, wall=None, size=0):
+        self.toolchain = toolchain
+        self.success = success
+        self.message = message
+        self.wall = wall
+        self.size = size
+        self.cold = None
+        self.warm = None
+        self.timeouts = 0
+
+
+def matrix_paths(options, toolchain):
+    """(workpath, distpath) riêng của toolchain"""
+    root = os.path.dirname(options['script'])
+    folder = toolchains.safe_name(toolchain.name)
+    return (os.path.join(root, 'build', MATRIX_DIR, folder),
+            os.path.join(root, 'dist', MATRIX_DIR, folder))
+
+
+def matrix_options(options):
+    """Option cho một ô của matrix: build sạch, không cache/incremental để so được thời gian"""
+    return dict(options, clean=True, incremental=False, cache=False)
+
+
+def _absolute(path, base):
+    return path if os.path.isabs(path) else os.path.normpath(os.path.join(base, path))
+
+
+def build_args(options, toolchain):
+    """argv PyInstaller ghi vào workpath/distpath của toolchain"""
+    workpath, distpath = matrix_paths(options, toolchain)
+    script_dir = os.path.dirname(options['script'])
+    args = []
+    for arg in spec_file.pyinstaller_args(options, workpath):
+        if arg.startswith('--distpath='):
+            arg = f'--distpath={distpath}'
+        elif arg.startswith('--specpath='):
+            # Các build song song không ghi đè spec của nhau
+            arg = f'--specpath={workpath}'
+        elif arg.startswith(('--add-data=', '--add-binary=')):
+            # PyInstaller tính SRC tương đối theo specpath, nay không còn là thư mục script
+            flag, _, value = arg.partition('=')
+            src, sep, dest = value.rpartition(os.pathsep)
+            arg = f'{flag}={_absolute(src, script_dir)}{sep}{dest}'
+        elif arg.startswith('--icon='):
+            arg = f'--icon={_absolute(arg[len("--icon="):], script_dir)}'
+        args.append(arg)
+    return args
+
+
+def artifact_path(options, toolchain):
+    return build_cache.artifact_path(options, matrix_paths(options, toolchain)[1])
+
+
+def artifact_size(options, toolchain):
+    artifact = artifact_path(options, toolchain)
+    if not os.path.isfile(artifact):
+        return 0
+    if options['onefile']:
+        return os.path.getsize(artifact)
+    return procstats.dir_size(os.path.dirname(artifact))
+
+
+def build_one(options, toolchain, on_output=print, cancel=None):
+    prefix = f'[{toolchain.name}] '
+    output = lambda line: on_output(prefix + line)
+    if not toolchain.available:
+        return MatrixResult(toolchain, False, f'PyInstaller is not installed for {toolchain.interpreter}')
+    output(f'{toolchain.label()} ({toolchain.interpreter})')
+    start = time.monotonic()
+    success, message = runner.run_build(build_args(options, toolchain), None, on_output=output,
+                                        cancel=cancel, timeout=options.get('timeout') or None,
+                                        toolchain=toolchain, cwd=os.path.dirname(options['script']))
+    wall = time.monotonic() - start
+    return MatrixResult(toolchain, success, message, wall,
+                        artifact_size(options, toolchain) if success else 0)
+
+
+def run_matrix(options, selected, jobs=None, runs=3, timeout=30, args=(), on_output=print,
+               cancel=None):
+    """
+    Build options với từng toolchain trong selected (jobs build cùng lúc),
+    rồi chạy mỗi artifact runs lần để đo khởi động. Trả về list MatrixResult
+    theo thứ tự selected.
+    """
+    options = matrix_options(options)
+    cancel = cancel or CancelToken()
+    jobs = jobs or len(selected)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = list(executor.map(lambda toolchain: build_one(options, toolchain, on_output, cancel),
+                                    selected))
+
+    for result in results:
+        if not result.success or runs <= 0 or cancel.cancelled:
+            continue
+        on_output(f'[{result.toolchain.name}] Measuring startup ({runs} runs)...')
+        summary = benchmark.run_benchmark(artifact_path(options, result.toolchain), runs, timeout, args)
+        result.cold, result.warm, result.timeouts = summary['cold'], summary['warm'], summary['timeouts']
+    return results
+
+
+def _seconds(value):
+    return f'{value:.2f} s' if value is not None else '-'
+
+
+def table_rows(results):
+    """Hàng của bảng so sánh: (toolchain, Python, PyInstaller, build, size, cold, warm, status)"""
+    rows = []
+    for result in results:
+        toolchain = result.toolchain
+        if result.success:
+            status = 'ok' if not result.timeouts else f'{result.timeouts} run(s) timed out'
+        else:
+            status = result.message.splitlines()[0] if result.message else 'failed'
+        rows.append((toolchain.name, toolchain.python or '?', toolchain.pyinstaller or '-',
+                     _seconds(result.wall), format_size(result.size) if result.size else '-',
+                     _seconds(result.cold), _seconds(result.warm), status))
+    return rows
+
+
+def best(results):
+    """{cột: tên toolchain tốt nhất} cho build time, size và warm start"""
+    done = [result for result in results if result.success]
+    picks = {}
+    for column, key in (('build', lambda r: r.wall), ('size', lambda r: r.size),
+                        ('startup', lambda r: r.warm if r.warm is not None else r.cold)):
+        measured = [result for result in done if key(result)]
+        if measured:
+            picks[column] = min(measured, key=key).toolchain.name
+    return picks
+
+
+def format_table(results):
+    header = ('Toolchain', 'Python', 'PyInstaller', 'Build', 'Size', 'Cold start', 'Warm start', 'Status')
+    rows = [header] + table_rows(results)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header) - 1)]
+    lines = ['  '.join(cell.ljust(width) for cell, width in zip(row, widths)) + '  ' + row[-1]
+             for row in rows]
+    picks = best(results)
+    if picks:
+        lines.append('Fastest build: {build}; smallest: {size}; fastest startup: {startup}'.format(
+            **{column: picks.get(column, '-') for column in ('build', 'size', 'startup')}))
+    return lines
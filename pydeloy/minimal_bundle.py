@@ -0,0 +1,256 @@
+"""
+Minimal bundle (tree-shaking): chạy lệnh smoke của app dưới import trace,
+giữ lại đúng các module được load và bỏ phần còn lại khỏi bundle bằng cơ
+chế exclude sẵn có:
+
+- package top-level không module nào được dùng -> excludes (--exclude-module)
+- subpackage/module không dùng trong package có dùng -> pure_excludes (glob)
+- extension module không dùng -> binary_excludes
+
+Danh sách module trong bundle lấy từ Analysis TOC của lần build đầy đủ
+trước đó; TOC do chính bản minimal ghi ra (cùng workpath) bị bỏ qua, nếu
+không package đã strip lần trước sẽ không bị exclude lại. Package mà runtime hook của PyInstaller cần luôn được giữ nguyên. Sau
+khi build, chạy lại lệnh smoke với bản đã đóng gói để kiểm tra; code path
+mà lệnh smoke không đi qua có thể thiếu module.
+"""
+import glob
+import json
+import os
+import shutil
+import tempfile
+
+from pydeloy import (build_cache, bundle_report, config, format_size, import_graph, import_trace,
+                     module_index, procstats)
+
+# Module của PyInstaller nằm trong PYZ mà bootloader/runtime hook dùng
+ALWAYS_KEEP = ('_pyi_rth_utils', 'pyimod', 'pyi_splash')
+
+
+def _with_parents(names):
+    result = set()
+    for name in names:
+        parts = name.split('.')
+        result.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+    return result
+
+
+class MinimalPlan:
+    """Các exclude/filter cần thêm vào option để bỏ phần không dùng"""
+
+    def __init__(self, excludes, pure_excludes, binary_excludes, stripped, stripped_size, kept):
+        self.excludes = excludes
+        self.pure_excludes = pure_excludes
+        self.binary_excludes = binary_excludes
+        self.stripped = stripped
+        self.stripped_size = stripped_size
+        self.kept = kept
+
+    def apply(self, options):
+        """Bản sao options đã thêm exclude/filter của plan"""
+        options = dict(options)
+        for key in ('excludes', 'pure_excludes', 'binary_excludes'):
+            options[key] = options[key] + [name for name in getattr(self, key) if name not in options[key]]
+        return options
+
+    def summary(self):
+        return (f'Minimal bundle: keeping {self.kept} modules, stripping {self.stripped} '
+                f'(~{format_size(self.stripped_size)} of sources/extensions): '
+                f'{len(self.excludes)} packages excluded, {len(self.pure_excludes)} module '
+                f'filters, {len(self.binary_excludes)} extension filters')
+
+
+def smoke_run(options, args=(), timeout=import_trace.DEFAULT_TIMEOUT, interpreter=None, cancel=None):
+    """Chạy lệnh smoke (script + args) dưới import trace; RuntimeError nếu script lỗi"""
+    result = import_trace.trace_imports(options['script'], args, timeout, interpreter, cancel)
+    if result.returncode:
+        raise RuntimeError(f'Smoke run exited with code {result.returncode}:\n'
+                           f'{result.output.rstrip()[-2000:]}')
+    return result
+
+
+# Ghi lại TOC mà bản minimal để lại trong build dir
+MINIMAL_MARKER = '.pydeloy-minimal.json'
+
+
+def _toc_stamp(path):
+    return {'toc': os.path.basename(path), 'mtime': os.path.getmtime(path)}
+
+
+def analysis_toc(options):
+    """Analysis TOC của lần build đầy đủ trước, None nếu chưa có"""
+    build_dir = config.build_dir(options)
+    paths = sorted(glob.glob(os.path.join(build_dir, 'Analysis-*.toc')))
+    if not paths:
+        return None
+    try:
+        with open(os.path.join(build_dir, MINIMAL_MARKER), 'r', encoding='utf-8') as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return paths[-1]
+    try:
+        # TOC vẫn là của bản minimal: thiếu các package đã strip
+        if marker == _toc_stamp(paths[-1]):
+            return None
+    except OSError:
+        pass
+    return paths[-1]
+
+
+def mark_minimal(options):
+    """Đánh dấu Analysis TOC hiện tại là của một build minimal"""
+    build_dir = config.build_dir(options)
+    paths = sorted(glob.glob(os.path.join(build_dir, 'Analysis-*.toc')))
+    if not paths:
+        return
+    try:
+        with open(os.path.join(build_dir, MINIMAL_MARKER), 'w', encoding='utf-8') as f:
+            json.dump(_toc_stamp(paths[-1]), f)
+    except OSError:
+        pass
+
+
+def runtime_hook_packages(entries, options, interpreter=None):
+    """
+    Package top-level mà runtime hook (pyi_rth_*) chắc chắn import khi app
+    khởi động. Runtime hook không chạy trong lần trace và có thể load tiếp
+    module qua importer riêng (vd. pkg_resources.extern), nên giữ cả package.
+    """
+    index = module_index.load_index(interpreter)
+    script = os.path.abspath(options['script'])
+    required = set()
+    for _, src, typecode in entries:
+        if typecode != 'PYSOURCE' or os.path.abspath(src) == script:
+            continue
+        graph = import_graph.analyze(src, [os.path.dirname(src)] + index['sys_path'])
+        required |= {name.split('.')[0] for name in graph.required_modules()}
+    return required
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def make_plan(options, result, interpreter=None):
+    """Tính MinimalPlan từ kết quả smoke_run và Analysis TOC của lần build trước"""
+    toc = analysis_toc(options)
+    if toc is None:
+        raise FileNotFoundError(f'No previous full build in {config.build_dir(options)}, '
+                                f'build once without the minimal excludes first')
+    entries = set(bundle_report.read_toc(toc))
+
+    used = {module.name for module in result.modules} | result.preloaded
+    used |= set(config.get_gui_imports(options['gui']) + options['hidden_imports'])
+    keep = _with_parents(used)
+    hook_packages = runtime_hook_packages(entries, options, interpreter)
+
+    pure = {dest: src for dest, src, typecode in entries if typecode == 'PYMODULE'}
+    extensions = {dest: src for dest, src, typecode in entries if typecode == 'EXTENSION'}
+    kept = lambda name: (name in keep or name.startswith(ALWAYS_KEEP)
+                         or name.split('.')[0] in hook_packages)
+
+    # Cây package: node gồm cả package cha không có trong TOC (namespace package)
+    children = {}
+    for name in _with_parents(pure):
+        parent = name.rpartition('.')[0]
+        children.setdefault(parent, set()).add(name)
+    used_below = keep | _with_parents(name for name in pure if kept(name))
+
+    excludes, pure_excludes = [], []
+    stack = sorted(children.get('', ()), reverse=True)
+    while stack:
+        name = stack.pop()
+        if name in used_below:
+            stack.extend(sorted(children.get(name, ()), reverse=True))
+        elif '.' not in name:
+            excludes.append(name)
+        else:
+            if name in pure:
+                pure_excludes.append(name)
+            if name in children:
+                pure_excludes.append(name + '.*')
+
+    excluded = tuple(excludes)
+    binary_excludes = []
+    stripped = [src for name, src in pure.items() if not kept(name)]
+    for dest, src in sorted(extensions.items()):
+        module = import_trace.extension_module(dest)
+        if kept(module):
+            continue
+        stripped.append(src)
+        # Extension của package đã exclude không được gom nữa
+        if module.split('.')[0] not in excluded:
+            binary_excludes.append(glob.escape(dest))
+
+    return MinimalPlan(excludes, pure_excludes, binary_excludes, len(stripped),
+                       sum(_size(src) for src in stripped), len(pure) + len(extensions) - len(stripped))
+
+
+def bundle_size(options):
+    """Dung lượng artifact trong dist (thư mục với onedir), 0 nếu chưa có"""
+    artifact = build_cache.artifact_path(options)
+    if options['onefile']:
+        return _size(artifact)
+    return procstats.dir_size(os.path.dirname(artifact)) if os.path.isfile(artifact) else 0
+
+
+def verify(options, result, args=(), timeout=import_trace.DEFAULT_TIMEOUT, cancel=None):
+    """
+    Chạy lại lệnh smoke với artifact đã build. Đạt khi kết thúc giống lần
+    chạy trace: exit code 0, hoặc vẫn chạy tới hết giờ (app GUI).
+    Trả về (ok, message, output).
+    """
+    artifact = build_cache.artifact_path(options)
+    if not os.path.isfile(artifact):
+        return False, f'{artifact} not found', ''
+    sandbox = tempfile.mkdtemp(prefix='pydeloy-verify-')
+    try:
+        returncode, output, elapsed = import_trace.run_sandboxed([artifact] + list(args), sandbox,
+                                                                 timeout, cancel)
+    finally:
+        shutil.rmtree(sandbox, ignore_errors=True)
+    if returncode == 0 or (returncode is None and result.timed_out):
+        how = 'still running at the time limit' if returncode is None else f'exited in {elapsed:.1f} s'
+        return True, f'Smoke run of the frozen app passed ({how})', output
+    if returncode is None:
+        return False, 'Smoke run of the frozen app did not finish in time', output
+    return False, f'Smoke run of the frozen app failed with exit code {returncode}', output
+
+
+def run_minimal(options, build, args=(), timeout=import_trace.DEFAULT_TIMEOUT, on_output=print,
+                cancel=None):
+    """
+    Trace lệnh smoke, build đầy đủ nếu chưa có TOC của build đầy đủ, build minimal rồi kiểm
+    tra. build(options) -> bool chạy một lần build. Trả về (success, message).
+    """
+    try:
+        result = smoke_run(options, args, timeout, cancel=cancel)
+    except (RuntimeError, OSError) as e:
+        return False, str(e)
+    on_output(f'Smoke run: {len(result.modules)} modules loaded')
+    if analysis_toc(options) is None:
+        on_output('No previous full build, building the full bundle first')
+        if not build(options):
+            return False, 'Full build failed'
+    full_size = bundle_size(options)
+
+    try:
+        plan = make_plan(options, result)
+    except (OSError, ValueError, SyntaxError) as e:
+        return False, str(e)
+    on_output(plan.summary())
+    minimal = plan.apply(options)
+    built = build(minimal)
+    mark_minimal(minimal)
+    if not built:
+        return False, 'Minimal build failed'
+
+    size = bundle_size(minimal)
+    if full_size:
+        on_output(f'Bundle size: {format_size(full_size)} -> {format_size(size)}')
+    ok, message, output = verify(minimal, result, args, timeout, cancel)
+    if not ok:
+        on_output(output.rstrip()[-2000:])
+    return ok, message
@@ -0,0 +1,158 @@
+"""
+Index mọi module có trong interpreter đích (stdlib + site-packages) kèm
+dung lượng trên đĩa, và đề xuất danh sách exclude xếp theo dung lượng.
+
+Index được cache trên đĩa cho từng interpreter, tự build lại khi
+interpreter hoặc một thư mục trong sys.path thay đổi.
+"""
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from pydeloy import DATA_DIR, import_graph
+
+INDEX_DIR = os.path.join(DATA_DIR, 'module-index')
+
+# Module bootloader/base_library của PyInstaller luôn cần, không bao giờ exclude
+BASE_MODULES = (
+    'encodings', 'codecs', 'io', 'abc', 'os', 'stat', 'posixpath', 'ntpath',
+    'genericpath', '_collections_abc', 'collections', 'functools', 'keyword',
+    'operator', 'reprlib', 'heapq', 'copyreg', 'types', 'enum', 're',
+    'sre_compile', 'sre_parse', 'sre_constants', 'locale', 'traceback',
+    'linecache', 'tokenize', 'token', 'warnings', 'weakref', '_weakrefset',
+    'struct', 'importlib', 'zipimport', 'inspect', 'pkgutil', 'marshal',
+)
+
+INDEX_SCRIPT = r'''
+import json, os, pkgutil, sys, sysconfig
+
+stdlib = os.path.normcase(os.path.realpath(sysconfig.get_paths()['stdlib']))
+cwd = os.getcwd()
+
+def size_of(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+def find_path(root, name, ispkg):
+    if ispkg:
+        return os.path.join(root, name)
+    try:
+        for entry in os.listdir(root):
+            if entry.split('.')[0] == name and os.path.isfile(os.path.join(root, entry)):
+                return os.path.join(root, entry)
+    except OSError:
+        pass
+    return None
+
+modules = {}
+for name in sys.builtin_module_names:
+    modules[name] = {'kind': 'stdlib', 'size': 0}
+
+for info in pkgutil.iter_modules():
+    root = getattr(info.module_finder, 'path', None)
+    # sys.path đứng trước thắng, giống thứ tự import thật
+    if info.name in modules or not root or os.path.realpath(root) == cwd:
+        continue
+    path = find_path(root, info.name, info.ispkg)
+    if not path:
+        continue
+    real = os.path.normcase(os.path.realpath(path))
+    is_stdlib = real.startswith(stdlib) and 'site-packages' not in real
+    modules[info.name] = {'kind': 'stdlib' if is_stdlib else 'site',
+                          'path': path, 'size': size_of(path)}
+
+sys_path = [p for p in sys.path if p and os.path.isdir(p) and os.path.realpath(p) != cwd]
+print(json.dumps({'version': sys.version, 'sys_path': sys_path, 'modules': modules}))
+'''
+
+
+def default_interpreter():
+    """Interpreter đích: chính Python đang chạy, trừ khi app đã bị đóng gói"""
+    if getattr(sys, 'frozen', False):
+        return shutil.which('python') or shutil.which('python3') or 'python'
+    return sys.executable
+
+
+def _index_file(interpreter):
+    key = hashlib.sha1(os.path.realpath(interpreter).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(INDEX_DIR, f'{key}.json')
+
+
+def _stamp(interpreter, sys_path):
+    stamp = {}
+    for path in [interpreter] + list(sys_path):
+        try:
+            stamp[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            stamp[path] = None
+    return stamp
+
+
+def load_index(interpreter=None, refresh=False):
+    """Đọc index từ cache đĩa, build lại bằng interpreter đích nếu đã cũ"""
+    interpreter = interpreter or default_interpreter()
+    path = _index_file(interpreter)
+
+    if not refresh:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('stamp') == _stamp(interpreter, cached['sys_path']):
+                return cached
+        except (OSError, ValueError, KeyError):
+            pass
+
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run([interpreter, '-c', INDEX_SCRIPT], cwd=cwd,
+                                capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        raise RuntimeError(f'Không index được {interpreter}:\n{result.stderr.strip()}')
+
+    index = json.loads(result.stdout)
+    index['interpreter'] = interpreter
+    index['stamp'] = _stamp(interpreter, index['sys_path'])
+    try:
+        os.makedirs(INDEX_DIR, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+    except OSError:
+        pass
+    return index
+
+
+def propose_excludes(entry, roots=(), interpreter=None, parse_many=None):
+    """
+    Đề xuất exclude: các module sẽ bị PyInstaller gom vào (có đường import)
+    nhưng không module nào của project thực sự cần, tức là chỉ tới được qua
+    import tuỳ chọn (trong hàm, if, try) của thư viện bên thứ ba.
+
+    Trả về (candidates, bundled): candidates là list (tên, dung lượng, loại)
+    xếp giảm dần theo dung lượng, bundled là tập tên top-level sẽ được gom.
+    """
+    index = load_index(interpreter)
+    project_dir = os.path.dirname(os.path.abspath(entry))
+    graph = import_graph.analyze(entry, [project_dir] + index['sys_path'],
+                                 parse_many=parse_many, roots=tuple(roots) + BASE_MODULES)
+
+    bundled = graph.top_level_names()
+    required = {name.split('.')[0] for name in graph.required_modules([project_dir])}
+
+    candidates = []
+    for name in bundled - required:
+        info = index['modules'].get(name)
+        if info and info['size']:
+            candidates.append((name, info['size'], info['kind']))
+    candidates.sort(key=lambda c: (-c[1], c[0]))
+    return candidates, bundled
@@ -0,0 +1,170 @@
+"""
+Multi-target build: nhiều script trong một file .spec (mỗi script một
+Analysis/EXE) và một COLLECT chung, để các executable dùng chung một bộ
+binary/thư viện thay vì mỗi bản build riêng chép lại vài trăm MB.
+
+Sau khi build, so sánh với build riêng từng script: dung lượng tính từ
+binary/data của từng Analysis (spec ghi ra TARGETS_FILE), thời gian lấy
+từ lần build riêng gần nhất trong lịch sử.
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import time
+
+from pydeloy import build_history, format_size, procstats, runner, shared_analysis, spec_file
+
+TARGETS_FILE = 'pydeloy-targets.json'
+
+SPEC_FOOTER = '''
+# PyDeloy: binary/data của từng target, để so dung lượng với build riêng
+with open(os.path.join(workpath, {targets_file!r}), 'w', encoding='utf-8') as f:
+    json.dump({{{targets}}}, f)
+'''
+
+
+def bundle_dir(builds):
+    """Thư mục chứa spec/build/dist của bundle: thư mục của script đầu tiên"""
+    return os.path.dirname(builds[0]['script'])
+
+
+def spec_path(builds, name):
+    """Spec sinh ra nằm trong build/, không ghi đè <name>.spec cạnh script"""
+    return os.path.join(bundle_dir(builds), 'build', f'{name}.spec')
+
+
+def generate_spec(builds, name):
+    """Nội dung .spec cho list option builds (mỗi option một executable)"""
+    names = [options['name'] for options in builds]
+    duplicates = {n for n in names if names.count(n) > 1}
+    if duplicates:
+        raise ValueError(f'Duplicate target name(s): {", ".join(sorted(duplicates))}')
+
+    title = f': multi-target bundle {name!r}, one COLLECT shared by every executable'
+    # Footer ghi TARGETS_FILE bằng json
+    parts = [spec_file.SPEC_HEADER.format(title=title, imports='import json\nimport os\n')]
+    for index, options in enumerate(builds):
+        parts.append(spec_file.target_block(spec_file.resolve_paths(options), index, onefile=False))
+    entries = ''.join(f'    exe{i},\n    a{i}.binaries,\n    a{i}.datas,\n' for i in range(len(builds)))
+    parts.append(spec_file.COLLECT_TEMPLATE.format(entries=entries, name=name))
+    targets = ', '.join(f'{options["name"]!r}: [[dest, src] for dest, src, _ in a{i}.binaries + a{i}.datas]'
+                        for i, options in enumerate(builds))
+    parts.append(SPEC_FOOTER.format(targets_file=TARGETS_FILE, targets=targets))
+    return ''.join(parts)
+
+
+def build_args(builds, name):
+    """Ghi spec và trả về argv PyInstaller để build nó"""
+    root = bundle_dir(builds)
+    path = spec_path(builds, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generate_spec(builds, name))
+    args = ['-y']
+    if any(options['clean'] for options in builds):
+        args.append('--clean')
+    args += [f'--distpath={os.path.join(root, "dist")}',
+             f'--workpath={os.path.join(root, "build")}', path]
+    return args
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def disk_savings(builds, name):
+    """
+    (dung lượng nếu build riêng, dung lượng bundle) của phần binary/data,
+    phần duy nhất được dùng chung. None nếu spec chưa ghi TARGETS_FILE.
+    """
+    path = os.path.join(bundle_dir(builds), 'build', name, TARGETS_FILE)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            targets = json.load(f)
+    except (OSError, ValueError):
+        return None
+    separate = 0
+    merged = {}
+    for files in targets.values():
+        for dest, src in files:
+            size = _file_size(src)
+            separate += size
+            merged[dest] = size
+    return separate, sum(merged.values())
+
+
+def separate_build_time(builds):
+    """Tổng thời gian lần build riêng thành công gần nhất của từng script, None nếu thiếu"""
+    total = 0.0
+    for options in builds:
+        try:
+            previous = build_history.history(options['script'], build_history.options_key(options))
+        except (sqlite3.Error, OSError):
+            return None
+        walls = [build['wall'] for build in previous if build['success']]
+        if not walls:
+            return None
+        total += walls[-1]
+    return total
+
+
+def shared_packages(builds):
+    """Package dùng chung của mọi target, để worker dựng sẵn graph một lần cho cả spec"""
+    if builds[0]['backend'] != 'api' or not builds[0]['shared_analysis']:
+        return []
+    packages = set()
+    try:
+        for options in builds:
+            packages.update(shared_analysis.project_packages(options))
+    except (RuntimeError, OSError, subprocess.SubprocessError):
+        return []
+    return sorted(packages)
+
+
+def run_multi_target(builds, name, on_output=print, on_progress=None, log_path=None,
+                     on_phase=None, cancel=None):
+    """Build builds thành bundle name, trả về (success, message) như runner.run_build"""
+    builds = [dict(options, onefile=False) for options in builds]
+    try:
+        args = build_args(builds, name)
+    except (OSError, ValueError) as e:
+        return False, f"Lỗi: {str(e)}"
+
+    on_output(f'Multi-target bundle {name}: {", ".join(options["name"] for options in builds)}')
+    on_output(f'Spec: {spec_path(builds, name)}')
+    # Worker chỉ dùng lại graph cache khi mọi Analysis có cùng excludes
+    excludes = builds[0]['excludes']
+    if any(options['excludes'] != excludes for options in builds):
+        excludes = None
+    start = time.monotonic()
+    success, message = runner.run_build(args, None, on_output=on_output, on_progress=on_progress,
+                                        log_path=log_path, on_phase=on_phase, cancel=cancel,
+                                        timeout=builds[0].get('timeout') or None,
+                                        backend=builds[0]['backend'], excludes=excludes,
+                                        cwd=bundle_dir(builds),
+                                        shared=shared_packages(builds) if excludes is not None else [])
+    wall = time.monotonic() - start
+    if not success:
+        return success, message
+
+    separate_time = separate_build_time(builds)
+    if separate_time is not None:
+        on_output(f'Total time: {wall:.1f} s for {len(builds)} targets '
+                  f'(separate builds: {separate_time:.1f} s)')
+    else:
+        on_output(f'Total time: {wall:.1f} s for {len(builds)} targets '
+                  f'(no separate builds in history to compare)')
+    sizes = disk_savings(builds, name)
+    bundle_size = procstats.dir_size(os.path.join(bundle_dir(builds), 'dist', name))
+    if sizes:
+        separate, merged = sizes
+        on_output(f'Disk: bundle {format_size(bundle_size)}, shared binaries/data '
+                  f'{format_size(merged)} instead of {format_size(separate)} '
+                  f'(saved {format_size(separate - merged)})')
+    else:
+        on_output(f'Disk: bundle {format_size(bundle_size)}')
+    return True, f"Đã build {len(builds)} executable vào dist/{name}"
@@ -0,0 +1,111 @@
+"""
+Đo tài nguyên của process con: peak RSS và CPU time khi process kết thúc.
+"""
+import os
+import subprocess
+import sys
+import time
+
+
+def wait_with_usage(proc, timeout=None):
+    """
+    Chờ proc kết thúc, trả về (returncode, peak_rss_bytes, cpu_seconds).
+    returncode là None nếu quá timeout (proc đã bị kill).
+    """
+    if sys.platform == 'win32':
+        return _wait_windows(proc, timeout)
+    return _wait_posix(proc, timeout)
+
+
+def _wait_posix(proc, timeout):
+    deadline = None if timeout is None else time.monotonic() + timeout
+    timed_out = False
+    while True:
+        flags = 0 if deadline is None or timed_out else os.WNOHANG
+        pid, status, usage = os.wait4(proc.pid, flags)
+        if pid:
+            break
+        if time.monotonic() >= deadline:
+            proc.kill()
+            timed_out = True
+            continue
+        time.sleep(0.005)
+
+    # Popen không biết process đã được reap bằng wait4
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss là KB trên Linux, byte trên macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    cpu = usage.ru_utime + usage.ru_stime
+    return (None if timed_out else proc.returncode), usage.ru_maxrss * scale, cpu
+
+
+def _wait_windows(proc, timeout):
+    timed_out = False
+    try:
+        proc.wait(timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        timed_out = True
+
+    peak_rss, cpu = 0, 0.0
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                        ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                        ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+        handle = wintypes.HANDLE(int(proc._handle))
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            peak_rss = counters.PeakWorkingSetSize
+
+        creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+        if ctypes.windll.kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_),
+                                                  ctypes.byref(kernel), ctypes.byref(user)):
+            ticks = lambda ft: (ft.dwHighDateTime << 32) | ft.dwLowDateTime
+            cpu = (ticks(kernel) + ticks(user)) / 1e7
+    except (OSError, AttributeError, ValueError):
+        pass
+
+    return (None if timed_out else proc.returncode), peak_rss, cpu
+
+
+def dir_size(path):
+    total = 0
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def process_age():
+    """Số giây kể từ khi process hiện tại được tạo, None nếu không lấy được"""
+    try:
+        if sys.platform == 'win32':
+            import ctypes
+            from ctypes import wintypes
+            creation, exit_, kernel, user = (wintypes.FILETIME() for _ in range(4))
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if not ctypes.windll.kernel32.GetProcessTimes(handle, ctypes.byref(creation), ctypes.byref(exit_),
+                                                          ctypes.byref(kernel), ctypes.byref(user)):
+                return None
+            ticks = (creation.dwHighDateTime << 32) | creation.dwLowDateTime
+            # FILETIME tính từ 1601-01-01, đơn vị 100ns
+            return time.time() - (ticks / 1e7 - 11644473600)
+        with open('/proc/self/stat', 'r') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime', 'r') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
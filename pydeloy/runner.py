@@ -0,0 +1,298 @@
+"""
+Chạy một build PyInstaller (dùng chung cho ConvertThread và CLI): kiểm tra
+build cache, chạy PyInstaller bằng backend được chọn, báo output/progress
+qua callback. Build huỷ được (CancelToken hoặc timeout): kill cả cây
+process, xoá workpath dở dang và trả worker về pool.
+"""
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import deque
+
+from pydeloy import (build_cache, build_history, buildlog, format_size, incremental, procstats,
+                     shared_analysis, warn_report, worker)
+from pydeloy.cancel import NEW_GROUP, CancelToken, kill_tree
+from pydeloy.build_phases import BuildLogParser
+from pydeloy.config import format_command
+
+# Số dòng lỗi / dòng cuối giữ lại để báo lỗi, log đầy đủ nằm trong log_path
+ERROR_LINES = 5
+TAIL_LINES = 10
+
+BACKENDS = ('api', 'subprocess')
+
+
+def pyinstaller_command():
+    """Lệnh chạy PyInstaller cho backend subprocess, không qua shell"""
+    pyinstaller = shutil.which('pyinstaller')
+    if pyinstaller:
+        return [pyinstaller]
+    from pydeloy.module_index import default_interpreter
+    return [default_interpreter(), '-m', 'PyInstaller']
+
+
+def run_subprocess(args, cwd, on_line, cancel=None, toolchain=None):
+    """
+    Backend subprocess: một process pyinstaller mới (của toolchain nếu có).
+    Trả về (returncode, peak_rss, cpu)
+    """
+    cancel = cancel or CancelToken()
+    command = toolchain.command() if toolchain else pyinstaller_command()
+    process = subprocess.Popen(
+        command + list(args),
+        cwd=cwd,
+        env=toolchain.env() if toolchain else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
+        universal_newlines=True,
+        **NEW_GROUP
+    )
+    kill = lambda: kill_tree(process.pid)
+    cancel.on_cancel(kill)
+    try:
+        for line in process.stdout:
+            on_line(line)
+        return procstats.wait_with_usage(process)
+    finally:
+        cancel.remove(kill)
+
+
+def run_api(args, cwd, on_line, excludes=None, cancel=None, shared=()):
+    """
+    Backend api: PyInstaller.__main__.run trong worker dùng lại được, với
+    module graph dựng sẵn các package dùng chung shared. Huỷ thì kill worker
+    (và process con của nó); pool không nhận lại worker đã chết, build sau
+    sẽ dùng worker khác.
+    """
+    cancel = cancel or CancelToken()
+    pyi_worker = worker.acquire(excludes, shared)
+    cancel.on_cancel(pyi_worker.kill)
+    try:
+        return pyi_worker.run(args, cwd, on_line, excludes, shared)
+    finally:
+        cancel.remove(pyi_worker.kill)
+        worker.release(pyi_worker)
+
+
+def run_build(args, options=None, on_output=print, on_progress=None, log_path=None,
+              on_phase=None, log_parser=None, cancel=None, timeout=None, backend=None,
+              excludes=None, shared=None, toolchain=None, cwd=None):
+    """
+    Chạy PyInstaller với argv args (không gồm tên chương trình), trả về
+    (success, message). Output đầy đủ ghi vào log_path nếu có. on_phase(tên)
+    được gọi khi sang giai đoạn mới; truyền log_parser (BuildLogParser) để
+    đọc thời gian từng giai đoạn sau khi chạy. cancel (CancelToken) huỷ
+    build từ thread khác; timeout (giây, mặc định lấy options['timeout'])
+    tự huỷ build chạy quá lâu. backend, excludes và shared (package dựng
+    sẵn trong worker) mặc định lấy từ options; truyền vào khi build từ spec.
+    toolchain (toolchains.Toolchain) build bằng interpreter/PyInstaller khác,
+    luôn qua backend subprocess. cwd mặc định là thư mục script của options;
+    build không có options phải truyền cwd, nếu không worker API giữ thư mục
+    của job trước.
+    """
+    on_progress = on_progress or (lambda value: None)
+    log_parser = log_parser if log_parser is not None else BuildLogParser()
+    cancel = cancel or CancelToken()
+    backend = 'subprocess' if toolchain else backend or (options or {}).get('backend', 'subprocess')
+    if cwd is None and options:
+        cwd = os.path.dirname(options['script'])
+    if timeout is None:
+        timeout = (options or {}).get('timeout') or None
+    timer = None
+    if timeout:
+        timer = threading.Timer(timeout, cancel.cancel, args=(f'timeout after {timeout:g} s',))
+        timer.daemon = True
+    log_file = None
+    try:
+        if log_path:
+            log_file = buildlog.open_log(log_path)
+            log_file.write(f'$ {format_command(["pyinstaller"] + list(args))}\n')
+
+        def output(line):
+            on_output(line)
+            if log_file:
+                log_file.write(line + '\n')
+
+        cache_key = None
+        if options and options.get('cache'):
+            cache_key = build_cache.compute_key(options, toolchain)
+            artifact = build_cache.lookup(options, cache_key)
+            if artifact:
+                output(f'Cache hit ({cache_key[:12]}): {artifact} is up to date, skipping PyInstaller')
+                on_progress(100)
+                return True, "Không có thay đổi, dùng lại bản build trước (cache hit)"
+            output(f'Cache miss ({cache_key[:12]}), building...')
+
+        if options and options.get('incremental') and '--clean' not in args:
+            # Quyết định lúc build chứ không lúc tạo lệnh: needs_clean có thể phải hỏi interpreter
+            if incremental.needs_clean(options):
+                output('Incremental: toolchain changed or no previous state, building clean')
+                args = ['--clean'] + list(args)
+            else:
+                output('Incremental: reusing the cached workpath')
+
+        if cancel.cancelled:
+            return False, f"Build bị huỷ: {cancel.reason}"
+        on_progress(0)
+        error_lines = deque(maxlen=ERROR_LINES)
+        tail = deque(maxlen=TAIL_LINES)
+
+        def handle_line(line):
+            line = line.strip()
+            line_lower = line.lower()
+            output(line)
+            tail.append(line)
+            if 'error' in line_lower or 'failed' in line_lower:
+                error_lines.append(line)
+
+            phase = log_parser.phase
+            if log_parser.feed(line):
+                on_progress(log_parser.progress)
+            if on_phase and log_parser.phase != phase:
+                on_phase(log_parser.phase)
+
+        started = time.time()
+        start = time.monotonic()
+        if timer:
+            timer.start()
+        if backend == 'api':
+            if shared is None:
+                shared = project_shared_packages(options, output)
+            if excludes is None and options:
+                excludes = options['excludes']
+            try:
+                returncode, peak_rss, cpu = run_api(args, cwd, handle_line, excludes, cancel, shared)
+            except (worker.WorkerError, OSError) as e:
+                if cancel.cancelled:
+                    # Worker bị kill giữa lúc đang gửi job
+                    returncode, peak_rss, cpu = -1, 0, 0.0
+                else:
+                    output(f'API backend unavailable ({e}), falling back to subprocess')
+                    returncode, peak_rss, cpu = run_subprocess(args, cwd, handle_line, cancel)
+        else:
+            returncode, peak_rss, cpu = run_subprocess(args, cwd, handle_line, cancel, toolchain)
+        wall = time.monotonic() - start
+        if timer:
+            timer.cancel()
+
+        # Build đã xong thành công ngay lúc bị huỷ thì giữ kết quả
+        if cancel.cancelled and returncode != 0:
+            output(f'Build cancelled ({cancel.reason}) after {wall:.1f} s in phase '
+                   f'{log_parser.phase or "Setup"}')
+            for path in remove_partial_output(args, options, log_parser.phase):
+                output(f'Removed partial output: {path}')
+            return False, f"Build bị huỷ: {cancel.reason}"
+
+        if log_parser.phases:
+            for line in log_parser.summary().splitlines():
+                output(line)
+        output(f'Build time: {wall:.1f} s wall, {cpu:.1f} s CPU, peak RSS {format_size(peak_rss)}')
+        if options:
+            for line in record_history(options, returncode == 0, wall, cpu, peak_rss,
+                                       log_parser.durations(), started):
+                output(line)
+        report = load_warn_report(args, options, started)
+        if report is not None:
+            output(report.summary())
+
+        if returncode == 0:
+            if cache_key:
+                build_cache.store(options, cache_key)
+            if options and options.get('incremental'):
+                incremental.save_state(options)
+            on_progress(100)
+            return True, "Chuyển đổi thành công!"
+
+        error_msg = '\n'.join(error_lines or tail)
+        if report is not None and report.details():
+            # Module thiếu thường là nguyên nhân thật, rõ hơn dòng "error" cuối log
+            error_msg += '\n\nMissing modules:\n' + '\n'.join(report.details())
+        return False, f"PyInstaller lỗi (code {returncode}):\n\n{error_msg}"
+
+    except Exception as e:
+        if cancel.cancelled:
+            return False, f"Build bị huỷ: {cancel.reason}"
+        return False, f"Lỗi: {str(e)}"
+    finally:
+        if timer:
+            timer.cancel()
+        if log_file:
+            buildlog.close_log(log_file)
+
+
+def load_warn_report(args, options, started):
+    """Báo cáo module thiếu của build vừa chạy, None nếu không có warn file"""
+    if not options:
+        return None
+    try:
+        return warn_report.load_report(options, since=started, workpath=_arg_value(args, '--workpath'))
+    except (OSError, ValueError):
+        return None
+
+
+def project_shared_packages(options, output):
+    """Package bên thứ ba của cả project để dựng sẵn trong worker (rỗng nếu tắt)"""
+    if not options or not options.get('shared_analysis'):
+        return []
+    try:
+        packages = shared_analysis.project_packages(options)
+    except (RuntimeError, OSError, subprocess.SubprocessError) as e:
+        output(f'Shared analysis cache unavailable: {e}')
+        return []
+    if packages:
+        output(f'Shared analysis cache: {len(packages)} project packages')
+    return packages
+
+
+def _arg_value(args, flag):
+    for arg in args:
+        if arg.startswith(flag + '='):
+            return arg[len(flag) + 1:]
+    return None
+
+
+def remove_partial_output(args, options, phase):
+    """
+    Xoá thư mục build dở của build bị huỷ (workpath/<name>, kèm state
+    incremental để lần sau build sạch), và artifact trong dist nếu đã bắt
+    đầu EXE/COLLECT. Trả về các đường dẫn đã xoá.
+    """
+    workpath = _arg_value(args, '--workpath')
+    if not options or not workpath:
+        return []
+    paths = [os.path.join(workpath, options['name'])]
+    if options.get('incremental'):
+        paths.append(os.path.join(workpath, incremental.STATE_FILE))
+    if phase in ('EXE', 'COLLECT'):
+        artifact = build_cache.artifact_path(options)
+        paths.append(artifact if options['onefile'] else os.path.dirname(artifact))
+    removed = []
+    for path in paths:
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        elif os.path.isfile(path):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+        else:
+            continue
+        removed.append(path)
+    return removed
+
+
+def record_history(options, success, wall, cpu, peak_rss, phases, started):
+    """Lưu lần build vào lịch sử, trả về các dòng cảnh báo regression (nếu có)"""
+    try:
+        build_id = build_history.record(options, success, wall, cpu, peak_rss, phases, started)
+        builds = build_history.history(options['script'], build_history.options_key(options),
+                                       limit=build_history.REGRESSION_WINDOW + 1)
+    except (sqlite3.Error, OSError) as e:
+        return [f'Could not save build history: {e}']
+    return [f'Regression: {name} took {seconds:.1f} s, median of previous builds {baseline:.1f} s'
+            for name, seconds, baseline in build_history.regressions(builds).get(build_id, [])]
@@ -0,0 +1,71 @@
+"""
+Cache phân tích dependency dùng chung cho mọi script trong một project.
+
+Mỗi project (thư mục chứa script) có một manifest ghi các package bên thứ
+ba mà từng script import. Worker PyInstaller dựng module graph cho hợp các
+package đó một lần (gồm cả hidden import do hook thêm vào) rồi dùng lại
+cho mọi build sau: Analysis chỉ còn phải quét code của chính script.
+Graph được dựng lại khi interpreter, excludes hoặc version một package đổi.
+
+Graph chứa code object nên không pickle ra đĩa được; cache nằm trong bộ
+nhớ của từng worker, manifest trên đĩa cho phép làm ấm worker ngay khi mở
+project.
+"""
+import json
+import os
+import threading
+
+from pydeloy import import_graph, module_index
+
+MANIFEST_FILE = '.pydeloy-shared-analysis.json'
+
+_manifest_lock = threading.Lock()
+
+
+def _manifest_file(options):
+    return os.path.join(os.path.dirname(options['script']), 'build', MANIFEST_FILE)
+
+
+def _load(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def third_party_packages(script, interpreter=None):
+    """Các package bên thứ ba (site-packages) mà script và module local của nó import"""
+    modules = module_index.load_index(interpreter)['modules']
+    names = import_graph.analyze(script).top_level_names()
+    return sorted(name for name in names if modules.get(name, {}).get('kind') == 'site')
+
+
+def project_packages(options, interpreter=None):
+    """
+    Ghi package của script vào manifest của project, trả về hợp các
+    package của mọi script (còn tồn tại) trong project.
+    """
+    script = os.path.abspath(options['script'])
+    packages = third_party_packages(script, interpreter)
+    path = _manifest_file(options)
+    # Các job batch chạy song song có thể cùng ghi manifest
+    with _manifest_lock:
+        manifest = _load(path)
+        manifest = {name: value for name, value in manifest.items() if os.path.isfile(name)}
+        if manifest.get(script) != packages:
+            manifest[script] = packages
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, indent=2)
+            except OSError:
+                pass
+    return sorted({name for names in manifest.values() for name in names})
+
+
+def known_packages(options):
+    """Hợp các package trong manifest của project, không phân tích lại (để làm ấm worker)"""
+    manifest = _load(_manifest_file(options))
+    return sorted({name for script, names in manifest.items()
+                   if os.path.isfile(script) for name in names})
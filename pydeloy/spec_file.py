@@ -0,0 +1,314 @@
+"""
+Spec engine: tạo file .spec từ option, đọc ngược .spec (kể cả file người
+dùng tự sửa) về option bằng ast, và tạo argv để build thẳng từ spec.
+
+Spec cho phép những thứ option CLI không làm được: lọc binary theo glob
+(binary_excludes, trên tên đích trong bundle) và lọc module Python trong
+PYZ theo glob (pure_excludes, vd. 'numpy.*.tests.*').
+"""
+import ast
+import os
+
+from pydeloy import config
+
+SPEC_HEADER = '''# -*- mode: python ; coding: utf-8 -*-
+# Generated by PyDeloy{title}
+import fnmatch
+{imports}
+'''
+
+ANALYSIS_TEMPLATE = '''{a} = Analysis(
+    [{script!r}],
+    pathex=[{pathex!r}],
+    binaries={binaries!r},
+    datas={datas!r},
+    hiddenimports={hidden_imports!r},
+    hookspath=[],
+    runtime_hooks=[],
+    excludes={excludes!r},
+    noarchive=False,
+)
+'''
+
+# Lọc theo glob, tên biến module-level để parse_spec đọc lại được
+FILTER_TEMPLATE = '''{variable} = {patterns!r}
+{a}.{toc} = [entry for entry in {a}.{toc}
+{pad}if not any(fnmatch.fnmatch(entry[0], pattern) for pattern in {variable})]
+'''
+
+ONEFILE_TEMPLATE = '''{pyz} = PYZ({a}.pure)
+{exe} = EXE(
+    {pyz},
+    {a}.scripts,
+    {a}.binaries,
+    {a}.datas,
+    [],
+    name={name!r},
+    console={console!r},
+    icon={icon!r},
+)
+
+'''
+
+ONEDIR_TEMPLATE = '''{pyz} = PYZ({a}.pure)
+{exe} = EXE(
+    {pyz},
+    {a}.scripts,
+    [],
+    exclude_binaries=True,
+    name={name!r},
+    console={console!r},
+    icon={icon!r},
+)
+
+'''
+
+COLLECT_TEMPLATE = '''coll = COLLECT(
+{entries}    name={name!r},
+)
+'''
+
+FILTERS = (('binary_excludes', 'binaries', 'BINARY_EXCLUDES'),
+           ('pure_excludes', 'pure', 'PURE_EXCLUDES'))
+
+
+def _pairs(entries):
+    return [tuple(entry) for entry in entries]
+
+
+def target_block(options, index=None, onefile=None):
+    """Analysis/PYZ/EXE (kèm bộ lọc) của một script; index phân biệt tên biến trong spec nhiều target"""
+    suffix = '' if index is None else str(index)
+    a = f'a{suffix}'
+    onefile = options['onefile'] if onefile is None else onefile
+    parts = [ANALYSIS_TEMPLATE.format(
+        a=a, script=options['script'], pathex=os.path.dirname(options['script']),
+        binaries=_pairs(options['binaries']), datas=_pairs(options['datas']),
+        hidden_imports=config.get_gui_imports(options['gui']) + options['hidden_imports'],
+        excludes=options['excludes'])]
+    for key, toc, variable in FILTERS:
+        if options[key]:
+            variable += suffix
+            parts.append(FILTER_TEMPLATE.format(
+                variable=variable, patterns=list(options[key]), a=a, toc=toc,
+                pad=' ' * len(f'{a}.{toc} = [')))
+    template = ONEFILE_TEMPLATE if onefile else ONEDIR_TEMPLATE
+    parts.append(template.format(a=a, pyz=f'pyz{suffix}', exe=f'exe{suffix}', name=options['name'],
+                                 console=not options['noconsole'], icon=options['icon'] or None))
+    return ''.join(parts)
+
+
+def generate_spec(options):
+    """Nội dung .spec cho một script, tương đương build_args(options) cộng bộ lọc"""
+    parts = [SPEC_HEADER.format(title='', imports=''), target_block(options)]
+    if not options['onefile']:
+        parts.append(COLLECT_TEMPLATE.format(entries='    exe,\n    a.binaries,\n    a.datas,\n',
+                                             name=options['name']))
+    return ''.join(parts)
+
+
+def spec_path(options):
+    """Chỗ lưu mặc định khi người dùng tự lưu spec: cạnh script"""
+    return os.path.join(os.path.dirname(options['script']), f'{options["name"]}.spec')
+
+
+def _workpath(options, workpath=None):
+    if workpath is None or options['incremental']:
+        return config.workpath_for(options)
+    return workpath
+
+
+def generated_spec_path(options, workpath=None):
+    """
+    Chỗ ghi spec sinh ra lúc build: gốc workpath (--clean chỉ xóa
+    workpath/<name>), để không ghi đè <name>.spec người dùng đặt cạnh script.
+    """
+    return os.path.join(_workpath(options, workpath), f'{options["name"]}.spec')
+
+
+def resolve_paths(options):
+    """
+    Bản sao options với data/binary/icon tương đối tính theo thư mục script:
+    PyInstaller tính chúng theo thư mục của spec, không còn là thư mục script.
+    """
+    base = os.path.dirname(options['script'])
+    resolve = lambda path: path if os.path.isabs(path) else os.path.normpath(os.path.join(base, path))
+    options = dict(options)
+    for key in ('datas', 'binaries'):
+        options[key] = [[resolve(src), dest] for src, dest in options[key]]
+    if options['icon']:
+        options['icon'] = resolve(options['icon'])
+    return options
+
+
+def write_spec(options, path=None):
+    """Ghi spec cho options, mặc định vào generated_spec_path"""
+    if path is None:
+        path = generated_spec_path(options)
+        options = resolve_paths(options)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(generate_spec(options))
+    return path
+
+
+def needs_spec(options):
+    """True nếu options có phần chỉ spec mới diễn tả được"""
+    return any(options[key] for key, _, _ in FILTERS)
+
+
+def spec_args(path, options, workpath=None):
+    """argv build thẳng từ spec: chỉ còn các option PyInstaller nhận kèm spec"""
+    workpath = _workpath(options, workpath)
+    args = ['-y']
+    # Incremental: runner.run_build thêm --clean khi toolchain đổi, như config.build_args
+    if options['clean'] and not options['incremental']:
+        args.append('--clean')
+    file_dir = os.path.dirname(options['script'])
+    args += [f'--distpath={os.path.join(file_dir, "dist")}', f'--workpath={workpath}', path]
+    return args
+
+
+def spec_build_options(options, path, target_count):
+    """
+    Option để build thẳng từ spec path có target_count target. Cache chỉ
+    biết script và artifact của target đầu tiên nên tắt với spec nhiều target.
+    """
+    return dict(options, spec=os.path.abspath(path), cache=options['cache'] and target_count == 1)
+
+
+def build_args(options, workpath=None):
+    """Ghi spec cho options rồi trả về argv để build nó"""
+    path = generated_spec_path(options, workpath)
+    return spec_args(write_spec(resolve_paths(options), path), options, workpath)
+
+
+def pyinstaller_args(options, workpath=None, write=True):
+    """
+    argv PyInstaller cho options: build từ spec có sẵn (options['spec']),
+    từ spec sinh ra khi có bộ lọc chỉ spec mới làm được, còn lại bằng
+    option CLI. write=False để chỉ hiển thị lệnh, không ghi spec.
+    """
+    if options['spec']:
+        return spec_args(options['spec'], options, workpath)
+    if needs_spec(options):
+        if write:
+            return build_args(options, workpath)
+        return spec_args(generated_spec_path(options, workpath), options, workpath)
+    return config.build_args(options, workpath)
+
+
+def build_command(options, workpath=None):
+    """Lệnh PyInstaller dạng chuỗi, để hiển thị (không ghi spec)"""
+    return config.format_command(['pyinstaller'] + pyinstaller_args(options, workpath, write=False))
+
+
+class SpecError(Exception):
+    """File spec không đọc được (lỗi cú pháp, không có Analysis)"""
+
+
+def _literal(node, field, warnings):
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, RecursionError):
+        warnings.append(f'{field}: not a literal ({ast.unparse(node)}), kept only in the spec')
+        return None
+
+
+def _call_name(node):
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        return node.func.id
+    return None
+
+
+def _refs(call):
+    """Tên biến được truyền vào call, vd. {('a', 'binaries'), ('pyz', None)}"""
+    refs = set()
+    for arg in call.args:
+        if isinstance(arg, ast.Attribute) and isinstance(arg.value, ast.Name):
+            refs.add((arg.value.id, arg.attr))
+        elif isinstance(arg, ast.Name):
+            refs.add((arg.id, None))
+    return refs
+
+
+def parse_spec(path):
+    """
+    Đọc spec, trả về (list option, mỗi Analysis một option, list cảnh báo).
+    Phần không phải literal (vd. collect_data_files(...)) được bỏ qua kèm
+    cảnh báo; build từ chính file spec vẫn giữ nguyên chúng.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source, path)
+    except SyntaxError as e:
+        raise SpecError(f'{path}: {e}')
+
+    spec_dir = os.path.dirname(os.path.abspath(path))
+    warnings = []
+    calls = {}
+    filters = {}
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)):
+            continue
+        variable = node.targets[0].id
+        if _call_name(node.value):
+            calls[variable] = node.value
+        elif variable.startswith(tuple(name for _, _, name in FILTERS)):
+            filters[variable] = _literal(node.value, variable, warnings) or []
+
+    targets = []
+    for variable, call in calls.items():
+        if _call_name(call) != 'Analysis' or not call.args:
+            continue
+        scripts = _literal(call.args[0], 'scripts', warnings) or []
+        if not scripts:
+            continue
+        keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+        options = config.make_options(os.path.join(spec_dir, scripts[0]))
+        for field, key in (('hiddenimports', 'hidden_imports'), ('excludes', 'excludes'),
+                           ('datas', 'datas'), ('binaries', 'binaries')):
+            if field in keywords:
+                value = _literal(keywords[field], field, warnings)
+                if value is not None:
+                    options[key] = [list(item) for item in value] if key in ('datas', 'binaries') else list(value)
+        suffix = variable[1:] if variable.startswith('a') else ''
+        options['binary_excludes'] = filters.get('BINARY_EXCLUDES' + suffix, [])
+        options['pure_excludes'] = filters.get('PURE_EXCLUDES' + suffix, [])
+        _read_exe(calls, variable, options, warnings)
+        _split_gui_imports(options)
+        targets.append(options)
+
+    if not targets:
+        raise SpecError(f'{path}: no Analysis(...) with a script found')
+    return targets, warnings
+
+
+def _read_exe(calls, analysis, options, warnings):
+    for call in calls.values():
+        if _call_name(call) != 'EXE' or (analysis, 'scripts') not in _refs(call):
+            continue
+        keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+        if 'name' in keywords:
+            options['name'] = _literal(keywords['name'], 'name', warnings) or options['name']
+        if 'console' in keywords:
+            options['noconsole'] = _literal(keywords['console'], 'console', warnings) is False
+        icon = _literal(keywords['icon'], 'icon', warnings) if 'icon' in keywords else None
+        if isinstance(icon, (list, tuple)):
+            icon = icon[0] if icon else None
+        options['icon'] = icon if isinstance(icon, str) else ''
+        # onefile: EXE nhận thẳng binaries của Analysis thay vì để COLLECT gom
+        options['onefile'] = (analysis, 'binaries') in _refs(call)
+        return
+
+
+def _split_gui_imports(options):
+    """Tách hidden import của GUI framework về option gui như trên GUI"""
+    for framework in config.GUI_FRAMEWORKS:
+        imports = config.get_gui_imports(framework)
+        if imports and all(name in options['hidden_imports'] for name in imports):
+            options['gui'] = framework
+            options['hidden_imports'] = [name for name in options['hidden_imports'] if name not in imports]
+            return
@@ -0,0 +1,235 @@
+"""
+Toolchain: một interpreter (venv, pyenv, python trên PATH) cùng PyInstaller
+cài trong nó, hoặc nằm trong thư mục thêm vào PYTHONPATH như ./libs. Registry
+lưu các toolchain người dùng thêm vào; toolchain tìm thấy tự động (PATH,
+pyenv, venv cạnh script, ./libs) được thêm khi liệt kê.
+"""
+import glob
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from pydeloy import DATA_DIR
+
+REGISTRY_FILE = os.path.join(DATA_DIR, 'toolchains.json')
+
+# Chạy được cả với Python cũ, in version Python và PyInstaller (null nếu chưa cài)
+PROBE_SCRIPT = '''
+import json, sys
+try:
+    import PyInstaller
+    version = PyInstaller.__version__
+except Exception:
+    version = None
+print(json.dumps({"python": "%d.%d.%d" % tuple(sys.version_info[:3]), "pyinstaller": version}))
+'''
+
+VENV_DIRS = ('.venv*', 'venv*', 'env')
+
+_probes = {}
+_probe_lock = threading.Lock()
+
+
+class Toolchain:
+    def __init__(self, name, interpreter, path=(), python='', pyinstaller=None):
+        self.name = name
+        self.interpreter = interpreter
+        # Thư mục thêm vào PYTHONPATH, vd. ./libs cài bằng pip --target
+        self.path = list(path)
+        self.python = python
+        self.pyinstaller = pyinstaller
+
+    @property
+    def available(self):
+        return bool(self.pyinstaller)
+
+    def command(self):
+        return [self.interpreter, '-m', 'PyInstaller']
+
+    def env(self):
+        """Environment cho process PyInstaller, None nếu dùng nguyên environment hiện tại"""
+        if not self.path:
+            return None
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join(self.path + [p for p in [env.get('PYTHONPATH')] if p])
+        return env
+
+    def script(self):
+        """Script pyinstaller cạnh interpreter (hoặc trong path/bin), None nếu không có"""
+        exe = 'pyinstaller.exe' if sys.platform == 'win32' else 'pyinstaller'
+        folders = [os.path.join(path, 'bin') for path in self.path]
+        folders.append(os.path.dirname(self.interpreter))
+        for folder in folders:
+            candidate = os.path.join(folder, exe)
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    def label(self):
+        pyinstaller = f'PyInstaller {self.pyinstaller}' if self.pyinstaller else 'no PyInstaller'
+        return f'{self.name}: Python {self.python or "?"}, {pyinstaller}'
+
+    def to_dict(self):
+        return {'name': self.name, 'interpreter': self.interpreter, 'path': self.path}
+
+
+def probe(interpreter, path=()):
+    """(version Python, version PyInstaller hoặc None); RuntimeError nếu không chạy được"""
+    key = (os.path.realpath(interpreter), tuple(path))
+    with _probe_lock:
+        if key in _probes:
+            return _probes[key]
+    toolchain = Toolchain('', interpreter, path)
+    try:
+        result = subprocess.run([interpreter, '-c', PROBE_SCRIPT], capture_output=True, text=True,
+                                timeout=30, env=toolchain.env())
+        info = json.loads(result.stdout.strip().splitlines()[-1])
+    except (OSError, subprocess.SubprocessError, ValueError, IndexError):
+        raise RuntimeError(f'{interpreter} is not a working Python interpreter')
+    versions = (info['python'], info['pyinstaller'])
+    with _probe_lock:
+        _probes[key] = versions
+    return versions
+
+
+def auto_name(python, pyinstaller):
+    """'py3.11-pyi6.3.0'"""
+    short = '.'.join(python.split('.')[:2])
+    return f'py{short}-pyi{pyinstaller}' if pyinstaller else f'py{short}'
+
+
+def load_registry():
+    """(list Toolchain đã đăng ký, chưa probe; tên toolchain mặc định hoặc None)"""
+    try:
+        with open(REGISTRY_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return [], None
+    toolchains = [Toolchain(entry['name'], entry['interpreter'], entry.get('path', ()))
+                  for entry in data.get('toolchains', [])]
+    return toolchains, data.get('default')
+
+
+def save_registry(toolchains, default=None):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(REGISTRY_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'toolchains': [t.to_dict() for t in toolchains], 'default': default}, f, indent=2)
+
+
+def register(interpreter, name=None, path=(), default=False):
+    """Probe rồi thêm (hoặc thay) toolchain vào registry; ValueError nếu thiếu PyInstaller"""
+    interpreter = os.path.abspath(interpreter)
+    path = [os.path.abspath(p) for p in path]
+    python, pyinstaller = probe(interpreter, path)
+    if not pyinstaller:
+        raise ValueError(f'PyInstaller is not installed for {interpreter}')
+    toolchain = Toolchain(name or auto_name(python, pyinstaller), interpreter, path, python, pyinstaller)
+    toolchains, current = load_registry()
+    toolchains = [t for t in toolchains if t.name != toolchain.name] + [toolchain]
+    save_registry(toolchains, toolchain.name if default else current)
+    return toolchain
+
+
+def unregister(name):
+    toolchains, default = load_registry()
+    remaining = [t for t in toolchains if t.name != name]
+    if len(remaining) == len(toolchains):
+        raise KeyError(name)
+    save_registry(remaining, None if default == name else default)
+
+
+def _candidates(script_dir=None, libs_dir=None):
+    """(interpreter, path) có thể là toolchain: Python đang chạy, ./libs, venv, pyenv, PATH"""
+    from pydeloy.module_index import default_interpreter
+    found = [(default_interpreter(), [])]
+    if libs_dir and os.path.isdir(os.path.join(libs_dir, 'PyInstaller')):
+        found.append((default_interpreter(), [libs_dir]))
+    binary = os.path.join('Scripts', 'python.exe') if sys.platform == 'win32' else os.path.join('bin', 'python')
+    if script_dir:
+        for pattern in VENV_DIRS:
+            found += [(path, []) for path in sorted(glob.glob(os.path.join(script_dir, pattern, binary)))]
+    pyenv_root = os.environ.get('PYENV_ROOT') or os.path.join(os.path.expanduser('~'), '.pyenv')
+    found += [(path, []) for path in sorted(glob.glob(os.path.join(pyenv_root, 'versions', '*', binary)))]
+    for minor in range(8, 15):
+        path = shutil.which(f'python3.{minor}')
+        if path:
+            found.append((path, []))
+    return found
+
+
+def discover(script_dir=None, libs_dir=None):
+    """Toolchain tìm thấy tự động có PyInstaller, mỗi (interpreter thật, path) một lần"""
+    seen = set()
+    candidates = []
+    for interpreter, path in _candidates(script_dir, libs_dir):
+        key = (os.path.realpath(interpreter), tuple(path))
+        if key not in seen:
+            seen.add(key)
+            candidates.append((interpreter, path))
+
+    def check(candidate):
+        try:
+            return candidate, probe(*candidate)
+        except RuntimeError:
+            return candidate, (None, None)
+
+    toolchains = []
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for (interpreter, path), (python, pyinstaller) in executor.map(check, candidates):
+            if pyinstaller:
+                name = auto_name(python, pyinstaller) + ('-libs' if path else '')
+                toolchains.append(Toolchain(name, interpreter, path, python, pyinstaller))
+    return toolchains
+
+
+def available(script_dir=None, libs_dir=None):
+    """Toolchain đã đăng ký (đã probe) rồi toolchain tìm thấy mà chưa đăng ký, tên không trùng"""
+    toolchains, _ = load_registry()
+    for toolchain in toolchains:
+        try:
+            toolchain.python, toolchain.pyinstaller = probe(toolchain.interpreter, toolchain.path)
+        except RuntimeError:
+            toolchain.python, toolchain.pyinstaller = '', None
+    registered = {(os.path.realpath(t.interpreter), tuple(t.path)) for t in toolchains}
+    names = {t.name for t in toolchains}
+    for toolchain in discover(script_dir, libs_dir):
+        if (os.path.realpath(toolchain.interpreter), tuple(toolchain.path)) in registered:
+            continue
+        base, index = toolchain.name, 2
+        while toolchain.name in names:
+            toolchain.name = f'{base}-{index}'
+            index += 1
+        names.add(toolchain.name)
+        toolchains.append(toolchain)
+    return toolchains
+
+
+def select(names, script_dir=None, libs_dir=None):
+    """Toolchain theo tên (theo thứ tự names), names rỗng = mọi toolchain dùng được"""
+    toolchains = available(script_dir, libs_dir)
+    if not names:
+        return [t for t in toolchains if t.available]
+    by_name = {t.name: t for t in toolchains}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise KeyError(', '.join(unknown))
+    return [by_name[name] for name in names]
+
+
+def default_pyinstaller():
+    """Script pyinstaller của toolchain mặc định trong registry, None nếu chưa chọn"""
+    toolchains, default = load_registry()
+    for toolchain in toolchains:
+        if toolchain.name == default:
+            return toolchain.script()
+    return None
+
+
+def safe_name(name):
+    """Tên toolchain dùng được làm tên thư mục"""
+    return re.sub(r'[^\w.-]+', '_', name)
@@ -0,0 +1,312 @@
+"""
+Đọc warn-<name>.txt và xref-<name>.html mà PyInstaller ghi trong workpath:
+gom module thiếu theo module import nó, tách phần vô hại (import tuỳ
+chọn, module của platform khác) khỏi phần nghiêm trọng, và đề xuất cách
+sửa (hidden import, exclude module import nó, bỏ exclude).
+
+File xref có thể lớn vài MB nên chỉ được đọc khi cần chuỗi import và
+được cache theo (path, mtime, size).
+"""
+import os
+import re
+import sys
+import threading
+from collections import deque
+
+from pydeloy import config, module_index
+
+WARN_LINE = re.compile(r"^(missing|excluded) module named (?:'([^']+)'|(\S+)) - imported by (.*)$")
+IMPORTER = re.compile(r'\s*(.+?) \(([^)]*)\)(?:,|$)')
+
+XREF_NODE = re.compile(r'<div class="node">\s*<a name="([^"]*)"></a>(.*?)\n</div>', re.S)
+XREF_TYPE = re.compile(r'<span class="moduletype">([^<]*)</span>')
+XREF_FILE = re.compile(r'<a target="code" href="([^"]*)"')
+XREF_SECTION = re.compile(r'(imports|imported by):(.*?)</div>', re.S)
+XREF_LINK = re.compile(r'<a href="#([^"]*)">')
+
+# Module chỉ có trên platform khác: thiếu ở đây là bình thường
+PLATFORM_MODULES = {
+    'win32': {'posix', 'pwd', 'grp', 'termios', 'fcntl', 'resource', 'readline', '_posixsubprocess',
+              '_scproxy', 'AppKit', 'Foundation', 'objc', 'CoreFoundation'},
+    'darwin': {'nt', 'winreg', '_winreg', '_winapi', 'msvcrt', '_overlapped', 'win32api', 'win32con',
+               'win32com', 'win32file', 'win32pipe', 'win32process', 'pywintypes', 'winerror'},
+}
+PLATFORM_MODULES['linux'] = PLATFORM_MODULES['darwin'] | {'_scproxy', 'AppKit', 'Foundation', 'objc',
+                                                          'CoreFoundation'}
+OTHER_PYTHONS = {'java', 'org', 'vms_lib', '_java', 'jnius', '__builtin__', 'ce', 'riscos', 'riscosenviron',
+                 'clr', 'System'}
+PLATFORM_IMPORTER = re.compile(r'(^|[._])(win32|windows|winreg|wincon|nt|msvc\w*|darwin|macos|osx|cocoa)'
+                               r'([._]|\d|$)')
+# Module ảo được resolve lúc chạy (alias của package vendor) hoặc có sẵn trong bootloader
+VIRTUAL_PREFIXES = ('six.moves.', 'pkg_resources.extern.', 'setuptools.extern.', 'pyimod', '_pyi',
+                    '_frozen_importlib')
+
+# Loại entry: critical thì gần như chắc app lỗi khi chạy
+CRITICAL, EXCLUDED, OPTIONAL, PLATFORM = 'critical', 'excluded', 'optional', 'platform'
+
+_xref_cache = {}
+_xref_lock = threading.Lock()
+
+
+class MissingModule:
+    def __init__(self, name, status, importers):
+        self.name = name
+        # 'missing' hoặc 'excluded' (bị --exclude-module)
+        self.status = status
+        # List (tên module import nó, tập kiểu import: top-level/conditional/delayed/optional)
+        self.importers = importers
+        self.category = OPTIONAL
+        self.chain = []
+        # (hành động, tên): ('hidden', module), ('exclude', importer), ('include', module)
+        self.fix = None
+
+    def top_level_importers(self):
+        return [name for name, kinds in self.importers if 'top-level' in kinds]
+
+
+class WarnReport:
+    def __init__(self, warn_path, modules):
+        self.warn_path = warn_path
+        self.modules = modules
+
+    def count(self, category):
+        return sum(1 for module in self.modules if module.category == category)
+
+    def by_importer(self, categories=None):
+        """{module import: [MissingModule]}, importer có entry nghiêm trọng nhất lên đầu"""
+        groups = {}
+        for module in self.modules:
+            if categories and module.category not in categories:
+                continue
+            for importer, _ in module.importers:
+                groups.setdefault(importer, []).append(module)
+        rank = {CRITICAL: 0, EXCLUDED: 1, OPTIONAL: 2, PLATFORM: 3}
+        return dict(sorted(groups.items(), key=lambda item: (
+            min(rank[m.category] for m in item[1]), -len(item[1]), item[0])))
+
+    def summary(self):
+        critical = [module.name for module in self.modules if module.category in (CRITICAL, EXCLUDED)]
+        text = (f'Missing modules: {self.count(CRITICAL)} critical, {self.count(EXCLUDED)} excluded but '
+                f'imported, {self.count(OPTIONAL)} optional, {self.count(PLATFORM)} other-platform')
+        if critical:
+            shown = ', '.join(critical[:8]) + (', ...' if len(critical) > 8 else '')
+            text += f' (check: {shown})'
+        return text
+
+    def details(self, limit=10):
+        """Dòng mô tả các entry nghiêm trọng: chuỗi import và cách sửa"""
+        lines = []
+        serious = [module for module in self.modules if module.category in (CRITICAL, EXCLUDED)]
+        for module in serious[:limit]:
+            via = ' -> '.join(module.chain) if module.chain else ', '.join(module.top_level_importers())
+            line = f'  {module.name} ({module.category}): {via}'
+            if module.fix:
+                line += f'; fix: {describe_fix(module.fix)}'
+            lines.append(line)
+        if len(serious) > limit:
+            lines.append(f'  ... {len(serious) - limit} more, see {self.warn_path}')
+        return lines
+
+
+def parse_warn(path):
+    """List MissingModule từ warn-<name>.txt (chưa phân loại)"""
+    modules = []
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            match = WARN_LINE.match(line.rstrip('\n'))
+            if not match:
+                continue
+            status, quoted, plain, importers = match.groups()
+            entries = [(name.strip(), {kind.strip() for kind in kinds.split(',')})
+                       for name, kinds in IMPORTER.findall(importers)]
+            modules.append(MissingModule(quoted or plain, status, entries))
+    return modules
+
+
+class XrefIndex:
+    """Đồ thị import trong xref-<name>.html: loại node, imports và imported by"""
+
+    def __init__(self, path):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            text = f.read()
+        self.types = {}
+        self.files = {}
+        self.imports = {}
+        self.imported_by = {}
+        self.scripts = []
+        for match in XREF_NODE.finditer(text):
+            name, body = _unquote(match.group(1)), match.group(2)
+            node_type = XREF_TYPE.search(body)
+            self.types[name] = node_type.group(1) if node_type else ''
+            source = XREF_FILE.search(body)
+            if source:
+                self.files[name] = source.group(1)
+            if self.types[name] == 'Script':
+                self.scripts.append(name)
+            for section, links in XREF_SECTION.findall(body):
+                target = self.imports if section == 'imports' else self.imported_by
+                target[name] = [_unquote(link) for link in XREF_LINK.findall(links)]
+
+    def is_attribute(self, name):
+        """
+        True nếu name = package.X mà package có trong bundle nhưng không có
+        submodule X: "from package import X" với X là hàm/class, không thiếu gì.
+        """
+        parent, _, leaf = name.rpartition('.')
+        path = self.files.get(parent, '')
+        if self.types.get(parent) != 'Package' or os.path.basename(path) != '__init__.py':
+            return False
+        directory = os.path.dirname(path)
+        try:
+            entries = os.listdir(directory)
+        except OSError:
+            return False
+        return not any(entry == leaf or entry.split('.')[0] == leaf for entry in entries)
+
+    def chain(self, name):
+        """Đường import ngắn nhất từ script tới name, vd. ['app.py', 'IPython', ..., name]"""
+        previous = {name: None}
+        queue = deque([name])
+        while queue:
+            node = queue.popleft()
+            if self.types.get(node) == 'Script' and node != name:
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = previous[node]
+                return path
+            for parent in self.imported_by.get(node, ()):
+                if parent not in previous:
+                    previous[parent] = node
+                    queue.append(parent)
+        return []
+
+
+def _unquote(name):
+    return name[1:-1] if len(name) > 1 and name[0] == name[-1] == "'" else name
+
+
+def load_xref(path):
+    """XrefIndex cache theo (path, mtime, size)"""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _xref_lock:
+        cached = _xref_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    index = XrefIndex(path)
+    with _xref_lock:
+        _xref_cache[path] = (stamp, index)
+    return index
+
+
+def classify(module, platform=None):
+    """Gán module.category theo tên, kiểu import và module import nó"""
+    platform = platform or ('win32' if sys.platform == 'win32' else
+                            'darwin' if sys.platform == 'darwin' else 'linux')
+    top = module.name.split('.')[0]
+    top_level = [name for name in module.top_level_importers()
+                 if not PLATFORM_IMPORTER.search(name) and not name.startswith(VIRTUAL_PREFIXES)]
+    if module.status == 'excluded':
+        module.category = EXCLUDED if top_level and not module.name.startswith(VIRTUAL_PREFIXES) else OPTIONAL
+    elif top in PLATFORM_MODULES[platform] or top in OTHER_PYTHONS:
+        module.category = PLATFORM
+    elif module.name.startswith(VIRTUAL_PREFIXES) or not module.top_level_importers():
+        module.category = OPTIONAL
+    elif not top_level:
+        # Chỉ được import (top-level) bởi module dành cho platform khác
+        module.category = PLATFORM
+    else:
+        module.category = CRITICAL
+
+
+def report_paths(options, workpath=None):
+    build_dir = os.path.join(workpath, options['name']) if workpath else config.build_dir(options)
+    return (os.path.join(build_dir, f'warn-{options["name"]}.txt'),
+            os.path.join(build_dir, f'xref-{options["name"]}.html'))
+
+
+def latest_workpath(options):
+    """Workpath (thường hoặc incremental) có warn file mới nhất của options, None nếu chưa build"""
+    found = []
+    for flag in (False, True):
+        workpath = config.workpath_for(dict(options, incremental=flag))
+        try:
+            found.append((os.path.getmtime(report_paths(options, workpath)[0]), workpath))
+        except OSError:
+            continue
+    return max(found)[1] if found else None
+
+
+def load_report(options, since=None, interpreter=None, workpath=None):
+    """
+    WarnReport của lần build gần nhất, None nếu không có warn file (hoặc
+    file cũ hơn since). Entry nghiêm trọng được gắn chuỗi import và cách sửa.
+    """
+    warn_path, xref_path = report_paths(options, workpath)
+    try:
+        if since is not None and os.path.getmtime(warn_path) < since:
+            return None
+        modules = parse_warn(warn_path)
+    except OSError:
+        return None
+    for module in modules:
+        classify(module)
+
+    xref = None
+    if any(module.category in (CRITICAL, EXCLUDED) for module in modules):
+        try:
+            xref = load_xref(xref_path)
+        except OSError:
+            pass
+    if xref is not None:
+        for module in modules:
+            if module.category == CRITICAL and xref.is_attribute(module.name):
+                module.category = OPTIONAL
+
+    serious = [module for module in modules if module.category in (CRITICAL, EXCLUDED)]
+    if serious:
+        try:
+            installed = module_index.load_index(interpreter)['modules']
+        except (RuntimeError, OSError, ValueError):
+            installed = {}
+        for module in serious:
+            importers = [name for name in module.top_level_importers()
+                         if not PLATFORM_IMPORTER.search(name)]
+            path = xref.chain(importers[0]) if xref is not None and importers else []
+            if path:
+                module.chain = path + [module.name]
+            if module.category == EXCLUDED:
+                module.fix = ('include', module.name)
+            elif module.name.split('.')[0] in installed:
+                module.fix = ('hidden', module.name)
+            elif importers and not os.path.isabs(importers[0]):
+                # Không cài được thì bỏ luôn module cần nó
+                module.fix = ('exclude', importers[0])
+    return WarnReport(warn_path, modules)
+
+
+def apply_fix(options, fix):
+    """Áp dụng một fix vào options (tại chỗ), trả về True nếu options đổi"""
+    action, name = fix
+    if action == 'hidden' and name not in options['hidden_imports']:
+        options['hidden_imports'].append(name)
+    elif action == 'exclude' and name not in options['excludes']:
+        options['excludes'].append(name)
+    elif action == 'include' and name in options['excludes']:
+        options['excludes'].remove(name)
+    else:
+        return False
+    return True
+
+
+def fix_flag(fix):
+    """Option CLI tương ứng với fix, None nếu là bỏ exclude"""
+    action, name = fix
+    return {'hidden': f'--hidden-import {name}', 'exclude': f'--exclude-module {name}'}.get(action)
+
+
+def describe_fix(fix):
+    action, name = fix
+    return {'hidden': f'add hidden import {name}', 'exclude': f'exclude {name}',
+            'include': f'stop excluding {name}'}[action]
@@ -0,0 +1,402 @@
+"""
+Chạy PyInstaller qua Python API (PyInstaller.__main__.run) trong một
+process worker dùng lại được: không qua shell, không khởi động interpreter
+mới cho mỗi build.
+
+Giao thức: mỗi job là một dòng JSON {"args": [...], "cwd": "...",
+"excludes": [...]} (hoặc {"warm": [excludes]}) gửi qua stdin; worker in
+output của PyInstaller ra stdout rồi kết thúc job bằng một dòng bắt đầu
+bằng SENTINEL kèm JSON kết quả.
+
+Worker dựa vào phần nội bộ của PyInstaller (graph cache, hook của
+ModuleGraph, gọi run nhiều lần trong một process) nên chỉ chạy với các
+bản PyInstaller đã thử (TESTED_VERSIONS); bản khác hoặc thiếu các thuộc
+tính đó thì worker báo lỗi và runner chuyển sang backend subprocess.
+
+Worker giữ ấm module graph của base_library: PyInstaller tự cache graph
+đầu tiên nó dựng trong process (depend.analysis._cached_module_graph_) và
+dùng lại cho các build có cùng excludes, bỏ qua vài giây Analysis. Job có
+"shared" (package bên thứ ba của project, xem shared_analysis) thì graph
+cache được dựng sẵn cả các package đó. Pool ưu tiên giao build cho worker
+đã ấm với đúng excludes và package đó.
+"""
+import json
+import os
+import subprocess
+import threading
+
+from pydeloy.cancel import NEW_GROUP, kill_tree
+
+SENTINEL = '\0PYDELOY-DONE '
+READY = '\0PYDELOY-READY '
+
+# [min, max) (major, minor) của PyInstaller mà worker đã được thử
+TESTED_VERSIONS = ((5, 0), (7, 0))
+
+WORKER_SCRIPT = r'''
+import json, os, re, sys, traceback
+from copy import deepcopy
+
+SENTINEL = '\0PYDELOY-DONE '
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def peak_rss():
+    # VmHWM được reset trước mỗi job (clear_refs), ru_maxrss thì không
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    self_peak = int(line.split()[1]) * 1024
+                    break
+            else:
+                self_peak = 0
+    except OSError:
+        self_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else 0
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024 if resource else 0
+    return max(self_peak, children)
+
+def cpu_time():
+    if resource:
+        return sum(u.ru_utime + u.ru_stime for u in (
+            resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)))
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+try:
+    import PyInstaller
+    import PyInstaller.__main__
+    # Import sẵn phần build/analysis để job đầu tiên không phải chờ
+    from PyInstaller.building import build_main
+    from PyInstaller.depend import analysis
+except Exception as e:
+    print('\0PYDELOY-ERROR ' + str(e), flush=True)
+    sys.exit(1)
+
+low, high = (tuple(v) for v in json.loads(sys.argv[1]))
+found = tuple(int(part) for part in re.findall(r'\d+', PyInstaller.__version__)[:2])
+missing = [name for module, name in ((analysis, '_cached_module_graph_'),
+                                     (analysis, 'initialize_modgraph'),
+                                     (build_main, 'discover_hook_directories'))
+           if not hasattr(module, name)]
+if not low <= found < high or missing:
+    print('\0PYDELOY-ERROR PyInstaller %s is not supported by the API worker%s'
+          % (PyInstaller.__version__, ' (missing %s)' % ', '.join(missing) if missing else ''), flush=True)
+    sys.exit(1)
+print('\0PYDELOY-READY ' + PyInstaller.__version__, flush=True)
+
+try:
+    from importlib.metadata import packages_distributions, version
+except ImportError:
+    packages_distributions = None
+
+# [excludes, package, version] của graph cache đã dựng sẵn package dùng chung
+seeded = None
+# key của lần dựng sẵn hỏng gần nhất, để không dựng lại mỗi build
+failed = None
+
+def package_versions(packages):
+    dists = packages_distributions() if packages_distributions else {}
+    versions = {}
+    for name in packages:
+        found = []
+        for dist in dists.get(name, ()):
+            try:
+                found.append(dist + '==' + version(dist))
+            except Exception:
+                pass
+        versions[name] = sorted(found)
+    return versions
+
+# Hook của graph, PyInstaller tự bỏ khỏi bản cache của nó
+HOOK_ATTRS = ('_hooks', '_hooks_pre_safe_import_module', '_hooks_pre_find_module_path')
+
+def seed_graph(excludes, shared):
+    """
+    Dựng graph base_library + các package dùng chung (kèm hidden import của
+    hook) làm cache. False nếu hỏng: khi đó không để lại graph nào trong cache.
+    """
+    print('Seeding shared analysis cache: ' + ', '.join(shared), flush=True)
+    analysis._cached_module_graph_ = None
+    # Cùng thư mục hook với Analysis, để excludedimports của hook contrib có hiệu lực
+    graph = analysis.initialize_modgraph(excludes=list(excludes),
+                                         user_hook_dirs=build_main.discover_hook_directories())
+    for name in shared:
+        try:
+            graph.import_hook(name)
+        except ImportError:
+            pass
+    try:
+        graph.process_post_graph_hooks(None)
+    except Exception as e:
+        # Graph dở dang (hook chạy một nửa) không được dùng làm cache
+        print('Shared analysis: hook failed while seeding, building without it: %r' % e, flush=True)
+        return False
+    if not all(hasattr(graph, name) for name in HOOK_ATTRS):
+        # Không biết bỏ hook khỏi graph thế nào: build dựng graph như bình thường
+        print('Shared analysis: unsupported module graph, not seeding', flush=True)
+        return False
+    cached = deepcopy(graph)
+    for name in HOOK_ATTRS:
+        setattr(cached, name, None)
+    analysis._cached_module_graph_ = cached
+    return True
+
+def use_graph_cache(excludes, shared=()):
+    """
+    PyInstaller chỉ cache graph đầu tiên: bỏ cache nếu excludes khác để build
+    này cache lại; có shared thì dựng lại cache khi package hoặc version đổi.
+    """
+    global seeded, failed
+    if shared:
+        key = [list(excludes), list(shared), package_versions(shared)]
+        if key == seeded and analysis._cached_module_graph_ is not None:
+            return
+        if key != failed:
+            seeded = None
+            try:
+                ok = seed_graph(excludes, shared)
+            except Exception as e:
+                print('Shared analysis: seeding failed, building without it: %r' % e, flush=True)
+                ok = False
+            if ok:
+                seeded = key
+                return
+            failed = key
+            analysis._cached_module_graph_ = None
+        # Dựng sẵn hỏng: dùng cache như build không có shared
+    cached = analysis._cached_module_graph_
+    # PyInstaller lưu excludes rỗng dạng tuple, còn lại dạng list
+    if cached is not None and list(cached._excludes) != list(excludes) + ['__main__']:
+        analysis._cached_module_graph_ = None
+        seeded = None
+
+for line in sys.stdin:
+    job = json.loads(line)
+    if 'warm' in job:
+        code = 0
+        try:
+            use_graph_cache(job['warm'], job.get('shared') or ())
+            analysis.initialize_modgraph(excludes=list(job['warm']))
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        sys.stderr.flush()
+        print(SENTINEL + json.dumps({'returncode': code, 'cpu': 0, 'peak_rss': 0}), flush=True)
+        continue
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+    cpu_start = cpu_time()
+    code = 0
+    try:
+        if job['cwd']:
+            os.chdir(job['cwd'])
+        if job.get('excludes') is not None:
+            use_graph_cache(job['excludes'], job.get('shared') or ())
+        PyInstaller.__main__.run(job['args'])
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            code = e.code
+        elif e.code:
+            print(e.code, flush=True)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    sys.stderr.flush()
+    result = {'returncode': code, 'cpu': cpu_time() - cpu_start, 'peak_rss': peak_rss()}
+    print(SENTINEL + json.dumps(result), flush=True)
+'''
+
+
+class WorkerError(Exception):
+    """Không khởi động được worker (vd. interpreter không có PyInstaller)"""
+
+
+class PyInstallerWorker:
+    """Một process Python đã import PyInstaller, chạy lần lượt từng build"""
+
+    def __init__(self, interpreter=None):
+        if interpreter is None:
+            from pydeloy.module_index import default_interpreter
+            interpreter = default_interpreter()
+        self.interpreter = interpreter
+        self.version = None
+        # excludes và package dùng chung của module graph đang được cache
+        # trong worker (None: chưa có)
+        self.warm_excludes = None
+        self.warm_shared = None
+        self.proc = None
+        self._lock = threading.Lock()
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def start(self):
+        env = dict(os.environ, PYTHONIOENCODING='utf-8', PYTHONUNBUFFERED='1')
+        self.proc = subprocess.Popen(
+            [self.interpreter, '-u', '-c', WORKER_SCRIPT, json.dumps(TESTED_VERSIONS)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            encoding='utf-8', errors='replace', bufsize=1, env=env, **NEW_GROUP)
+        first = self.proc.stdout.readline()
+        if not first.startswith(READY):
+            self.close()
+            raise WorkerError(first.lstrip('\0').strip() or f'{self.interpreter} exited')
+        self.version = first[len(READY):].strip()
+        self.warm_excludes = None
+        self.warm_shared = None
+
+    def _send(self, job, on_line):
+        if not self.alive():
+            self.start()
+        self.proc.stdin.write(json.dumps(job) + '\n')
+        self.proc.stdin.flush()
+        for line in self.proc.stdout:
+            if line.startswith(SENTINEL):
+                result = json.loads(line[len(SENTINEL):])
+                return result['returncode'], result['peak_rss'], result['cpu']
+            on_line(line)
+        # Worker chết giữa chừng (crash, bị kill): lần sau sẽ khởi động lại
+        returncode = self.proc.wait()
+        self.proc = None
+        return returncode or 1, 0, 0.0
+
+    def warm(self, excludes=(), shared=()):
+        """Dựng sẵn và cache module graph base_library (và package dùng chung) cho bộ excludes này"""
+        with self._lock:
+            returncode, _, _ = self._send({'warm': list(excludes), 'shared': list(shared)},
+                                          lambda line: None)
+            if returncode == 0:
+                self._mark_warm(excludes, shared)
+            return returncode == 0
+
+    def run(self, args, cwd, on_line, excludes=None, shared=()):
+        """
+        Chạy một build, gọi on_line cho từng dòng output. excludes (theo đúng
+        thứ tự trong args) cho phép dùng lại module graph đã cache, shared là
+        các package bên thứ ba được dựng sẵn trong graph đó.
+        Trả về (returncode, peak_rss, cpu).
+        """
+        with self._lock:
+            job = {'args': list(args), 'cwd': cwd,
+                   'excludes': list(excludes) if excludes is not None else None,
+                   'shared': list(shared)}
+            result = self._send(job, on_line)
+            if excludes is not None and result[0] == 0 and self.alive():
+                self._mark_warm(excludes, shared)
+            return result
+
+    def _mark_warm(self, excludes, shared):
+        # Build không có shared vẫn dùng lại graph đã dựng package nếu cùng excludes
+        if shared or self.warm_excludes != list(excludes):
+            self.warm_shared = list(shared) or None
+        self.warm_excludes = list(excludes)
+
+    def kill(self):
+        """Kill worker và mọi process con (huỷ build đang chạy); an toàn từ thread khác"""
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            kill_tree(proc.pid)
+
+    def close(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(5)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+
+# Số worker rảnh tối đa được giữ lại, worker thừa bị đóng
+MAX_IDLE = max(2, os.cpu_count() or 1)
+
+_idle = []
+_idle_lock = threading.Lock()
+# {(tuple(excludes), tuple(shared)): Event} của các worker đang được prestart làm ấm
+_warming = {}
+
+
+def acquire(excludes=None, shared=()):
+    """
+    Lấy một worker rảnh: ưu tiên worker đã ấm với đúng excludes và package
+    dùng chung, rồi đúng excludes, rồi worker chưa dựng graph nào, rồi bất
+    kỳ; không có thì khởi động worker mới.
+    """
+    if excludes is not None:
+        with _idle_lock:
+            warming = _warming.get((tuple(excludes), tuple(shared)))
+        if warming:
+            # Chờ worker đang dựng graph cho đúng excludes này nhanh hơn dựng lại từ đầu
+            warming.wait()
+    with _idle_lock:
+        _idle[:] = [w for w in _idle if w.alive()]
+        ranked = sorted(_idle, key=lambda w: (
+            0 if excludes is not None and w.warm_excludes == list(excludes)
+            and (w.warm_shared or []) == list(shared) else
+            1 if excludes is not None and w.warm_excludes == list(excludes) else
+            2 if w.warm_excludes is None else 3))
+        if ranked:
+            _idle.remove(ranked[0])
+            return ranked[0]
+    worker = PyInstallerWorker()
+    worker.start()
+    return worker
+
+
+def release(worker):
+    """Trả worker về để build sau dùng lại"""
+    if not worker.alive():
+        return
+    with _idle_lock:
+        _idle.append(worker)
+        extra = _idle[:-MAX_IDLE] if len(_idle) > MAX_IDLE else []
+        del _idle[:len(extra)]
+    for old in extra:
+        old.close()
+
+
+def prestart(excludes=(), count=1, shared=()):
+    """
+    Khởi động và làm ấm count worker trong nền (không chặn), để build kế
+    tiếp với excludes này không phải chờ interpreter, import và base graph
+    (cùng graph của các package dùng chung shared).
+    """
+    key = (tuple(excludes), tuple(shared))
+
+    def start():
+        with _idle_lock:
+            ready = sum(1 for w in _idle if w.warm_excludes == list(excludes)
+                        and (w.warm_shared or []) == list(shared))
+            if key in _warming or ready >= count:
+                return
+            _warming[key] = threading.Event()
+        try:
+            for _ in range(count - ready):
+                worker = PyInstallerWorker()
+                worker.start()
+                worker.warm(excludes, shared)
+                release(worker)
+        except (WorkerError, OSError):
+            pass
+        finally:
+            with _idle_lock:
+                _warming.pop(key).set()
+
+    thread = threading.Thread(target=start, daemon=True)
+    thread.start()
+    return thread
+
+
+def shutdown():
+    with _idle_lock:
+        workers, _idle[:] = list(_idle), []
+    for worker in workers:
+        worker.close()
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from pydeloy import build_cache, config
+
+
+@pytest.fixture(autouse=True)
+def toolchain(monkeypatch):
+    monkeypatch.setattr(build_cache, 'pyinstaller_toolchain', lambda backend='subprocess': ('python', '6.3.0'))
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / 'app.py').write_text('import helper\n')
+    (tmp_path / 'helper.py').write_text('import deep\n')
+    (tmp_path / 'deep.py').write_text('VALUE = 1\n')
+    return tmp_path
+
+
+def fake_build(options):
+    """Tạo artifact như PyInstaller để store/lookup có cái mà kiểm tra"""
+    artifact = build_cache.artifact_path(options)
+    os.makedirs(os.path.dirname(artifact), exist_ok=True)
+    with open(artifact, 'w') as f:
+        f.write('exe')
+    if not options['onefile']:
+        with open(os.path.join(os.path.dirname(artifact), 'lib.so'), 'w') as f:
+            f.write('lib')
+    return artifact
+
+
+def test_key_changes_with_a_transitively_imported_module(project):
+    options = config.make_options(str(project / 'app.py'))
+    key = build_cache.compute_key(options)
+    (project / 'deep.py').write_text('VALUE = 2\n')
+    assert build_cache.compute_key(options) != key
+
+
+@pytest.mark.parametrize('option, value', [
+    ('clean', False), ('cache', False), ('backend', 'api'), ('timeout', 60), ('shared_analysis', False)])
+def test_ignored_options_keep_the_key(project, option, value):
+    options = config.make_options(str(project / 'app.py'))
+    assert build_cache.compute_key(dict(options, **{option: value})) == build_cache.compute_key(options)
+
+
+def test_output_options_change_the_key(project):
+    options = config.make_options(str(project / 'app.py'))
+    assert build_cache.compute_key(dict(options, noconsole=True)) != build_cache.compute_key(options)
+
+
+def test_hit_is_rejected_when_the_artifact_is_gone(project):
+    options = config.make_options(str(project / 'app.py'))
+    key = build_cache.compute_key(options)
+    artifact = fake_build(options)
+    build_cache.store(options, key)
+    assert build_cache.lookup(options, key) == artifact
+    os.remove(artifact)
+    assert build_cache.lookup(options, key) is None
+
+
+def test_onedir_hit_checks_the_whole_collect_directory(project):
+    options = config.make_options(str(project / 'app.py'), onefile=False)
+    key = build_cache.compute_key(options)
+    artifact = fake_build(options)
+    build_cache.store(options, key)
+    assert build_cache.lookup(options, key) == artifact
+    (project / 'dist' / 'app' / 'lib.so').unlink()
+    assert build_cache.lookup(options, key) is None
@@ -0,0 +1,72 @@
+from pydeloy.build_phases import BuildLogParser
+
+LOG = '''\
+100 INFO: PyInstaller: 6.3.0, contrib hooks: 2024.0
+110 INFO: Python: 3.11.7
+300 INFO: Initializing module dependency graph...
+400 INFO: Analyzing modules for base_library.zip ...
+900 INFO: Processing standard module hook 'hook-encodings.py'
+950 INFO: Processing pre-safe import module hook six.moves
+1000 INFO: Analyzing /src/app.py
+1200 INFO: Analyzing hidden import 'yaml'
+1300 WARNING: Hidden import "yaml" not found!
+2000 INFO: Processing module hooks (post-graph stage)...
+2100 INFO: Including run-time hook 'pyi_rth_inspect.py'
+2500 INFO: Looking for dynamic libraries
+3000 INFO: Warnings written to /src/build/app/warn-app.txt
+3100 INFO: checking PYZ
+3150 INFO: Building PYZ because PYZ-00.toc is non existent
+3150 INFO: Building PYZ (ZlibArchive) /src/build/app/PYZ-00.pyz
+3600 INFO: Building PYZ (ZlibArchive) /src/build/app/PYZ-00.pyz completed successfully.
+3610 INFO: checking PKG
+4200 INFO: Building PKG (CArchive) app.pkg completed successfully.
+4210 INFO: checking EXE
+4600 INFO: Building EXE from EXE-00.toc completed successfully.
+'''
+
+
+def feed(lines):
+    parser = BuildLogParser()
+    progress = []
+    for line in lines:
+        if parser.feed(line):
+            progress.append(parser.progress)
+    return parser, progress
+
+
+def test_phases_and_durations():
+    parser, progress = feed(LOG.splitlines())
+    assert parser.phase == 'EXE'
+    assert parser.rebuilt == {'PYZ'}
+    assert parser.durations() == [('Setup', 3.0), ('PYZ', 0.51), ('PKG', 0.6), ('EXE', 0.39)]
+    # Progress chỉ tăng và dừng ở cuối giai đoạn EXE
+    assert progress == sorted(progress)
+    assert parser.progress == 95
+
+
+def test_counters():
+    parser, _ = feed(LOG.splitlines())
+    assert parser.counters == {'hooks': 2, 'runtime_hooks': 1, 'hidden_imports': 1,
+                               'warnings': 1, 'errors': 0}
+    assert parser.summary().splitlines()[1] == \
+        'Module graph: 2 hooks, 1 run-time hooks, 1 hidden imports, 1 warnings'
+
+
+def test_analysis_phase_steps():
+    parser, _ = feed(['0 INFO: checking Analysis',
+                      '10 INFO: Initializing module dependency graph...',
+                      '20 INFO: Analyzing /src/app.py'])
+    assert parser.phase == 'Analysis'
+    assert parser.progress == 30
+
+
+def test_repeated_phase_accumulates():
+    parser, _ = feed(['0 INFO: checking PYZ', '100 INFO: checking PKG',
+                      '150 INFO: checking PYZ', '350 INFO: checking PKG', '400 INFO: done'])
+    assert dict(parser.durations()) == {'Setup': 0.0, 'PYZ': 0.3, 'PKG': 0.1}
+
+
+def test_ignores_lines_without_timestamp():
+    parser, progress = feed(['Traceback (most recent call last):', '  File "x.py"'])
+    assert parser.phase is None
+    assert progress == []
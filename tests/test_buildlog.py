@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from pydeloy import buildlog
+
+
+@pytest.fixture
+def log_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(buildlog, 'LOG_DIR', str(tmp_path))
+    monkeypatch.setattr(buildlog, 'KEEP_LOGS', 3)
+    return tmp_path
+
+
+def write_log(log_dir, name, mtime):
+    path = log_dir / f'{name}.log'
+    path.write_text('')
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_oldest_logs_are_pruned(log_dir):
+    for i in range(5):
+        write_log(log_dir, f'old{i}', 1000 + i)
+    buildlog.new_log_path('app')
+    assert sorted(p.name for p in log_dir.iterdir()) == ['old3.log', 'old4.log']
+
+
+def test_logs_newer_than_a_running_build_are_kept(log_dir):
+    for i in range(2):
+        write_log(log_dir, f'old{i}', 1000 + i)
+    running = buildlog.open_log(str(log_dir / 'running.log'))
+    try:
+        for i in range(4):
+            write_log(log_dir, f'new{i}', 4000000000 + i)
+        buildlog.new_log_path('app')
+        names = sorted(p.name for p in log_dir.iterdir())
+    finally:
+        buildlog.close_log(running)
+    assert names == ['new0.log', 'new1.log', 'new2.log', 'new3.log', 'running.log']
+    buildlog.new_log_path('app')
+    assert len(list(log_dir.iterdir())) == 2
+
+
+def test_log_removed_during_pruning_is_skipped(log_dir, monkeypatch):
+    for i in range(5):
+        write_log(log_dir, f'old{i}', 1000 + i)
+    real_getmtime = os.path.getmtime
+
+    def getmtime(path):
+        if path.endswith('old0.log'):
+            raise FileNotFoundError(path)
+        return real_getmtime(path)
+
+    monkeypatch.setattr(os.path, 'getmtime', getmtime)
+    buildlog.new_log_path('app')
+    assert not (log_dir / 'old1.log').exists()
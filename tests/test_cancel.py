@@ -0,0 +1,47 @@
+import threading
+
+from pydeloy.cancel import USER_CANCEL, CancelToken
+
+
+def test_callbacks_run_once_on_cancel():
+    token = CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append('kill'))
+    token.cancel()
+    token.cancel('timeout after 5 s')
+    assert calls == ['kill']
+    assert token.cancelled
+    # Lý do của lần huỷ đầu được giữ
+    assert token.reason == USER_CANCEL
+
+
+def test_callback_registered_after_cancel_runs_immediately():
+    token = CancelToken()
+    token.cancel('timeout after 5 s')
+    calls = []
+    token.on_cancel(lambda: calls.append('kill'))
+    assert calls == ['kill']
+
+
+def test_removed_callback_is_not_called():
+    token = CancelToken()
+    calls = []
+    callback = lambda: calls.append('kill')
+    token.on_cancel(callback)
+    token.remove(callback)
+    # Gỡ callback chưa đăng ký không lỗi
+    token.remove(callback)
+    token.cancel()
+    assert calls == []
+
+
+def test_concurrent_cancel_runs_callbacks_once():
+    token = CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append('kill'))
+    threads = [threading.Thread(target=token.cancel) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ['kill']
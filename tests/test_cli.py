@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from pydeloy import cli, config, module_index, spec_file
+
+
+def parse(argv):
+    return cli.build_parser().parse_args(['build'] + argv)
+
+
+def write_config(tmp_path, data):
+    path = tmp_path / 'builds.json'
+    path.write_text(json.dumps(data), encoding='utf-8')
+    return str(path)
+
+
+def test_overrides_are_copied_for_every_build(tmp_path, monkeypatch):
+    for name in ('a', 'b'):
+        (tmp_path / f'{name}.py').write_text('import json\n', encoding='utf-8')
+    path = write_config(tmp_path, [{'script': 'a.py'}, {'script': 'b.py'}])
+    candidates = {'a.py': [('big_a', 'site', 100)], 'b.py': [('big_b', 'site', 100)]}
+    monkeypatch.setattr(module_index, 'propose_excludes',
+                        lambda script, roots: (candidates[script.rsplit('/', 1)[-1]], {}))
+
+    builds = cli.collect_builds(parse(['--config', path, '--exclude-module', 'tkinter',
+                                       '--hidden-import', 'yaml']))
+    assert builds[0]['excludes'] is not builds[1]['excludes']
+    for options in builds:
+        cli.auto_exclude(options)
+    builds[0]['hidden_imports'] += ['only_a']
+
+    assert 'big_a' in builds[0]['excludes'] and 'big_b' not in builds[0]['excludes']
+    assert 'big_b' in builds[1]['excludes'] and 'big_a' not in builds[1]['excludes']
+    assert builds[1]['hidden_imports'] == ['yaml']
+
+
+def test_config_relative_paths_and_defaults(tmp_path):
+    path = write_config(tmp_path, {'defaults': {'onefile': False},
+                                   'builds': [{'script': 'src/app.py', 'name': 'tool'}]})
+    (options,) = cli.collect_builds(parse(['--config', path]))
+    assert options['script'] == str(tmp_path / 'src' / 'app.py')
+    assert options['name'] == 'tool'
+    assert options['onefile'] is False
+
+
+@pytest.mark.parametrize('content, message', [
+    (None, 'No such file or directory'),
+    ('{bad', 'Expecting property name'),
+    ('{"name": "x"}', "missing 'script'"),
+    ('{"script": "a.py", "foo": 1}', 'Unknown option(s): foo'),
+])
+def test_bad_config_exits_with_one_line_error(tmp_path, content, message):
+    path = tmp_path / 'builds.json'
+    if content is not None:
+        path.write_text(content, encoding='utf-8')
+    with pytest.raises(SystemExit) as exc:
+        cli.collect_builds(parse(['--config', str(path)]))
+    assert str(exc.value).startswith(f'error: {path}: ')
+    assert message in str(exc.value)
+
+
+def test_name_needs_a_single_script(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.collect_builds(parse([str(tmp_path / 'a.py'), str(tmp_path / 'b.py'), '--name', 'x']))
+
+
+def test_parallel_builds_of_the_same_name_get_their_own_workpath(tmp_path):
+    script = str(tmp_path / 'app.py')
+    builds = [config.make_options(script, incremental=True),
+              config.make_options(script, onefile=False, incremental=True),
+              config.make_options(str(tmp_path / 'cli.py'))]
+    jobs = cli.build_workpaths(builds)
+    workpaths = [workpath for _, workpath in jobs]
+    assert workpaths == [str(tmp_path / 'build' / 'app'), str(tmp_path / 'build' / 'app-2'),
+                         str(tmp_path / 'build' / 'cli')]
+    # Chỉ job đầu giữ state incremental của build/app
+    assert [options['incremental'] for options, _ in jobs] == [True, False, False]
+    assert f'--workpath={workpaths[1]}' in spec_file.pyinstaller_args(jobs[1][0], workpaths[1])
@@ -0,0 +1,41 @@
+import pytest
+
+from pydeloy import command_model
+
+
+def apply(old, diff):
+    start, removed, inserted = diff
+    return old[:start] + inserted + old[start + removed:]
+
+
+@pytest.mark.parametrize('old, new', [
+    ('pyinstaller a.py', 'pyinstaller --onefile a.py'),
+    ('pyinstaller --onefile a.py', 'pyinstaller a.py'),
+    ('abc', 'xyz'),
+    ('', 'pyinstaller a.py'),
+    ('aaaa', 'aa'),
+])
+def test_text_diff_turns_old_into_new(old, new):
+    assert apply(old, command_model.text_diff(old, new)) == new
+
+
+def test_text_diff_of_equal_texts_is_none():
+    assert command_model.text_diff('same', 'same') is None
+
+
+def test_utf16_diff_counts_astral_characters_twice():
+    old = "--name='\U0001F680app' --onefile"
+    new = "--name='\U0001F680app' --onedir"
+    start, removed, inserted = command_model.utf16_diff(old, command_model.text_diff(old, new))
+    # Sau khi mã hoá UTF-16, 🚀 chiếm 2 đơn vị
+    prefix = old[:old.index('--onefile') + len('--one')]
+    assert start == len(prefix) + 1
+    assert removed == len('file')
+    assert inserted == 'dir'
+
+
+def test_model_memoizes_by_options():
+    model = command_model.CommandModel(build=lambda options: ' '.join(sorted(options)))
+    assert model.update({'script': 'a.py'}) == ('script', command_model.text_diff('', 'script'))
+    assert model.update({'script': 'a.py'}) == ('script', None)
+    assert model.builds == 1
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from pydeloy import config
+
+
+def test_make_options_copies_lists_and_names_the_build(tmp_path):
+    hidden = ['requests']
+    options = config.make_options(str(tmp_path / 'tool.py'), hidden_imports=hidden)
+    options['hidden_imports'].append('yaml')
+    assert hidden == ['requests']
+    assert options['name'] == 'tool'
+    assert config.make_options(str(tmp_path / 'tool.py'))['excludes'] is not config.DEFAULT_OPTIONS['excludes']
+
+
+def test_make_options_rejects_unknown_keys(tmp_path):
+    with pytest.raises(ValueError, match='onefle'):
+        config.make_options(str(tmp_path / 'app.py'), onefle=True)
+
+
+def test_build_args(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'), noconsole=True, gui='PyQt5',
+                                  hidden_imports=['requests'], excludes=['tkinter'],
+                                  datas=[['assets', 'assets']])
+    args = config.build_args(options)
+    assert args[:3] == ['--clean', '-y', '--onefile']
+    assert '--noconsole' in args
+    assert f'--workpath={tmp_path / "build"}' in args
+    assert f'--distpath={tmp_path / "dist"}' in args
+    assert '--hidden-import=requests' in args
+    assert '--hidden-import=' + config.get_gui_imports('PyQt5')[0] in args
+    assert '--exclude-module=tkinter' in args
+    assert f'--add-data=assets{os.pathsep}assets' in args
+    assert args[-1] == options['script']
+
+
+def test_build_args_uses_the_given_workpath_unless_incremental(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'))
+    assert f'--workpath={tmp_path / "w"}' in config.build_args(options, str(tmp_path / 'w'))
+    options['incremental'] = True
+    assert f'--workpath={tmp_path / "build" / "app"}' in config.build_args(options, str(tmp_path / 'w'))
+
+
+@pytest.mark.parametrize('text, pair', [
+    ('assets:data', ['assets', 'data']),
+    ('assets', ['assets', '.']),
+    ('assets:', ['assets', '.']),
+    ('C:\\data.txt', ['C:\\data.txt', '.']),
+    ('C:\\data.txt:data', ['C:\\data.txt', 'data']),
+])
+def test_parse_pair(text, pair):
+    assert config.parse_pair(text) == pair
+
+
+def test_parse_and_format_pairs_round_trip():
+    pairs = config.parse_pairs('a.txt:data, b.dll:.')
+    assert pairs == [['a.txt', 'data'], ['b.dll', '.']]
+    assert config.format_pairs(pairs) == 'a.txt:data, b.dll:.'
+
+
+def test_detect_excludes_skips_used_modules_and_limits_candidates():
+    used = {config.COMMON_EXCLUDES[0]}
+    candidates = [(f'pkg{i}', 0, '') for i in range(5)]
+    excludes = config.detect_excludes({}, used, candidates, limit=2)
+    assert config.COMMON_EXCLUDES[0] not in excludes
+    assert excludes[-2:] == ['pkg0', 'pkg1']
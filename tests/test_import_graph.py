@@ -0,0 +1,70 @@
+import textwrap
+
+from pydeloy import import_graph
+
+
+def write(root, files):
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(source), encoding='utf-8')
+
+
+def test_parse_imports_marks_guarded_imports_optional(tmp_path):
+    write(tmp_path, {'app.py': '''
+        import os
+        from json import dumps
+        try:
+            import yaml
+        except ImportError:
+            yaml = None
+        def later():
+            import csv
+        importlib.import_module('plugins.csv_plugin')
+    '''})
+    records = {name: (level, names, optional)
+               for name, level, names, optional in import_graph.parse_imports(tmp_path / 'app.py')}
+    assert records['os'] == (0, (), False)
+    assert records['json'] == (0, ('dumps',), False)
+    assert records['yaml'][2] is True
+    assert records['csv'][2] is True
+    assert records['plugins.csv_plugin'] == (0, (), False)
+
+
+def test_analyze_follows_relative_imports(tmp_path):
+    write(tmp_path, {
+        'app.py': 'import pkg.sub.mod\n',
+        'pkg/__init__.py': 'from . import helpers\n',
+        'pkg/helpers.py': 'import json\n',
+        'pkg/sub/__init__.py': '',
+        'pkg/sub/mod.py': 'from ..helpers import load\nfrom .sibling import x\n',
+        'pkg/sub/sibling.py': 'x = 1\n',
+    })
+    graph = import_graph.analyze(str(tmp_path / 'app.py'))
+    assert {'pkg', 'pkg.helpers', 'pkg.sub', 'pkg.sub.mod', 'pkg.sub.sibling', 'json'} <= graph.imports
+    assert sorted(graph.files.values()) == ['app', 'pkg', 'pkg.helpers', 'pkg.sub', 'pkg.sub.mod',
+                                            'pkg.sub.sibling']
+
+
+def test_relative_import_beyond_top_level_package_is_skipped(tmp_path):
+    write(tmp_path, {
+        'app.py': 'import pkg.mod\n',
+        'pkg/__init__.py': '',
+        'pkg/mod.py': 'from ..unrelated import y\nfrom .. import other\n',
+        'unrelated.py': 'y = 1\n',
+        'other.py': '',
+    })
+    graph = import_graph.analyze(str(tmp_path / 'app.py'))
+    assert 'unrelated' not in graph.imports
+    assert 'other' not in graph.imports
+    assert str(tmp_path / 'unrelated.py') not in graph.files
+
+
+def test_relative_import_from_package_init(tmp_path):
+    write(tmp_path, {
+        'app.py': 'import pkg\n',
+        'pkg/__init__.py': 'from .core import run\n',
+        'pkg/core.py': '',
+    })
+    graph = import_graph.analyze(str(tmp_path / 'app.py'))
+    assert 'pkg.core' in graph.imports
@@ -0,0 +1,60 @@
+import sys
+import textwrap
+
+from pydeloy import config, import_trace
+from pydeloy.import_trace import TracedModule, TraceResult
+
+
+def test_read_trace_skips_truncated_last_line(tmp_path):
+    path = tmp_path / 'trace.txt'
+    path.write_text("['builtins', 'sys']\n"
+                    "('json', '__main__', 'import', '/usr/lib/python3/json/__init__.py')\n"
+                    "('plugins.csv', 'app.loader', 'dynamic', None)\n"
+                    "('half', '__ma", encoding='utf-8')
+    modules, preloaded = import_trace._read_trace(str(path))
+    assert preloaded == {'builtins', 'sys'}
+    assert [(m.name, m.importer, m.how) for m in modules] == [
+        ('json', '__main__', 'import'), ('plugins.csv', 'app.loader', 'dynamic')]
+
+
+def test_read_trace_missing_file(tmp_path):
+    assert import_trace._read_trace(str(tmp_path / 'none.txt')) == ([], set())
+
+
+def test_extension_module():
+    assert import_trace.extension_module(
+        'numpy/core/_multiarray_umath.cpython-311-x86_64-linux-gnu.so') == 'numpy.core._multiarray_umath'
+    assert import_trace.extension_module(
+        'python3.11/lib-dynload/zlib.cpython-311-x86_64-linux-gnu.so') == 'zlib'
+    assert import_trace.extension_module('PIL\\_imaging.cp311-win_amd64.pyd') == 'PIL._imaging'
+
+
+def test_missing_modules_and_suggestions():
+    result = TraceResult([
+        TracedModule('__main__', None, 'import', None),
+        TracedModule('json', '__main__', 'import', None),
+        TracedModule('plugins', 'app', 'dynamic', None),
+        TracedModule('plugins.csv', 'plugins', 'dynamic', None),
+        TracedModule('csv', 'plugins.csv', 'import', None),
+        TracedModule('yaml', 'app', 'dynamic', None),
+        TracedModule('tkinter', 'app', 'dynamic', None),
+        TracedModule('sys', None, 'import', None),
+    ], {'sys'}, 0, '', 0.1)
+    missing = import_trace.missing_modules(result, {'json'})
+    assert [m.name for m in missing] == ['plugins', 'plugins.csv', 'csv', 'yaml', 'tkinter']
+    options = config.make_options('app.py', excludes=['tkinter'], hidden_imports=['yaml'])
+    # csv được plugins.csv import tĩnh, plugins là package cha của plugins.csv
+    assert import_trace.suggest_hidden_imports(missing, options) == ['plugins.csv']
+
+
+def test_trace_imports_records_dynamic_imports(tmp_path):
+    (tmp_path / 'plugin_mod.py').write_text('VALUE = 1\n', encoding='utf-8')
+    script = tmp_path / 'app.py'
+    script.write_text(textwrap.dedent('''
+        import importlib
+        importlib.import_module('plugin_mod')
+    '''), encoding='utf-8')
+    result = import_trace.trace_imports(str(script), timeout=30, interpreter=sys.executable)
+    assert result.returncode == 0, result.output
+    traced = {module.name: module for module in result.modules}
+    assert traced['plugin_mod'].how == 'dynamic'
@@ -0,0 +1,50 @@
+import pytest
+
+from pydeloy import config, incremental, runner
+
+
+@pytest.fixture
+def toolchain(monkeypatch):
+    current = {'info': ('/usr/bin/python3', '6.3.0')}
+    monkeypatch.setattr(incremental, 'pyinstaller_toolchain', lambda backend: current['info'])
+    return current
+
+
+def test_needs_clean_until_state_matches_the_toolchain(tmp_path, toolchain):
+    options = config.make_options(str(tmp_path / 'app.py'), incremental=True)
+    assert incremental.needs_clean(options)
+    incremental.save_state(options)
+    assert not incremental.needs_clean(options)
+    toolchain['info'] = ('/usr/bin/python3', '6.4.0')
+    assert incremental.needs_clean(options)
+
+
+def test_excludes_change_needs_clean(tmp_path, toolchain):
+    options = config.make_options(str(tmp_path / 'app.py'), incremental=True)
+    incremental.save_state(options)
+    assert incremental.needs_clean(dict(options, excludes=['tkinter']))
+
+
+def test_preview_args_do_not_probe_the_toolchain(tmp_path, monkeypatch):
+    def probe(backend):
+        raise AssertionError('build_args must not ask the interpreter')
+
+    monkeypatch.setattr(incremental, 'pyinstaller_toolchain', probe)
+    options = config.make_options(str(tmp_path / 'app.py'), incremental=True)
+    args = config.build_args(options)
+    assert '--clean' not in args
+    assert f'--workpath={tmp_path / "build" / "app"}' in args
+
+
+def test_run_build_adds_clean_only_when_needed(tmp_path, toolchain, monkeypatch):
+    seen = []
+    monkeypatch.setattr(runner, 'run_subprocess',
+                        lambda args, cwd, on_line, cancel=None, toolchain=None: seen.append(args) or (0, 0, 0.0))
+    monkeypatch.setattr(runner, 'record_history', lambda *args: [])
+    options = config.make_options(str(tmp_path / 'app.py'), incremental=True, cache=False)
+    args = config.build_args(options)
+    for _ in range(2):
+        success, _ = runner.run_build(args, options, on_output=lambda line: None)
+        assert success
+    assert seen[0][0] == '--clean'
+    assert '--clean' not in seen[1]
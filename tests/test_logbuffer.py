@@ -0,0 +1,33 @@
+import threading
+
+from pydeloy.logbuffer import LogBuffer
+
+
+def test_drain_returns_lines_in_order_and_empties_the_buffer():
+    buffer = LogBuffer()
+    buffer.write('one')
+    buffer.writer('[app] ')('two')
+    assert buffer.drain() == ['one', '[app] two']
+    assert buffer.drain() == []
+
+
+def test_concurrent_writers_lose_no_lines():
+    buffer = LogBuffer()
+    drained = []
+
+    def write(name):
+        write_line = buffer.writer(f'[{name}] ')
+        for i in range(1000):
+            write_line(str(i))
+
+    threads = [threading.Thread(target=write, args=(name,)) for name in 'abcd']
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        drained += buffer.drain()
+    for thread in threads:
+        thread.join()
+    drained += buffer.drain()
+    assert len(drained) == 4000
+    # Thứ tự trong từng writer được giữ
+    assert [line for line in drained if line.startswith('[a] ')] == [f'[a] {i}' for i in range(1000)]
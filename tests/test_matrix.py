@@ -0,0 +1,65 @@
+from pydeloy import build_cache, config, matrix
+from pydeloy.toolchains import Toolchain
+
+PY311 = Toolchain('py311', '/usr/bin/python3.11', python='3.11.9', pyinstaller='6.3.0')
+PY312 = Toolchain('py312', '/usr/bin/python3.12', python='3.12.4', pyinstaller='6.10.0')
+
+
+def arg(args, flag):
+    return next(a[len(flag) + 1:] for a in args if a.startswith(flag + '='))
+
+
+def test_each_toolchain_builds_into_its_own_paths(tmp_path):
+    options = matrix.matrix_options(config.make_options(str(tmp_path / 'app.py'), datas=[['assets', '.']],
+                                                        icon='app.ico'))
+    first, second = (matrix.build_args(options, toolchain) for toolchain in (PY311, PY312))
+    assert arg(first, '--workpath') == str(tmp_path / 'build' / 'matrix' / 'py311')
+    assert arg(second, '--distpath') == str(tmp_path / 'dist' / 'matrix' / 'py312')
+    assert arg(first, '--specpath') != arg(second, '--specpath')
+    # specpath không còn là thư mục script nên đường dẫn tương đối phải thành tuyệt đối
+    assert arg(first, '--add-data').startswith(str(tmp_path / 'assets'))
+    assert arg(first, '--icon') == str(tmp_path / 'app.ico')
+
+
+def test_matrix_options_force_clean_uncached_builds(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'), incremental=True, cache=True, clean=False)
+    options = matrix.matrix_options(options)
+    assert (options['clean'], options['incremental'], options['cache']) == (True, False, False)
+    assert '--clean' in matrix.build_args(options, PY311)
+
+
+def test_cache_key_depends_on_the_toolchain(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_cache, 'pyinstaller_toolchain', lambda backend='subprocess': ('python', '6.3.0'))
+    (tmp_path / 'app.py').write_text('')
+    options = config.make_options(str(tmp_path / 'app.py'))
+    keys = {build_cache.compute_key(options), build_cache.compute_key(options, PY311),
+            build_cache.compute_key(options, PY312)}
+    assert len(keys) == 3
+
+
+def result(toolchain, wall, size, cold, warm, success=True):
+    item = matrix.MatrixResult(toolchain, success, 'ok' if success else 'PyInstaller failed\nmore', wall, size)
+    item.cold, item.warm = cold, warm
+    return item
+
+
+def test_best_picks_each_column_among_successful_builds():
+    py310 = Toolchain('py310', '/usr/bin/python3.10', python='3.10.1', pyinstaller='5.13.0')
+    results = [result(PY311, 30.0, 9000, 1.0, 0.5),
+               result(PY312, 40.0, 8000, 0.9, None),
+               result(py310, 1.0, 100, 0.1, 0.1, success=False)]
+    assert matrix.best(results) == {'build': 'py311', 'size': 'py312', 'startup': 'py311'}
+
+
+def test_format_table_lists_every_toolchain_and_the_picks():
+    lines = matrix.format_table([result(PY311, 30.0, 9000, 1.0, 0.5),
+                                 result(PY312, None, 0, None, None, success=False)])
+    assert lines[0].split()[:3] == ['Toolchain', 'Python', 'PyInstaller']
+    assert lines[1].split()[:3] == ['py311', '3.11.9', '6.3.0']
+    assert lines[2].endswith('PyInstaller failed')
+    assert lines[-1] == 'Fastest build: py311; smallest: py311; fastest startup: py311'
+
+
+def test_format_table_without_successful_builds_has_no_picks():
+    lines = matrix.format_table([result(PY311, None, 0, None, None, success=False)])
+    assert len(lines) == 2
@@ -0,0 +1,65 @@
+import pytest
+
+from pydeloy import config, import_trace, minimal_bundle
+
+TOC = [
+    ('app', '{root}/app.py', 'PYSOURCE'),
+    ('requests', '{root}/requests/__init__.py', 'PYMODULE'),
+    ('requests.adapters', '{root}/requests/adapters.py', 'PYMODULE'),
+    ('requests.compat', '{root}/requests/compat.py', 'PYMODULE'),
+    ('numpy', '{root}/numpy/__init__.py', 'PYMODULE'),
+    ('numpy.linalg', '{root}/numpy/linalg/__init__.py', 'PYMODULE'),
+    ('email', '{root}/email/__init__.py', 'PYMODULE'),
+    ('email.mime', '{root}/email/mime/__init__.py', 'PYMODULE'),
+    ('email.mime.text', '{root}/email/mime/text.py', 'PYMODULE'),
+    ('pyimod01_archive', '{root}/pyimod01_archive.py', 'PYMODULE'),
+    ('numpy/linalg/_umath_linalg.cpython-311-x86_64-linux-gnu.so', '{root}/_umath_linalg.so', 'EXTENSION'),
+    ('python3.11/lib-dynload/_ssl.cpython-311-x86_64-linux-gnu.so', '{root}/_ssl.so', 'EXTENSION'),
+]
+
+
+@pytest.fixture
+def options(tmp_path, monkeypatch):
+    # Runtime hook cần interpreter thật để phân tích, ở đây không có hook nào
+    monkeypatch.setattr(minimal_bundle, 'runtime_hook_packages', lambda entries, options, interpreter=None: set())
+    options = config.make_options(str(tmp_path / 'app.py'))
+    build_dir = tmp_path / 'build' / 'app'
+    build_dir.mkdir(parents=True)
+    entries = [tuple(part.format(root=tmp_path) for part in entry) for entry in TOC]
+    (build_dir / 'Analysis-00.toc').write_text(repr([entries]), encoding='utf-8')
+    return options
+
+
+def trace(*names, preloaded=()):
+    modules = [import_trace.TracedModule(name, 'app', 'import', '') for name in names]
+    return import_trace.TraceResult(modules, set(preloaded), 0, '', 0.1)
+
+
+def test_plan_strips_what_the_smoke_run_did_not_load(options):
+    plan = minimal_bundle.make_plan(options, trace('requests', 'requests.adapters', preloaded={'email'}))
+    assert plan.excludes == ['numpy']
+    assert plan.pure_excludes == ['email.mime', 'email.mime.*', 'requests.compat']
+    # Extension của numpy đã bị exclude cả package, chỉ cần lọc _ssl
+    assert plan.binary_excludes == ['python3.11/lib-dynload/_ssl.cpython-311-x86_64-linux-gnu.so']
+    assert plan.kept == 4
+
+
+def test_hidden_imports_are_kept(options):
+    options['hidden_imports'] = ['numpy.linalg']
+    plan = minimal_bundle.make_plan(options, trace('requests', 'requests.adapters', 'email.mime.text'))
+    assert plan.excludes == []
+    assert 'numpy.linalg' not in plan.pure_excludes
+
+
+def test_apply_adds_the_plan_without_duplicates(options):
+    plan = minimal_bundle.MinimalPlan(['numpy'], ['x.*'], [], 1, 10, 1)
+    applied = plan.apply(dict(options, excludes=['numpy', 'tkinter']))
+    assert applied['excludes'] == ['numpy', 'tkinter']
+    assert applied['pure_excludes'] == ['x.*']
+    assert options['pure_excludes'] == []
+
+
+def test_toc_left_by_a_minimal_build_is_not_used(options):
+    minimal_bundle.mark_minimal(options)
+    with pytest.raises(FileNotFoundError):
+        minimal_bundle.make_plan(options, trace('requests'))
@@ -0,0 +1,40 @@
+import pytest
+
+from pydeloy import config, multi_target
+
+
+def make_builds(tmp_path, **overrides):
+    return [config.make_options(str(tmp_path / 'app.py'), onefile=False, **overrides),
+            config.make_options(str(tmp_path / 'cli.py'), onefile=False, **overrides)]
+
+
+def test_build_args_write_the_spec_under_build(tmp_path):
+    user_spec = tmp_path / 'suite.spec'
+    user_spec.write_text('# hand written\n', encoding='utf-8')
+    args = multi_target.build_args(make_builds(tmp_path, clean=False), 'suite')
+    path = tmp_path / 'build' / 'suite.spec'
+    assert args == ['-y', f'--distpath={tmp_path / "dist"}', f'--workpath={tmp_path / "build"}', str(path)]
+    assert path.read_text(encoding='utf-8').startswith('# -*- mode: python')
+    assert user_spec.read_text(encoding='utf-8') == '# hand written\n'
+
+
+def test_build_args_clean_when_any_build_asks(tmp_path):
+    builds = make_builds(tmp_path, clean=False)
+    assert '--clean' not in multi_target.build_args(builds, 'suite')
+    builds[1]['clean'] = True
+    assert '--clean' in multi_target.build_args(builds, 'suite')
+
+
+def test_relative_data_is_resolved_against_each_script(tmp_path):
+    builds = make_builds(tmp_path, datas=[['assets', 'assets']])
+    builds[1]['script'] = str(tmp_path / 'tools' / 'cli.py')
+    text = multi_target.generate_spec(builds, 'suite')
+    assert repr((str(tmp_path / 'assets'), 'assets')) in text
+    assert repr((str(tmp_path / 'tools' / 'assets'), 'assets')) in text
+
+
+def test_duplicate_target_names_are_rejected(tmp_path):
+    builds = make_builds(tmp_path)
+    builds[1]['name'] = 'app'
+    with pytest.raises(ValueError):
+        multi_target.generate_spec(builds, 'suite')
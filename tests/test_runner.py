@@ -0,0 +1,36 @@
+from pydeloy import build_cache, config, incremental, runner
+
+
+def make_tree(tmp_path, options):
+    workpath = tmp_path / 'build'
+    (workpath / options['name']).mkdir(parents=True)
+    (workpath / options['name'] / 'PYZ-00.pyz').write_text('')
+    (workpath / incremental.STATE_FILE).write_text('{}')
+    artifact = build_cache.artifact_path(options)
+    (tmp_path / 'dist').mkdir()
+    open(artifact, 'w').close()
+    return [f'--workpath={workpath}', '-y', options['script']], workpath, artifact
+
+
+def test_cancel_during_analysis_keeps_dist(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'))
+    args, workpath, artifact = make_tree(tmp_path, options)
+    removed = runner.remove_partial_output(args, options, 'Analysis')
+    assert removed == [str(workpath / 'app')]
+    assert not (workpath / 'app').exists()
+    assert (workpath / incremental.STATE_FILE).exists()
+    assert (tmp_path / 'dist' / 'app').exists()
+
+
+def test_cancel_during_exe_removes_the_artifact_and_incremental_state(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'), incremental=True)
+    args, workpath, artifact = make_tree(tmp_path, options)
+    removed = runner.remove_partial_output(args, options, 'EXE')
+    assert removed == [str(workpath / 'app'), str(workpath / incremental.STATE_FILE), artifact]
+    assert not (tmp_path / 'dist' / 'app').exists()
+
+
+def test_nothing_to_remove_without_a_workpath(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'))
+    assert runner.remove_partial_output([options['script']], options, 'EXE') == []
+    assert runner.remove_partial_output([f'--workpath={tmp_path}'], None, 'EXE') == []
@@ -0,0 +1,99 @@
+import textwrap
+
+import pytest
+
+from pydeloy import config, multi_target, spec_file
+
+
+def round_trip(tmp_path, options):
+    path = spec_file.write_spec(options, str(tmp_path / f'{options["name"]}.spec'))
+    return spec_file.parse_spec(path)
+
+
+def test_onefile_round_trip(tmp_path):
+    options = config.make_options(
+        str(tmp_path / 'app.py'), name='tool', noconsole=True, icon=str(tmp_path / 'app.ico'),
+        gui='PyQt5', hidden_imports=['requests'], excludes=['tkinter'],
+        datas=[['assets', 'assets']], binaries=[['lib/x.dll', '.']],
+        binary_excludes=['Qt5WebEngine*'], pure_excludes=['numpy.*.tests.*'])
+    (parsed,), warnings = round_trip(tmp_path, options)
+    assert warnings == []
+    for key in ('script', 'name', 'noconsole', 'icon', 'gui', 'hidden_imports', 'excludes',
+                'datas', 'binaries', 'binary_excludes', 'pure_excludes', 'onefile'):
+        assert parsed[key] == options[key], key
+
+
+def test_onedir_round_trip(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'), onefile=False)
+    (parsed,), _ = round_trip(tmp_path, options)
+    assert parsed['onefile'] is False
+    assert parsed['name'] == 'app'
+    assert parsed['icon'] == ''
+
+
+def test_single_target_spec_does_not_import_json(tmp_path):
+    text = spec_file.generate_spec(config.make_options(str(tmp_path / 'app.py')))
+    assert 'import json' not in text
+    compile(text, 'app.spec', 'exec')
+
+
+def test_multi_target_round_trip(tmp_path):
+    builds = [config.make_options(str(tmp_path / 'app.py')),
+              config.make_options(str(tmp_path / 'cli.py'), excludes=['tkinter'],
+                                  pure_excludes=['pkg.tests.*'])]
+    path = tmp_path / 'suite.spec'
+    path.write_text(multi_target.generate_spec(builds, 'suite'), encoding='utf-8')
+    targets, warnings = spec_file.parse_spec(str(path))
+    assert warnings == []
+    assert [target['name'] for target in targets] == ['app', 'cli']
+    assert targets[1]['excludes'] == ['tkinter']
+    assert targets[1]['pure_excludes'] == ['pkg.tests.*']
+    assert targets[0]['pure_excludes'] == []
+
+
+def test_non_literal_values_fall_back_with_a_warning(tmp_path):
+    path = tmp_path / 'app.spec'
+    path.write_text(textwrap.dedent('''
+        a = Analysis(
+            ['app.py'],
+            datas=collect_data_files('pkg'),
+            hiddenimports=['a'] + ['b'],
+            excludes={['unhashable']},
+        )
+        pyz = PYZ(a.pure)
+        exe = EXE(pyz, a.scripts, a.binaries, a.datas, [], name='app')
+    '''), encoding='utf-8')
+    (parsed,), warnings = spec_file.parse_spec(str(path))
+    assert parsed['datas'] == []
+    assert parsed['excludes'] == []
+    assert len(warnings) == 3
+
+
+def test_spec_without_analysis_is_rejected(tmp_path):
+    path = tmp_path / 'empty.spec'
+    path.write_text('x = 1\n', encoding='utf-8')
+    with pytest.raises(spec_file.SpecError):
+        spec_file.parse_spec(str(path))
+
+
+def test_spec_build_options_disables_cache_for_multi_target(tmp_path):
+    options = config.make_options(str(tmp_path / 'app.py'), cache=True)
+    single = spec_file.spec_build_options(options, 'app.spec', 1)
+    multi = spec_file.spec_build_options(options, 'app.spec', 2)
+    assert single['cache'] is True
+    assert multi['cache'] is False
+    assert multi['spec'] == str(tmp_path.cwd() / 'app.spec')
+    assert options['spec'] == ''
+
+
+def test_generated_spec_goes_under_workpath(tmp_path):
+    user_spec = tmp_path / 'app.spec'
+    user_spec.write_text('# hand written\n', encoding='utf-8')
+    options = config.make_options(str(tmp_path / 'app.py'), name='app', datas=[['assets', 'assets']],
+                                  binary_excludes=['*.dll'])
+    args = spec_file.pyinstaller_args(options)
+    path = tmp_path / 'build' / 'app.spec'
+    assert args[-1] == str(path)
+    assert user_spec.read_text(encoding='utf-8') == '# hand written\n'
+    (parsed,), _ = spec_file.parse_spec(str(path))
+    assert parsed['datas'] == [[str(tmp_path / 'assets'), 'assets']]
@@ -0,0 +1,78 @@
+import textwrap
+
+from pydeloy import config, warn_report
+
+WARN_FILE = textwrap.dedent('''\
+
+    This file lists modules PyInstaller was not able to find. This does not
+    necessarily mean this module is required for running your program.
+
+    Types if import:
+    * top-level: imported at the top-level - look at these first
+    * conditional: imported within an if-statement
+    * delayed: imported within a function
+    * optional: imported within a try-except-statement
+
+    missing module named pwd - imported by posixpath (delayed, conditional), shutil (delayed, optional)
+    missing module named winreg - imported by importlib._bootstrap_external (conditional), platform (delayed, optional)
+    missing module named 'org.python' - imported by copy (optional)
+    missing module named yaml - imported by app (top-level)
+    missing module named 'six.moves.urllib' - imported by requests.compat (top-level)
+    missing module named cchardet - imported by requests.compat (optional)
+    missing module named _winapi - imported by subprocess (conditional), encodings (delayed, conditional, optional)
+    excluded module named tkinter - imported by app (top-level), PIL.ImageTk (top-level)
+    excluded module named unittest - imported by doctest (top-level, optional)
+    missing module named msvcrt - imported by win32_helpers (top-level)
+''')
+
+
+def parse(tmp_path):
+    path = tmp_path / 'warn-app.txt'
+    path.write_text(WARN_FILE, encoding='utf-8')
+    modules = warn_report.parse_warn(str(path))
+    for module in modules:
+        warn_report.classify(module, platform='linux')
+    return {module.name: module for module in modules}
+
+
+def test_warn_line_and_importers(tmp_path):
+    modules = parse(tmp_path)
+    assert len(modules) == 10
+    assert modules['pwd'].status == 'missing'
+    assert modules['pwd'].importers == [('posixpath', {'delayed', 'conditional'}),
+                                        ('shutil', {'delayed', 'optional'})]
+    assert modules['org.python'].importers == [('copy', {'optional'})]
+    assert modules['tkinter'].status == 'excluded'
+    assert modules['tkinter'].top_level_importers() == ['app', 'PIL.ImageTk']
+
+
+def test_importer_with_many_kinds(tmp_path):
+    modules = parse(tmp_path)
+    assert modules['_winapi'].importers == [('subprocess', {'conditional'}),
+                                            ('encodings', {'delayed', 'conditional', 'optional'})]
+
+
+def test_classify(tmp_path):
+    modules = parse(tmp_path)
+    categories = {name: module.category for name, module in modules.items()}
+    assert categories == {
+        'pwd': warn_report.OPTIONAL,
+        'winreg': warn_report.PLATFORM,
+        'org.python': warn_report.PLATFORM,
+        'yaml': warn_report.CRITICAL,
+        'six.moves.urllib': warn_report.OPTIONAL,
+        'cchardet': warn_report.OPTIONAL,
+        '_winapi': warn_report.PLATFORM,
+        'tkinter': warn_report.EXCLUDED,
+        'unittest': warn_report.EXCLUDED,
+        'msvcrt': warn_report.PLATFORM,
+    }
+
+
+def test_apply_fix():
+    options = config.make_options('app.py', excludes=['tkinter'])
+    assert warn_report.apply_fix(options, ('hidden', 'yaml'))
+    assert warn_report.apply_fix(options, ('include', 'tkinter'))
+    assert not warn_report.apply_fix(options, ('include', 'tkinter'))
+    assert options['hidden_imports'] == ['yaml']
+    assert options['excludes'] == []
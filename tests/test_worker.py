@@ -0,0 +1,94 @@
+import sys
+
+import pytest
+
+from pydeloy import worker
+
+
+ANALYSIS = """
+_cached_module_graph_ = None
+
+def initialize_modgraph(**kwargs):
+    pass
+"""
+
+
+def fake_pyinstaller(root, version, analysis=ANALYSIS, main=''):
+    """Package PyInstaller giả chỉ đủ cho phần worker dùng"""
+    package = root / 'PyInstaller'
+    for sub in ('building', 'depend'):
+        (package / sub).mkdir(parents=True)
+        (package / sub / '__init__.py').write_text('')
+    (package / '__init__.py').write_text(f'__version__ = {version!r}\n')
+    (package / '__main__.py').write_text(main)
+    (package / 'building' / 'build_main.py').write_text('def discover_hook_directories():\n    return []\n')
+    (package / 'depend' / 'analysis.py').write_text(analysis)
+
+
+def start(monkeypatch, root):
+    monkeypatch.setenv('PYTHONPATH', str(root))
+    w = worker.PyInstallerWorker(sys.executable)
+    try:
+        w.start()
+        return w.version
+    finally:
+        w.close()
+
+
+def test_tested_version_starts(tmp_path, monkeypatch):
+    fake_pyinstaller(tmp_path, '6.3.0')
+    assert start(monkeypatch, tmp_path) == '6.3.0'
+
+
+def test_untested_version_is_refused(tmp_path, monkeypatch):
+    fake_pyinstaller(tmp_path, '7.1.0')
+    with pytest.raises(worker.WorkerError, match='not supported'):
+        start(monkeypatch, tmp_path)
+
+
+def test_missing_internals_are_refused(tmp_path, monkeypatch):
+    fake_pyinstaller(tmp_path, '6.3.0', analysis='def initialize_modgraph(**kwargs):\n    pass\n')
+    with pytest.raises(worker.WorkerError, match='_cached_module_graph_'):
+        start(monkeypatch, tmp_path)
+
+
+BROKEN_HOOKS = """
+_cached_module_graph_ = None
+
+class Graph:
+    _hooks = _hooks_pre_safe_import_module = _hooks_pre_find_module_path = None
+
+    def import_hook(self, name):
+        pass
+
+    def process_post_graph_hooks(self, analysis):
+        raise RuntimeError('hook needs a real Analysis')
+
+def initialize_modgraph(**kwargs):
+    global _cached_module_graph_
+    _cached_module_graph_ = Graph()
+    return _cached_module_graph_
+"""
+
+REPORT_CACHE = """
+def run(args):
+    from PyInstaller.depend import analysis
+    print('cached:', analysis._cached_module_graph_)
+"""
+
+
+def test_failed_seeding_leaves_no_cached_graph(tmp_path, monkeypatch):
+    fake_pyinstaller(tmp_path, '6.3.0', analysis=BROKEN_HOOKS, main=REPORT_CACHE)
+    monkeypatch.setenv('PYTHONPATH', str(tmp_path))
+    w = worker.PyInstallerWorker(sys.executable)
+    lines = []
+    try:
+        for _ in range(2):
+            returncode, _, _ = w.run([], str(tmp_path), lines.append, excludes=[], shared=['pkg'])
+            assert returncode == 0
+    finally:
+        w.close()
+    lines = [line.strip() for line in lines]
+    assert lines.count('cached: None') == 2
+    # Không dựng lại cho đúng package/version đã hỏng
+    assert sum('hook failed while seeding' in line for line in lines) == 1